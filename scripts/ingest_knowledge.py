@@ -3,93 +3,232 @@
 
 import argparse
 import asyncio
-import json
+import codecs
+import os
+import re
 import sys
+from collections.abc import AsyncIterator, Iterator
 from pathlib import Path
+from typing import Any, TypeVar
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+import orjson
+
+from src.services.rag.embed_cache import EmbeddingCache
 from src.services.rag.embeddings import EmbeddingService
 from src.services.rag.vectorstore import QdrantVectorStore
 
+# Files are read in 1 MiB blocks so memory stays flat regardless of file size
+READ_BLOCK_SIZE = 1 << 20
+
+_WORD_RE = re.compile(r'\S+')
+
+# Defaults for batched uploads to the vector store
+DEFAULT_BATCH_SIZE = 128
+DEFAULT_MAX_CONCURRENCY = 4
+
+# Files processed concurrently when ingesting a directory
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+T = TypeVar("T")
+
+
+async def iterate_in_thread(iterator: Iterator[T]) -> AsyncIterator[T]:
+    """Advance a blocking iterator in worker threads, one item at a time.
+
+    Keeps file reads and directory listings off the event loop, so uploads
+    and other files' chunking carry on while a read waits on the disk.
+    """
+    done = object()
+    while (item := await asyncio.to_thread(next, iterator, done)) is not done:
+        yield item
+
+
+class BatchUploader:
+    """Accumulates chunks across files and uploads them in fixed-size batches.
+
+    Up to `max_concurrency` add_documents calls are in flight at once; adding
+    more chunks waits for a free slot, which bounds memory use.
+    """
+
+    def __init__(
+        self,
+        vector_store: QdrantVectorStore,
+        tenant_id: str,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> None:
+        self.vector_store = vector_store
+        self.tenant_id = tenant_id
+        self.batch_size = batch_size
+        self.ingested = 0
+
+        self._documents: list[str] = []
+        self._metadata: list[dict[str, Any]] = []
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._error: BaseException | None = None
+
+    async def add(self, document: str, metadata: dict[str, Any]) -> None:
+        """Queue a document, uploading a batch once it is full."""
+        self._documents.append(document)
+        self._metadata.append(metadata)
+        if len(self._documents) >= self.batch_size:
+            await self._flush()
+
+    async def close(self) -> int:
+        """Upload remaining documents and wait for all batches.
+
+        Returns:
+            Total number of documents ingested
+        """
+        await self._flush()
+        await asyncio.gather(*self._tasks)
+        if self._error:
+            raise self._error
+        return self.ingested
+
+    async def _flush(self) -> None:
+        if self._error:
+            raise self._error
+        if not self._documents:
+            return
+
+        documents, metadata = self._documents, self._metadata
+        self._documents, self._metadata = [], []
+
+        await self._semaphore.acquire()
+        task = asyncio.create_task(self._upload(documents, metadata))
+        self._tasks.add(task)
+        task.add_done_callback(self._on_done)
+
+    async def _upload(self, documents: list[str], metadata: list[dict[str, Any]]) -> None:
+        try:
+            doc_ids = await self.vector_store.add_documents(
+                documents=documents,
+                tenant_id=self.tenant_id,
+                doc_type="knowledge",
+                metadata_list=metadata,
+            )
+            self.ingested += len(doc_ids)
+        finally:
+            self._semaphore.release()
+
+    def _on_done(self, task: asyncio.Task[None]) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() and self._error is None:
+            self._error = task.exception()
+
+
+def _word_spans(text: str) -> tuple[list[int], list[int]]:
+    """Return start and end offsets of every whitespace-delimited word."""
+    starts: list[int] = []
+    ends: list[int] = []
+    for match in _WORD_RE.finditer(text):
+        starts.append(match.start())
+        ends.append(match.end())
+    return starts, ends
+
+
+def iter_word_chunks(
+    file_path: Path,
+    chunk_size: int = 500,
+    overlap: int = 50,
+) -> Iterator[str]:
+    """Stream a text file as overlapping word chunks.
+
+    Windows of `chunk_size` words advance by `chunk_size - overlap` words.
+    Each chunk is a single slice of the decoded text between the first and
+    last word of its window, so no per-word strings are created and only one
+    read block plus the current window is kept in memory.
+    """
+    step = chunk_size - overlap
+    if step <= 0:
+        raise ValueError("overlap must be smaller than chunk_size")
+
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    pending = ''
 
-def chunk_text(text: str, chunk_size: int = 500, overlap: int = 50) -> list[str]:
-    """Split text into chunks with overlap."""
-    words = text.split()
-    chunks = []
+    with open(file_path, 'rb', buffering=READ_BLOCK_SIZE) as f:
+        while block := f.read(READ_BLOCK_SIZE):
+            text = pending + decoder.decode(block)
+            starts, ends = _word_spans(text)
 
-    for i in range(0, len(words), chunk_size - overlap):
-        chunk = ' '.join(words[i:i + chunk_size])
-        if chunk:
-            chunks.append(chunk)
+            # A block may end in the middle of a word - leave it for the next read
+            partial_from = len(text)
+            if starts and not text[-1].isspace():
+                partial_from = starts.pop()
+                ends.pop()
 
-    return chunks
+            i = 0
+            while len(starts) - i >= chunk_size:
+                yield text[starts[i]:ends[i + chunk_size - 1]]
+                i += step
+
+            pending = text[starts[i]:] if i < len(starts) else text[partial_from:]
+
+    text = pending + decoder.decode(b'', final=True)
+    starts, ends = _word_spans(text)
+    for i in range(0, len(starts), step):
+        yield text[starts[i]:ends[min(i + chunk_size, len(starts)) - 1]]
 
 
 async def ingest_file(
     file_path: Path,
-    tenant_id: str,
-    vector_store: QdrantVectorStore,
+    uploader: BatchUploader,
     chunk_size: int = 500,
 ) -> int:
-    """Ingest a single file into the knowledge base."""
-    print(f"Processing: {file_path}")
+    """Queue a single text file's chunks for ingestion.
 
-    # Read file content
-    content = file_path.read_text(encoding='utf-8')
-
-    # Chunk the content
-    chunks = chunk_text(content, chunk_size=chunk_size)
+    Returns:
+        Number of chunks queued
+    """
+    print(f"Processing: {file_path}")
 
-    if not chunks:
+    # Shared by every chunk of the file; built once instead of per chunk
+    source = str(file_path)
+    filename = file_path.name
+
+    count = 0
+    chunks = iter_word_chunks(file_path, chunk_size=chunk_size)
+    async for chunk in iterate_in_thread(chunks):
+        count += 1
+        await uploader.add(chunk, {
+            "source": source,
+            "filename": filename,
+            "chunk_index": count - 1,
+        })
+
+    if not count:
         print(f"  No content to ingest")
         return 0
 
-    # Prepare metadata
-    metadata = [
-        {
-            "source": str(file_path),
-            "filename": file_path.name,
-            "chunk_index": i,
-            "total_chunks": len(chunks),
-        }
-        for i in range(len(chunks))
-    ]
-
-    # Add to vector store
-    doc_ids = await vector_store.add_documents(
-        documents=chunks,
-        tenant_id=tenant_id,
-        doc_type="knowledge",
-        metadata_list=metadata,
-    )
-
-    print(f"  Ingested {len(doc_ids)} chunks")
-    return len(doc_ids)
+    print(f"  Queued {count} chunks")
+    return count
 
 
 async def ingest_json_faqs(
     file_path: Path,
-    tenant_id: str,
-    vector_store: QdrantVectorStore,
+    uploader: BatchUploader,
 ) -> int:
-    """Ingest FAQ-style JSON file.
+    """Queue an FAQ-style JSON file for ingestion.
 
     Expected format:
     [
         {"question": "...", "answer": "..."},
         ...
     ]
+
+    Returns:
+        Number of FAQs queued
     """
     print(f"Processing FAQs: {file_path}")
 
-    with open(file_path, 'r', encoding='utf-8') as f:
-        faqs = json.load(f)
-
-    documents = []
-    metadata_list = []
+    faqs = orjson.loads(await asyncio.to_thread(file_path.read_bytes))
 
+    count = 0
     for i, faq in enumerate(faqs):
         question = faq.get('question', '')
         answer = faq.get('answer', '')
@@ -97,27 +236,60 @@ async def ingest_json_faqs(
         if question and answer:
             # Combine Q&A for better retrieval
             doc = f"Question: {question}\n\nAnswer: {answer}"
-            documents.append(doc)
-            metadata_list.append({
+            await uploader.add(doc, {
                 "source": str(file_path),
                 "type": "faq",
                 "faq_index": i,
                 "question": question[:100],  # Truncate for metadata
             })
+            count += 1
 
-    if not documents:
+    if not count:
         print(f"  No FAQs to ingest")
         return 0
 
-    doc_ids = await vector_store.add_documents(
-        documents=documents,
-        tenant_id=tenant_id,
-        doc_type="knowledge",
-        metadata_list=metadata_list,
-    )
+    print(f"  Queued {count} FAQs")
+    return count
+
+
+async def ingest_directory(
+    path: Path,
+    uploader: BatchUploader,
+    extensions: list[str],
+    chunk_size: int = 500,
+    workers: int = DEFAULT_WORKERS,
+) -> None:
+    """Ingest all matching files under a directory concurrently.
+
+    A producer walks the tree into a bounded queue while `workers` consumers
+    ingest files, so reading and chunking overlap with uploads.
+    """
+    queue: asyncio.Queue[Path | None] = asyncio.Queue(maxsize=64)
 
-    print(f"  Ingested {len(doc_ids)} FAQs")
-    return len(doc_ids)
+    # JSON files are always ingested as FAQs
+    suffixes = set(extensions) | {'.json'}
+
+    async def produce() -> None:
+        # Single pass over the tree, matching every suffix at once
+        async for dirpath, _, filenames in iterate_in_thread(os.walk(path)):
+            for filename in filenames:
+                if os.path.splitext(filename)[1] in suffixes:
+                    await queue.put(Path(dirpath, filename))
+
+        for _ in range(workers):
+            await queue.put(None)
+
+    async def consume() -> None:
+        while (file_path := await queue.get()) is not None:
+            if file_path.suffix == '.json':
+                await ingest_json_faqs(file_path, uploader)
+            else:
+                await ingest_file(file_path, uploader, chunk_size)
+
+    async with asyncio.TaskGroup() as tg:
+        tg.create_task(produce())
+        for _ in range(workers):
+            tg.create_task(consume())
 
 
 async def main():
@@ -126,6 +298,23 @@ async def main():
     parser.add_argument("path", help="File or directory path to ingest")
     parser.add_argument("--chunk-size", type=int, default=500, help="Chunk size in words")
     parser.add_argument("--extensions", nargs="+", default=[".txt", ".md"], help="File extensions to process")
+    parser.add_argument(
+        "--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Chunks per upload request"
+    )
+    parser.add_argument(
+        "--max-concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY,
+        help="Maximum concurrent upload requests",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=DEFAULT_WORKERS, help="Files processed concurrently"
+    )
+    parser.add_argument(
+        "--embed-cache", default=".embed_cache.db",
+        help="SQLite file caching embeddings between runs",
+    )
+    parser.add_argument(
+        "--no-embed-cache", action="store_true", help="Always re-embed every chunk"
+    )
 
     args = parser.parse_args()
 
@@ -137,30 +326,44 @@ async def main():
 
     # Initialize services
     embedding_service = EmbeddingService()
-    vector_store = QdrantVectorStore(embedding_service=embedding_service)
-
-    # Ensure collection exists
-    await vector_store.ensure_collection()
-
-    total_docs = 0
+    embedding_cache = None if args.no_embed_cache else EmbeddingCache(args.embed_cache)
+    vector_store = QdrantVectorStore(
+        embedding_service=embedding_service,
+        embedding_cache=embedding_cache,
+    )
 
-    if path.is_file():
-        # Single file
-        if path.suffix == '.json':
-            total_docs = await ingest_json_faqs(path, args.tenant_id, vector_store)
+    # Close the cache even when ingestion fails part-way
+    try:
+        # Ensure collection exists
+        await vector_store.ensure_collection()
+
+        uploader = BatchUploader(
+            vector_store,
+            args.tenant_id,
+            batch_size=args.batch_size,
+            max_concurrency=args.max_concurrency,
+        )
+
+        if path.is_file():
+            # Single file
+            if path.suffix == '.json':
+                await ingest_json_faqs(path, uploader)
+            else:
+                await ingest_file(path, uploader, args.chunk_size)
         else:
-            total_docs = await ingest_file(path, args.tenant_id, vector_store, args.chunk_size)
-    else:
-        # Directory
-        for ext in args.extensions:
-            for file_path in path.rglob(f"*{ext}"):
-                docs = await ingest_file(file_path, args.tenant_id, vector_store, args.chunk_size)
-                total_docs += docs
-
-        # Also process JSON files
-        for file_path in path.rglob("*.json"):
-            docs = await ingest_json_faqs(file_path, args.tenant_id, vector_store)
-            total_docs += docs
+            # Directory
+            await ingest_directory(
+                path,
+                uploader,
+                args.extensions,
+                chunk_size=args.chunk_size,
+                workers=args.workers,
+            )
+
+        total_docs = await uploader.close()
+    finally:
+        if embedding_cache:
+            embedding_cache.close()
 
     print(f"\nTotal documents ingested: {total_docs}")
 
@@ -8,9 +8,10 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from qdrant_client import QdrantClient, models
+from qdrant_client import AsyncQdrantClient, models
 
 from src.core.config import settings
+from src.services.rag.vectorstore import QUANTIZATION_CONFIGS
 
 
 async def setup_collections():
@@ -18,12 +19,12 @@ async def setup_collections():
     print(f"Connecting to Qdrant at {settings.qdrant_host}:{settings.qdrant_port}")
 
     if settings.qdrant_url:
-        client = QdrantClient(
+        client = AsyncQdrantClient(
             url=settings.qdrant_url,
             api_key=settings.qdrant_api_key or None,
         )
     else:
-        client = QdrantClient(
+        client = AsyncQdrantClient(
             host=settings.qdrant_host,
             port=settings.qdrant_port,
         )
@@ -31,7 +32,7 @@ async def setup_collections():
     collection_name = settings.qdrant_collection_name
 
     # Check if collection exists
-    collections = client.get_collections()
+    collections = await client.get_collections()
     exists = any(c.name == collection_name for c in collections.collections)
 
     if exists:
@@ -39,49 +40,40 @@ async def setup_collections():
         response = input("Do you want to recreate it? (y/N): ")
         if response.lower() == 'y':
             print(f"Deleting collection '{collection_name}'...")
-            client.delete_collection(collection_name)
+            await client.delete_collection(collection_name)
         else:
             print("Skipping collection creation")
             return
 
     # Create collection
     print(f"Creating collection '{collection_name}'...")
-    client.create_collection(
+    await client.create_collection(
         collection_name=collection_name,
         vectors_config=models.VectorParams(
             size=1536,  # text-embedding-3-small dimensions
             distance=models.Distance.COSINE,
+            on_disk=True,
         ),
+        quantization_config=QUANTIZATION_CONFIGS[settings.embedding_quantization],
     )
 
     # Create payload indexes for efficient filtering
     print("Creating payload indexes...")
 
-    # Tenant ID index (required for multi-tenancy)
-    client.create_payload_index(
-        collection_name=collection_name,
-        field_name="tenant_id",
-        field_schema=models.PayloadSchemaType.KEYWORD,
-    )
-
-    # Document type index
-    client.create_payload_index(
-        collection_name=collection_name,
-        field_name="doc_type",
-        field_schema=models.PayloadSchemaType.KEYWORD,
-    )
-
-    # User ID index (for memory retrieval)
-    client.create_payload_index(
-        collection_name=collection_name,
-        field_name="user_id",
-        field_schema=models.PayloadSchemaType.KEYWORD,
-    )
+    # tenant_id is required for multi-tenancy, user_id for memory retrieval
+    await asyncio.gather(*[
+        client.create_payload_index(
+            collection_name=collection_name,
+            field_name=field_name,
+            field_schema=models.PayloadSchemaType.KEYWORD,
+        )
+        for field_name in ("tenant_id", "doc_type", "user_id")
+    ])
 
     print(f"Collection '{collection_name}' created successfully!")
 
     # Show collection info
-    info = client.get_collection(collection_name)
+    info = await client.get_collection(collection_name)
     print(f"\nCollection info:")
     print(f"  - Vectors count: {info.vectors_count}")
     print(f"  - Points count: {info.points_count}")
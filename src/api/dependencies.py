@@ -1,11 +1,15 @@
 """FastAPI dependencies for dependency injection."""
 
+import hashlib
+import hmac
 from functools import lru_cache
 from typing import Annotated
+from urllib.parse import parse_qsl, urlsplit
 
+import orjson
 from fastapi import Depends, Header, HTTPException, Request, status
 
-from src.core.config import Settings, settings
+from src.core.config import Settings, get_settings, settings
 from src.services.channels.whatsapp import TwilioWhatsAppAdapter, get_whatsapp_adapter
 from src.services.conversation.engine import ConversationEngine, get_conversation_engine
 from src.services.conversation.handoff import HandoffEvaluator, get_handoff_evaluator
@@ -14,6 +18,7 @@ from src.services.rag.retriever import RAGRetriever, get_rag_retriever
 from src.services.sentiment.analyzer import SentimentAnalyzer, get_sentiment_analyzer
 from src.storage.base import StorageBackend
 from src.storage.memory import InMemoryStorage
+from src.storage.tenant_cache import get_tenant_cached
 
 
 # Storage singleton
@@ -37,7 +42,7 @@ def get_storage() -> StorageBackend:
 
 # Type aliases for cleaner dependency injection
 StorageDep = Annotated[StorageBackend, Depends(get_storage)]
-SettingsDep = Annotated[Settings, Depends(lambda: settings)]
+SettingsDep = Annotated[Settings, Depends(get_settings)]
 
 
 def get_engine(storage: StorageDep) -> ConversationEngine:
@@ -53,29 +58,151 @@ HandoffDep = Annotated[HandoffEvaluator, Depends(get_handoff_evaluator)]
 WhatsAppDep = Annotated[TwilioWhatsAppAdapter, Depends(get_whatsapp_adapter)]
 
 
+async def read_twilio_form(request: Request) -> list[tuple[str, str]]:
+    """Read the fields of a Twilio webhook body.
+
+    Twilio posts application/x-www-form-urlencoded bodies, which are decoded
+    directly from the buffered body with parse_qsl; that is several times
+    faster than Starlette's streaming form parser for these small payloads.
+    Other content types go through request.form(), keeping text fields only.
+    The parsed fields are kept on the request, so signature verification
+    and the route handler share one parse.
+    """
+    fields: list[tuple[str, str]] | None = getattr(request.state, "twilio_form", None)
+    if fields is not None:
+        return fields
+
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("application/x-www-form-urlencoded"):
+        body = await request.body()
+        fields = parse_qsl(body.decode("utf-8", errors="replace"), keep_blank_values=True)
+    else:
+        form = await request.form()
+        fields = [(k, v) for k, v in form.multi_items() if isinstance(v, str)]
+
+    request.state.twilio_form = fields
+    return fields
+
+
+NDJSON_CONTENT_TYPE = "application/x-ndjson"
+
+
+def is_ndjson(request: Request) -> bool:
+    """Whether a webhook body carries newline-delimited JSON events."""
+    return request.headers.get("content-type", "").startswith(NDJSON_CONTENT_TYPE)
+
+
+async def read_webhook_payloads(request: Request) -> list[dict[str, str]]:
+    """Read the event payloads of a webhook request.
+
+    A form body is one event. An NDJSON body (used by relays forwarding
+    bursts of Twilio events) holds one JSON object per line; a body with
+    a malformed or non-object line is rejected with a 400.
+    """
+    if is_ndjson(request):
+        body = await request.body()
+        try:
+            events = [orjson.loads(line) for line in body.splitlines() if line.strip()]
+        except orjson.JSONDecodeError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Malformed NDJSON webhook body: {e}",
+            )
+        if not all(isinstance(event, dict) for event in events):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Each NDJSON line must be a JSON object",
+            )
+        return events
+    return [dict(await read_twilio_form(request))]
+
+
+def webhook_public_url(request: Request) -> str:
+    """Reconstruct the absolute URL a webhook sender signed.
+
+    Behind a TLS-terminating proxy, request.url is the internal address
+    (http://host:8000/...) while Twilio signs the public https URL. The
+    scheme and host come from PUBLIC_BASE_URL when set, otherwise from the
+    proxy's X-Forwarded-Proto and X-Forwarded-Host headers.
+    """
+    url = request.url
+    if settings.public_base_url:
+        base = urlsplit(settings.public_base_url)
+        return str(url.replace(scheme=base.scheme, netloc=base.netloc))
+
+    # Proxies chaining these headers append to them; the first is the client's
+    proto = request.headers.get("x-forwarded-proto")
+    if proto:
+        url = url.replace(scheme=proto.split(",")[0].strip())
+    host = request.headers.get("x-forwarded-host")
+    if host:
+        url = url.replace(netloc=host.split(",")[0].strip())
+    return str(url)
+
+
+def verify_relay_signature(url: str, body: bytes, signature: str | None) -> None:
+    """Verify the signature of an NDJSON relay webhook.
+
+    Twilio never sends NDJSON, so these bodies come from our own relays,
+    which must send an X-Relay-Signature header holding the hex
+    HMAC-SHA256 of the full request URL followed by the raw body, keyed
+    with WEBHOOK_RELAY_SECRET. With no secret configured, NDJSON is refused.
+    """
+    if not settings.webhook_relay_secret:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="NDJSON relay webhooks are not enabled",
+        )
+    if not signature:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Missing relay signature",
+        )
+
+    expected = hmac.new(
+        settings.webhook_relay_secret.encode("utf-8"),
+        url.encode("utf-8") + body,
+        hashlib.sha256,
+    ).hexdigest()
+    if not hmac.compare_digest(expected, signature):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid relay signature",
+        )
+
+
 async def verify_twilio_signature(
     request: Request,
     x_twilio_signature: str = Header(None),
+    x_relay_signature: str = Header(None),
 ) -> bool:
     """Verify Twilio webhook signature.
 
     In production, this should strictly validate the signature.
-    In development, we can be more lenient.
+    In development, we can be more lenient. NDJSON bodies are relayed
+    rather than sent by Twilio and are checked by verify_relay_signature.
     """
     if settings.is_development:
         return True
 
+    # Starlette caches the body on the request, so the webhook handler
+    # reads the same bytes without receiving them again
+    if is_ndjson(request):
+        verify_relay_signature(webhook_public_url(request), await request.body(), x_relay_signature)
+        return True
+
     if not x_twilio_signature:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Missing Twilio signature",
         )
 
-    # Get adapter and validate
     adapter = get_whatsapp_adapter()
-    body = await request.body()
+    payload = adapter.build_signature_payload(
+        webhook_public_url(request), await read_twilio_form(request)
+    )
 
-    if not adapter.validate_webhook(body, x_twilio_signature):
+    if not adapter.validate_webhook(payload, x_twilio_signature):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid Twilio signature",
@@ -92,7 +219,7 @@ async def get_tenant_from_path(
     storage: StorageDep,
 ):
     """Get tenant from path parameter."""
-    tenant = await storage.get_tenant(tenant_id)
+    tenant = await get_tenant_cached(storage, tenant_id)
     if not tenant:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -1,31 +1,44 @@
 """FastAPI application factory and configuration."""
 
-import structlog
+import asyncio
+import logging
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator
 
+import orjson
+import structlog
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from src.api.dependencies import get_storage
+from src.api.responses import ORJSONResponse
 from src.api.routes import admin_router, health_router, webhooks_router
 from src.core.config import settings
 from src.core.exceptions import AppException
+from src.services.channels.whatsapp import close_whatsapp_adapter
+from src.services.conversation.engine import close_conversation_engine
+from src.services.rag.vectorstore import close_qdrant_client, get_vector_store
+
+
+def _orjson_dumps(obj: Any, default: Any = None, **_: Any) -> str:
+    """Serialize a log event with orjson for structlog's JSONRenderer."""
+    return orjson.dumps(obj, default=default).decode("utf-8")
 
 
-# Configure structured logging
+# Configure structured logging; filter_by_level drops events below the
+# configured level before any processor builds or serializes them
+logging.basicConfig(format="%(message)s", level=settings.log_level.upper())
 structlog.configure(
     processors=[
         structlog.stdlib.filter_by_level,
         structlog.stdlib.add_logger_name,
         structlog.stdlib.add_log_level,
-        structlog.stdlib.PositionalArgumentsFormatter(),
         structlog.processors.TimeStamper(fmt="iso"),
         structlog.processors.StackInfoRenderer(),
         structlog.processors.format_exc_info,
         structlog.processors.UnicodeDecoder(),
-        structlog.processors.JSONRenderer() if settings.log_format == "json" else structlog.dev.ConsoleRenderer(),
+        structlog.processors.JSONRenderer(serializer=_orjson_dumps) if settings.log_format == "json" else structlog.dev.ConsoleRenderer(),
     ],
     wrapper_class=structlog.stdlib.BoundLogger,
     context_class=dict,
@@ -56,10 +69,29 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
             await storage.seed_demo_tenant()
             logger.info("Seeded demo tenant for development")
 
+    # Connect to Qdrant before serving so the first request skips the setup
+    try:
+        await get_vector_store().startup()
+    except Exception as e:
+        logger.warning("Vector store startup failed", error=str(e))
+
+    # Warm embeddings in the background so startup isn't held up by the API
+    warmup_task: asyncio.Task[None] | None = None
+    if settings.embedding_warmup:
+        warmup_task = asyncio.create_task(
+            get_vector_store().warm_up(settings.embedding_warmup_queries)
+        )
+
     yield
 
+    if warmup_task is not None:
+        warmup_task.cancel()
+
     # Shutdown
     logger.info("Shutting down AI Customer Support API")
+    await close_conversation_engine()
+    await close_whatsapp_adapter()
+    await close_qdrant_client()
 
 
 def create_app() -> FastAPI:
@@ -71,6 +103,7 @@ def create_app() -> FastAPI:
         docs_url="/docs" if settings.is_development else None,
         redoc_url="/redoc" if settings.is_development else None,
         lifespan=lifespan,
+        default_response_class=ORJSONResponse,
     )
 
     # CORS middleware
@@ -92,7 +125,7 @@ def create_app() -> FastAPI:
             message=exc.message,
             details=exc.details,
         )
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=status.HTTP_400_BAD_REQUEST,
             content={
                 "error": exc.code,
@@ -105,7 +138,7 @@ def create_app() -> FastAPI:
     async def general_exception_handler(request: Request, exc: Exception) -> JSONResponse:
         """Handle unexpected exceptions."""
         logger.error("Unhandled exception", error=str(exc), exc_info=True)
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             content={
                 "error": "INTERNAL_ERROR",
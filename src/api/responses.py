@@ -0,0 +1,36 @@
+"""Custom response classes."""
+
+from typing import Any
+
+import orjson
+from fastapi import status
+from fastapi.responses import JSONResponse, Response
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson instead of the stdlib encoder.
+
+    orjson serializes datetimes, enums and dataclasses natively, so routes
+    can return them without converting each value first.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class AckResponse(Response):
+    """Empty 200 response used to acknowledge webhooks.
+
+    A single shared instance is not safe: FastAPI attaches the request's
+    background tasks to a returned response and middleware may append
+    headers. Instead each instance skips Response.__init__ and copies
+    precomputed headers.
+    """
+
+    _ACK_HEADERS = ((b"content-length", b"0"),)
+
+    def __init__(self) -> None:
+        self.status_code = status.HTTP_200_OK
+        self.body = b""
+        self.background = None
+        self.raw_headers = list(self._ACK_HEADERS)
@@ -7,13 +7,45 @@ from fastapi import APIRouter, HTTPException, status
 from pydantic import BaseModel
 
 from src.api.dependencies import EngineDep, RAGDep, StorageDep
+from src.api.responses import ORJSONResponse
 from src.models import Tenant, TenantConfig, TenantStatus
+from src.storage.base import StorageBackend
+from src.storage.tenant_cache import get_tenant_cached, tenant_cache
 
 logger = structlog.get_logger()
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
 
+async def _require_tenant(
+    tenant_id: str,
+    storage: StorageBackend,
+    use_cache: bool = True,
+) -> Tenant:
+    """Get a tenant or raise 404.
+
+    Args:
+        tenant_id: Tenant ID
+        storage: Storage backend
+        use_cache: Serve from the tenant cache if possible; pass False
+            before modifying the tenant
+
+    Returns:
+        Tenant object
+    """
+    if use_cache:
+        tenant = await get_tenant_cached(storage, tenant_id)
+    else:
+        tenant = await storage.get_tenant(tenant_id)
+
+    if not tenant:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Tenant not found: {tenant_id}",
+        )
+    return tenant
+
+
 # ==================== Pydantic Schemas ====================
 
 
@@ -38,6 +70,12 @@ class TenantUpdate(BaseModel):
     handoff_keywords: list[str] | None = None
 
 
+# TenantUpdate fields that live on the tenant's config rather than the tenant
+TENANT_CONFIG_FIELDS = frozenset(
+    {"welcome_message", "system_prompt", "enable_auto_handoff", "handoff_keywords"}
+)
+
+
 class DocumentIngest(BaseModel):
     """Schema for ingesting documents."""
 
@@ -87,6 +125,7 @@ async def create_tenant(
     )
 
     await storage.save_tenant(tenant)
+    tenant_cache.set(tenant.id, tenant)
 
     logger.info("Created tenant", tenant_id=tenant.id)
 
@@ -108,13 +147,7 @@ async def get_tenant(
     storage: StorageDep,
 ) -> Tenant:
     """Get a specific tenant."""
-    tenant = await storage.get_tenant(tenant_id)
-    if not tenant:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Tenant not found: {tenant_id}",
-        )
-    return tenant
+    return await _require_tenant(tenant_id, storage)
 
 
 @router.patch("/tenants/{tenant_id}", response_model=TenantResponse)
@@ -124,28 +157,16 @@ async def update_tenant(
     storage: StorageDep,
 ) -> Tenant:
     """Update a tenant."""
-    tenant = await storage.get_tenant(tenant_id)
-    if not tenant:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Tenant not found: {tenant_id}",
-        )
+    tenant = await _require_tenant(tenant_id, storage, use_cache=False)
 
-    # Update fields
-    if data.name is not None:
-        tenant.name = data.name
-    if data.status is not None:
-        tenant.status = data.status
-    if data.welcome_message is not None:
-        tenant.config.welcome_message = data.welcome_message
-    if data.system_prompt is not None:
-        tenant.config.system_prompt = data.system_prompt
-    if data.enable_auto_handoff is not None:
-        tenant.config.enable_auto_handoff = data.enable_auto_handoff
-    if data.handoff_keywords is not None:
-        tenant.config.handoff_keywords = data.handoff_keywords
+    # Apply only the fields the client sent; None leaves a field unchanged
+    patch = data.model_dump(exclude_unset=True, exclude_none=True)
+    for field, value in patch.items():
+        target = tenant.config if field in TENANT_CONFIG_FIELDS else tenant
+        setattr(target, field, value)
 
     await storage.save_tenant(tenant)
+    tenant_cache.set(tenant_id, tenant)
 
     logger.info("Updated tenant", tenant_id=tenant_id)
 
@@ -159,18 +180,14 @@ async def delete_tenant(
     rag: RAGDep,
 ) -> None:
     """Delete a tenant and all associated data."""
-    tenant = await storage.get_tenant(tenant_id)
-    if not tenant:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Tenant not found: {tenant_id}",
-        )
+    await _require_tenant(tenant_id, storage)
 
     # Delete from vector store
     await rag.vector_store.delete_by_tenant(tenant_id)
 
     # Delete tenant
     await storage.delete_tenant(tenant_id)
+    tenant_cache.invalidate(tenant_id)
 
     logger.info("Deleted tenant", tenant_id=tenant_id)
 
@@ -187,12 +204,7 @@ async def ingest_knowledge(
 ) -> dict[str, Any]:
     """Ingest documents into tenant's knowledge base."""
     # Verify tenant exists
-    tenant = await storage.get_tenant(tenant_id)
-    if not tenant:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Tenant not found: {tenant_id}",
-        )
+    await _require_tenant(tenant_id, storage)
 
     # Add to knowledge base
     doc_ids = await rag.add_to_knowledge_base(
@@ -224,12 +236,7 @@ async def search_knowledge(
 ) -> dict[str, Any]:
     """Search tenant's knowledge base."""
     # Verify tenant exists
-    tenant = await storage.get_tenant(tenant_id)
-    if not tenant:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Tenant not found: {tenant_id}",
-        )
+    await _require_tenant(tenant_id, storage)
 
     results = await rag.retrieve_kb_only(
         query=query,
@@ -260,7 +267,7 @@ async def list_conversations(
     storage: StorageDep,
     status_filter: str | None = None,
     limit: int = 50,
-) -> dict[str, Any]:
+) -> ORJSONResponse:
     """List conversations for a tenant."""
     conversations = await storage.list_conversations(
         tenant_id=tenant_id,
@@ -268,7 +275,9 @@ async def list_conversations(
         limit=limit,
     )
 
-    return {
+    # Returned directly so orjson encodes the datetimes and enums itself,
+    # skipping FastAPI's jsonable_encoder pass
+    return ORJSONResponse({
         "tenant_id": tenant_id,
         "count": len(conversations),
         "conversations": [
@@ -278,12 +287,12 @@ async def list_conversations(
                 "status": c.status,
                 "channel": c.channel,
                 "message_count": c.message_count,
-                "created_at": c.created_at.isoformat(),
-                "updated_at": c.updated_at.isoformat(),
+                "created_at": c.created_at,
+                "updated_at": c.updated_at,
             }
             for c in conversations
         ],
-    }
+    })
 
 
 @router.get("/tenants/{tenant_id}/conversations/{conversation_id}/messages")
@@ -292,7 +301,7 @@ async def get_conversation_messages(
     conversation_id: str,
     storage: StorageDep,
     limit: int = 50,
-) -> dict[str, Any]:
+) -> ORJSONResponse:
     """Get messages for a conversation."""
     conversation = await storage.get_conversation(conversation_id)
     if not conversation or conversation.tenant_id != tenant_id:
@@ -303,7 +312,7 @@ async def get_conversation_messages(
 
     messages = await storage.get_messages(conversation_id, limit=limit)
 
-    return {
+    return ORJSONResponse({
         "conversation_id": conversation_id,
         "count": len(messages),
         "messages": [
@@ -312,8 +321,8 @@ async def get_conversation_messages(
                 "content": m.content,
                 "direction": m.direction,
                 "is_from_bot": m.is_from_bot,
-                "created_at": m.created_at.isoformat(),
+                "created_at": m.created_at,
             }
             for m in messages
         ],
-    }
+    })
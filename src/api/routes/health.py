@@ -1,23 +1,44 @@
 """Health check endpoints."""
 
-from datetime import datetime
+import asyncio
+import time
+from datetime import datetime, timezone
 from typing import Any
 
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Response, status
 
 from src.api.dependencies import RAGDep, StorageDep
 from src.core.config import settings
 
 router = APIRouter(prefix="/health", tags=["Health"])
 
+# Probes may be cached briefly by load balancers
+PROBE_CACHE_CONTROL = "max-age=1"
+
+# Seconds each readiness dependency check may take before it counts as down
+READINESS_CHECK_TIMEOUT = 1.0
+
+# (epoch second, ISO timestamp) reused by all probes within the same second
+_timestamp_cache: tuple[int, str] = (0, "")
+
+
+def _iso_timestamp() -> str:
+    """Get the current UTC time as ISO 8601, at one-second granularity."""
+    global _timestamp_cache
+    now = int(time.time())
+    if now != _timestamp_cache[0]:
+        _timestamp_cache = (now, datetime.fromtimestamp(now, tz=timezone.utc).isoformat())
+    return _timestamp_cache[1]
+
 
 @router.get("")
 @router.get("/")
-async def health_check() -> dict[str, Any]:
+async def health_check(response: Response) -> dict[str, Any]:
     """Basic health check endpoint."""
+    response.headers["Cache-Control"] = PROBE_CACHE_CONTROL
     return {
         "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": _iso_timestamp(),
         "environment": settings.app_env,
     }
 
@@ -28,33 +49,29 @@ async def readiness_check(
     rag: RAGDep,
 ) -> dict[str, Any]:
     """Readiness check - verifies all dependencies are available."""
+    results = await asyncio.gather(
+        asyncio.wait_for(storage.health_check(), timeout=READINESS_CHECK_TIMEOUT),
+        asyncio.wait_for(rag.vector_store.health_check(), timeout=READINESS_CHECK_TIMEOUT),
+        return_exceptions=True,
+    )
+
+    # Failed or timed-out checks come back as exceptions
     checks = {
-        "storage": False,
-        "vector_store": False,
+        "storage": results[0] is True,
+        "vector_store": results[1] is True,
     }
 
-    # Check storage
-    try:
-        checks["storage"] = await storage.health_check()
-    except Exception:
-        pass
-
-    # Check vector store
-    try:
-        checks["vector_store"] = await rag.vector_store.health_check()
-    except Exception:
-        pass
-
     all_healthy = all(checks.values())
 
     return {
         "status": "ready" if all_healthy else "degraded",
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": _iso_timestamp(),
         "checks": checks,
     }
 
 
 @router.get("/live")
-async def liveness_check() -> dict[str, str]:
+async def liveness_check(response: Response) -> dict[str, str]:
     """Liveness check - basic endpoint for kubernetes probes."""
+    response.headers["Cache-Control"] = PROBE_CACHE_CONTROL
     return {"status": "alive"}
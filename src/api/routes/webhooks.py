@@ -1,64 +1,152 @@
 """Webhook endpoints for channel integrations."""
 
-from typing import Annotated, Any
+import asyncio
+from collections.abc import Mapping
+from functools import partial
+from typing import Any
 
 import structlog
-from fastapi import APIRouter, Form, HTTPException, Request, Response, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response
 
 from src.api.dependencies import (
-    EngineDep,
-    HandoffDep,
-    SentimentDep,
-    StorageDep,
-    TwilioAuthDep,
-    WhatsAppDep,
+    get_engine,
+    get_handoff_evaluator,
+    get_sentiment_analyzer,
+    get_storage,
+    get_whatsapp_adapter,
+    read_twilio_form,
+    read_webhook_payloads,
+    verify_twilio_signature,
 )
+from src.api.responses import AckResponse
+from src.core.cache import TTLCache
 from src.core.exceptions import HandoffRequired, TenantNotFound
-from src.models import ConversationStatus, MessageMetadata
+from src.models import HANDOFF_STATUSES, ConversationStatus, IncomingWebhookMessage, MessageMetadata
+from src.services.channels.whatsapp import TwilioWhatsAppAdapter
+from src.services.conversation.engine import ConversationEngine
+from src.services.conversation.handoff import HandoffEvaluator
+from src.services.sentiment.analyzer import SentimentAnalyzer, SentimentResult
+from src.storage.base import StorageBackend
+from src.storage.tenant_cache import get_tenant_cached
 
 logger = structlog.get_logger()
 
 router = APIRouter(prefix="/webhooks", tags=["Webhooks"])
 
+# Twilio retries a webhook it considers failed; remember recent MessageSids
+# so a retried message is not answered twice
+_seen_message_sids: TTLCache[str, bool] = TTLCache(maxsize=100_000, ttl=3600.0)
 
-@router.post("/whatsapp/{tenant_id}")
+
+def _is_status_event(payload: Mapping[str, Any]) -> bool:
+    """Whether a Twilio callback reports delivery status rather than a message."""
+    return "Body" not in payload and ("MessageStatus" in payload or "SmsStatus" in payload)
+
+
+@router.post("/whatsapp/{tenant_id}", dependencies=[Depends(verify_twilio_signature)])
 async def whatsapp_webhook(
     tenant_id: str,
     request: Request,
-    storage: StorageDep,
-    engine: EngineDep,
-    whatsapp: WhatsAppDep,
-    sentiment: SentimentDep,
-    handoff: HandoffDep,
-    # Twilio sends form data
-    From: Annotated[str, Form()] = "",
-    Body: Annotated[str, Form()] = "",
-    MessageSid: Annotated[str, Form()] = "",
-    ProfileName: Annotated[str | None, Form()] = None,
-    NumMedia: Annotated[int, Form()] = 0,
+    background_tasks: BackgroundTasks,
 ) -> Response:
     """Handle incoming WhatsApp messages via Twilio webhook.
 
-    Twilio expects a TwiML response or empty 200.
+    Twilio expects a TwiML response or empty 200. The message is processed
+    after the response is sent, so slow LLM calls don't hold the webhook
+    open or trigger Twilio retries.
+
+    Services are resolved only once the payload is known to be a message,
+    so status callbacks return without touching storage or the pipeline.
+    Relays may post a burst of events as NDJSON; they are processed in
+    one background task, concurrently across users.
     """
     try:
-        # Parse the form data into dict for adapter
-        form_data = await request.form()
-        payload = dict(form_data)
+        payloads = [p for p in await read_webhook_payloads(request) if not _is_status_event(p)]
+        if not payloads:
+            return AckResponse()
 
         # Parse webhook
-        incoming = await whatsapp.parse_webhook(payload)
+        whatsapp = get_whatsapp_adapter()
+        parsed = await whatsapp.parse_webhook_batch(payloads)
+
+    except HTTPException:
+        # A malformed relay body won't parse on retry either
+        raise
+    except Exception as e:
+        logger.error("Error parsing WhatsApp webhook", error=str(e), exc_info=True)
+        # Return 200 to prevent Twilio from retrying on our errors
+        return AckResponse()
+
+    messages: list[tuple[IncomingWebhookMessage, str]] = []
+    for incoming in parsed:
+        message_sid = incoming.external_id or ""
+        if message_sid:
+            if _seen_message_sids.get(message_sid):
+                logger.debug("Duplicate WhatsApp message ignored", message_sid=message_sid)
+                continue
+            _seen_message_sids.set(message_sid, True)
+        messages.append((incoming, message_sid))
+
+    if messages:
+        storage = get_storage()
+        background_tasks.add_task(
+            _process_whatsapp_messages,
+            tenant_id=tenant_id,
+            messages=messages,
+            storage=storage,
+            engine=get_engine(storage),
+            whatsapp=whatsapp,
+            sentiment=get_sentiment_analyzer(),
+            handoff=get_handoff_evaluator(),
+        )
 
-        if not incoming:
-            # Not a message event (could be status callback)
-            return Response(status_code=status.HTTP_200_OK)
+    return AckResponse()
 
+
+async def _process_whatsapp_messages(
+    tenant_id: str,
+    messages: list[tuple[IncomingWebhookMessage, str]],
+    storage: StorageBackend,
+    engine: ConversationEngine,
+    whatsapp: TwilioWhatsAppAdapter,
+    sentiment: SentimentAnalyzer,
+    handoff: HandoffEvaluator,
+) -> None:
+    """Process a webhook's messages, concurrently across users.
+
+    Each user's messages stay sequential so their conversation sees them
+    in arrival order.
+    """
+    by_user: dict[str, list[tuple[IncomingWebhookMessage, str]]] = {}
+    for incoming, message_sid in messages:
+        by_user.setdefault(incoming.user_id, []).append((incoming, message_sid))
+
+    async def process_user(user_messages: list[tuple[IncomingWebhookMessage, str]]) -> None:
+        for incoming, message_sid in user_messages:
+            await _process_whatsapp_message(
+                tenant_id, incoming, message_sid, storage, engine, whatsapp, sentiment, handoff
+            )
+
+    await asyncio.gather(*map(process_user, by_user.values()))
+
+
+async def _process_whatsapp_message(
+    tenant_id: str,
+    incoming: IncomingWebhookMessage,
+    message_sid: str,
+    storage: StorageBackend,
+    engine: ConversationEngine,
+    whatsapp: TwilioWhatsAppAdapter,
+    sentiment: SentimentAnalyzer,
+    handoff: HandoffEvaluator,
+) -> None:
+    """Run the sentiment, handoff and AI response pipeline for a message."""
+    try:
         # Get tenant
-        tenant = await storage.get_tenant(tenant_id)
+        tenant = await get_tenant_cached(storage, tenant_id)
         if not tenant:
             logger.error("Tenant not found for webhook", tenant_id=tenant_id)
-            # Still return 200 to prevent Twilio from retrying
-            return Response(status_code=status.HTTP_200_OK)
+            return
 
         # Get or create conversation
         conversation = await engine.get_or_create_conversation(
@@ -68,18 +156,19 @@ async def whatsapp_webhook(
         )
 
         # Check if conversation is in handoff mode
-        if conversation.status in [ConversationStatus.HANDOFF_ACTIVE, ConversationStatus.HANDOFF_PENDING]:
+        if conversation.status in HANDOFF_STATUSES:
             logger.info(
                 "Message received during handoff, skipping bot response",
                 conversation_id=conversation.id,
             )
-            return Response(status_code=status.HTTP_200_OK)
+            return
 
-        # Analyze sentiment
-        sentiment_result = await sentiment.analyze(incoming.content)
-
-        # Update conversation sentiment
-        conversation.update_sentiment(sentiment_result.score)
+        # Analyze sentiment (short messages come back neutral without an API call)
+        if tenant.config.enable_sentiment_analysis:
+            sentiment_result = await sentiment.analyze(incoming.content)
+            conversation.update_sentiment(sentiment_result.score)
+        else:
+            sentiment_result = SentimentResult(sentiment="NEUTRAL", score=0.0, confidence=0.0)
 
         # Check for handoff triggers
         handoff_decision = await handoff.evaluate(
@@ -93,11 +182,13 @@ async def whatsapp_webhook(
             # Trigger handoff
             conversation.status = ConversationStatus.HANDOFF_PENDING
             conversation.handoff_reason = handoff_decision.reason
-            await storage.save_conversation(conversation)
 
-            # Send handoff message
+            # Save the handoff state and notify the user concurrently
             handoff_message = "I'm connecting you with a human agent who can better assist you. Please hold on a moment."
-            await whatsapp.send_text(incoming.user_id, handoff_message)
+            await asyncio.gather(
+                storage.save_conversation(conversation),
+                whatsapp.send_text(incoming.user_id, handoff_message),
+            )
 
             logger.info(
                 "Handoff triggered",
@@ -106,11 +197,11 @@ async def whatsapp_webhook(
             )
 
             # TODO: Create ticket in Chatwoot
-            return Response(status_code=status.HTTP_200_OK)
+            return
 
         # Process message with AI
         metadata = MessageMetadata(
-            twilio_message_sid=MessageSid,
+            twilio_message_sid=message_sid,
             sentiment_score=sentiment_result.score,
             sentiment_label=sentiment_result.sentiment,
         )
@@ -120,31 +211,26 @@ async def whatsapp_webhook(
             conversation=conversation,
             user_message=incoming.content,
             message_metadata=metadata,
+            # Send response via WhatsApp while the engine persists it
+            deliver=partial(whatsapp.send_text, incoming.user_id),
         )
 
-        # Send response via WhatsApp
-        await whatsapp.send_text(incoming.user_id, response_text)
-
-        logger.info(
+        # Per-message event; debug so it costs nothing at the default level
+        logger.debug(
             "Processed WhatsApp message",
             conversation_id=conversation.id,
             user_id=incoming.user_id,
             response_length=len(response_text),
         )
 
-        return Response(status_code=status.HTTP_200_OK)
-
     except HandoffRequired as e:
         logger.info("Handoff required exception", details=e.details)
-        return Response(status_code=status.HTTP_200_OK)
 
     except Exception as e:
-        logger.error("Error processing WhatsApp webhook", error=str(e), exc_info=True)
-        # Return 200 to prevent Twilio from retrying on our errors
-        return Response(status_code=status.HTTP_200_OK)
+        logger.error("Error processing WhatsApp message", error=str(e), exc_info=True)
 
 
-@router.post("/whatsapp/{tenant_id}/status")
+@router.post("/whatsapp/{tenant_id}/status", dependencies=[Depends(verify_twilio_signature)])
 async def whatsapp_status_callback(
     tenant_id: str,
     request: Request,
@@ -153,7 +239,7 @@ async def whatsapp_status_callback(
 
     Updates message delivery/read status.
     """
-    form_data = await request.form()
+    form_data = dict(await read_twilio_form(request))
     message_sid = form_data.get("MessageSid")
     message_status = form_data.get("MessageStatus")
 
@@ -166,4 +252,4 @@ async def whatsapp_status_callback(
 
     # TODO: Update message status in storage
 
-    return Response(status_code=status.HTTP_200_OK)
+    return AckResponse()
@@ -0,0 +1,12 @@
+"""Wall-clock helpers."""
+
+from datetime import UTC, datetime
+
+
+def utc_now() -> datetime:
+    """Get the current time as a timezone-aware UTC datetime.
+
+    Replaces the deprecated naive `datetime.utcnow()`, so model timestamps
+    compare cleanly with the aware datetimes Firestore returns.
+    """
+    return datetime.now(UTC)
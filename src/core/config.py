@@ -1,6 +1,6 @@
 """Application configuration using Pydantic settings."""
 
-from functools import lru_cache
+from functools import cached_property, lru_cache
 from typing import Literal
 
 from pydantic import Field
@@ -15,6 +15,8 @@ class Settings(BaseSettings):
         env_file_encoding="utf-8",
         case_sensitive=False,
         extra="ignore",
+        # Loaded once at startup; freezing keeps the cached flags below valid
+        frozen=True,
     )
 
     # Application
@@ -22,11 +24,21 @@ class Settings(BaseSettings):
     app_debug: bool = False
     app_host: str = "0.0.0.0"
     app_port: int = 8000
+    # Public scheme and host webhooks are posted to (e.g. https://bot.example.com),
+    # used to rebuild the URL senders sign when behind a TLS-terminating proxy
+    public_base_url: str = ""
 
     # Twilio
     twilio_account_sid: str = ""
     twilio_auth_token: str = ""
     twilio_whatsapp_number: str = ""
+    # Concurrent outbound sends; messages to one recipient always share a worker
+    wa_send_workers: int = 4
+    # Twilio requests each worker keeps in flight, across recipients
+    wa_send_concurrency: int = 8
+    # Shared secret for relays posting NDJSON event bursts; NDJSON webhooks
+    # are refused outside development while it is empty
+    webhook_relay_secret: str = ""
 
     # LLM Providers
     openai_api_key: str = ""
@@ -40,6 +52,11 @@ class Settings(BaseSettings):
     # LiteLLM
     litellm_primary_model: str = "gemini/gemini-1.5-flash"
     litellm_fallback_model: str = "gpt-4o-mini"
+    # Reuse answers to near-duplicate questions asked in an identical context
+    # (low-temperature completions only)
+    llm_semantic_cache_enabled: bool = False
+    llm_semantic_cache_threshold: float = 0.97
+    llm_semantic_cache_ttl: int = 3600
 
     # Embeddings
     # Provider: "google" (free tier, recommended) or "openai" (paid)
@@ -50,6 +67,20 @@ class Settings(BaseSettings):
     openai_embedding_model: str = "text-embedding-3-small"
     # Google models: text-embedding-004 (768d, FREE)
     google_embedding_model: str = "text-embedding-004"
+    # Concurrent Google embedding requests (each embeds up to 100 texts)
+    google_embed_concurrency: int = 8
+    # Single-text embeddings (search queries) arriving within this window
+    # share one API request
+    embedding_batch_window_ms: float = 8.0
+    # SQLite file keeping computed embeddings across restarts (off when unset)
+    embedding_cache_path: str | None = None
+    # Quantization of stored vectors inside Qdrant: "int8" (4x smaller),
+    # "binary" (32x smaller, for 1000+ dimensions) or "none"
+    embedding_quantization: Literal["none", "int8", "binary"] = "int8"
+    # Warm the embedding client at startup and pre-embed frequent search
+    # queries (a JSON list) into the query cache
+    embedding_warmup: bool = False
+    embedding_warmup_queries: list[str] = []
 
     # Qdrant
     qdrant_host: str = "localhost"
@@ -57,6 +88,15 @@ class Settings(BaseSettings):
     qdrant_url: str | None = None
     qdrant_api_key: str = ""
     qdrant_collection_name: str = "knowledge_base"
+    # gRPC is faster than REST for searches and multiplexes over HTTP/2
+    qdrant_prefer_grpc: bool = True
+    qdrant_grpc_port: int = 6334
+    qdrant_timeout: int = 10
+    # Reuse recent search results for near-duplicate queries (cosine similarity
+    # of the query embeddings at or above the threshold)
+    vector_search_cache_enabled: bool = False
+    vector_search_cache_threshold: float = 0.95
+    vector_search_cache_ttl: int = 300
 
     # Firestore
     firestore_emulator_host: str | None = None
@@ -82,23 +122,29 @@ class Settings(BaseSettings):
     # Logging
     log_level: str = "INFO"
     log_format: Literal["json", "text"] = "json"
+    # Keep the full webhook payload on parsed messages (for debugging)
+    store_raw_payloads: bool = False
 
     # Conversation settings
     max_context_messages: int = 10
     session_timeout_minutes: int = 30
     summary_threshold_turns: int = 15
+    # User memory search: HNSW candidate list size (lower is faster, with a
+    # small recall loss) and the time allowed before replying without memories
+    memory_search_ef: int = 32
+    memory_search_timeout_ms: int = 2000
 
     # Handoff triggers
     handoff_sentiment_threshold: float = -0.5
     handoff_confidence_threshold: float = 0.6
     handoff_max_fallbacks: int = 2
 
-    @property
+    @cached_property
     def is_development(self) -> bool:
         """Check if running in development mode."""
         return self.app_env == "development"
 
-    @property
+    @cached_property
     def is_production(self) -> bool:
         """Check if running in production mode."""
         return self.app_env == "production"
@@ -0,0 +1,34 @@
+"""Retrying of transient failures."""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+async def retry_transient(
+    call: Callable[[], Awaitable[T]],
+    transient: tuple[type[BaseException], ...],
+    attempts: int = 2,
+    base_delay: float = 1.0,
+) -> T:
+    """Await a call, retrying transient errors with exponential backoff.
+
+    Any other error is raised at once, as is the last transient error.
+
+    Args:
+        call: Zero-argument coroutine function to await
+        transient: Exception types worth retrying
+        attempts: Total number of attempts
+        base_delay: Seconds before the first retry, doubling after each
+
+    Returns:
+        The call's result
+    """
+    for attempt in range(attempts - 1):
+        try:
+            return await call()
+        except transient:
+            await asyncio.sleep(base_delay * 2**attempt)
+    return await call()
@@ -0,0 +1,129 @@
+"""Semantic caches, matching entries by embedding similarity."""
+
+import hashlib
+import time
+from collections.abc import Awaitable, Callable, Sequence
+from typing import Any, Generic, TypeVar
+
+import numpy as np
+import orjson
+import structlog
+from numpy.typing import NDArray
+
+from src.core.cache import TTLCache
+
+logger = structlog.get_logger()
+
+V = TypeVar("V")
+
+# Entries kept per scope unless configured otherwise; near-duplicates of one
+# question are few
+MAX_ENTRIES_PER_SCOPE = 16
+
+
+class _Scope(Generic[V]):
+    """Unit vectors and values cached under one scope.
+
+    Vectors live in one growing float32 matrix, so a lookup is a single
+    matrix-vector product. Once full, the oldest entry is overwritten.
+    """
+
+    __slots__ = ("vectors", "expires_at", "values", "oldest")
+
+    def __init__(self, dimensions: int) -> None:
+        self.vectors = np.empty((4, dimensions), dtype=np.float32)
+        self.expires_at = np.empty(4, dtype=np.float64)
+        self.values: list[V] = []
+        self.oldest = 0
+
+    def add(self, vector: NDArray[np.float32], value: V, expires_at: float, max_entries: int) -> None:
+        """Store an entry, replacing the oldest once `max_entries` are held."""
+        count = len(self.values)
+        if count < max_entries:
+            if count == len(self.vectors):
+                capacity = min(2 * count, max_entries)
+                self.vectors = np.resize(self.vectors, (capacity, self.vectors.shape[1]))
+                self.expires_at = np.resize(self.expires_at, capacity)
+            self.vectors[count] = vector
+            self.expires_at[count] = expires_at
+            self.values.append(value)
+        else:
+            self.vectors[self.oldest] = vector
+            self.expires_at[self.oldest] = expires_at
+            self.values[self.oldest] = value
+            self.oldest = (self.oldest + 1) % max_entries
+
+    def best(self, vector: NDArray[np.float32], now: float) -> tuple[V, float] | None:
+        """Find the live entry most similar to a unit vector."""
+        count = len(self.values)
+        similarities = self.vectors[:count] @ vector
+        similarities[self.expires_at[:count] <= now] = -np.inf
+        index = int(np.argmax(similarities))
+        if similarities[index] == -np.inf:
+            return None
+        return self.values[index], float(similarities[index])
+
+
+class SemanticCache(Generic[V]):
+    """In-process cache of values for near-duplicate texts.
+
+    A value is reused only within the same scope, and only when the new
+    text's embedding has at least `threshold` cosine similarity to a
+    cached one. Anything else that shapes the value must therefore be
+    part of the scope.
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[str], Awaitable[Sequence[float]]] | None = None,
+        threshold: float = 0.97,
+        ttl: float = 3600.0,
+        max_scopes: int = 1024,
+        max_entries_per_scope: int = MAX_ENTRIES_PER_SCOPE,
+    ) -> None:
+        self.embed = embed
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries_per_scope = max_entries_per_scope
+        self._scopes: TTLCache[bytes, _Scope[V]] = TTLCache(maxsize=max_scopes, ttl=ttl)
+
+    @staticmethod
+    def scope_key(*parts: Any) -> bytes:
+        """Hash everything besides the text that the value depends on."""
+        return hashlib.blake2b(orjson.dumps(parts), digest_size=16).digest()
+
+    @staticmethod
+    def normalize(vector: Sequence[float]) -> NDArray[np.float32]:
+        """Scale a vector to unit length, so a dot product is the cosine."""
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
+
+    async def embed_question(self, question: str) -> NDArray[np.float32] | None:
+        """Embed a text for lookup, or None if embedding fails."""
+        try:
+            return self.normalize(await self.embed(question))
+        except Exception as e:
+            logger.debug("Semantic cache embedding failed", error=str(e))
+            return None
+
+    def get(self, scope: bytes, vector: NDArray[np.float32]) -> tuple[V, float] | None:
+        """Find the most similar cached value in a scope.
+
+        Returns:
+            The cached value and its similarity, or None below the threshold
+        """
+        entries = self._scopes.get(scope)
+        if entries is None:
+            return None
+
+        hit = entries.best(vector, time.monotonic())
+        if hit is None or hit[1] < self.threshold:
+            return None
+        return hit
+
+    def set(self, scope: bytes, vector: NDArray[np.float32], value: V) -> None:
+        """Cache a value for a text, dropping the oldest if the scope is full."""
+        entries = self._scopes.get(scope) or _Scope(len(vector))
+        entries.add(vector, value, time.monotonic() + self.ttl, self.max_entries_per_scope)
+        self._scopes.set(scope, entries)
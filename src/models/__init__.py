@@ -1,6 +1,8 @@
 """Data models for the application."""
 
 from src.models.conversation import (
+    HANDOFF_STATUSES,
+    OPEN_STATUSES,
     Conversation,
     ConversationContext,
     ConversationStatus,
@@ -8,10 +10,12 @@ from src.models.conversation import (
 )
 from src.models.message import (
     ChannelType,
+    IncomingWebhookMessage,
     Message,
     MessageDirection,
     MessageMetadata,
     MessageType,
+    OutgoingMessage,
 )
 from src.models.tenant import Tenant, TenantConfig, TenantStatus
 
@@ -25,10 +29,14 @@ __all__ = [
     "ConversationContext",
     "ConversationStatus",
     "ConversationSummary",
+    "HANDOFF_STATUSES",
+    "OPEN_STATUSES",
     # Message
     "Message",
     "MessageDirection",
     "MessageType",
     "MessageMetadata",
     "ChannelType",
+    "IncomingWebhookMessage",
+    "OutgoingMessage",
 ]
@@ -4,7 +4,25 @@ from datetime import datetime
 from enum import Enum
 from typing import Any
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+from src.core.cache import TTLCache
+from src.core.clock import utc_now
+
+# Number of recent sentiment scores kept per conversation
+SENTIMENT_WINDOW = 10
+
+# Linear recency weights (oldest score weighs 1) and their running totals
+_SENTIMENT_WEIGHTS = tuple(range(1, SENTIMENT_WINDOW + 1))
+_SENTIMENT_WEIGHT_TOTALS = tuple(n * (n + 1) // 2 for n in range(1, SENTIMENT_WINDOW + 1))
+
+# Number of latest sentiment scores whose running sum is kept, for
+# detecting sustained negative sentiment
+RECENT_SENTIMENT_WINDOW = 3
+
+# Number of summaries kept on the conversation document; older ones remain
+# searchable in the vector store as user memory
+MAX_SUMMARIES = 5
 
 
 class ConversationStatus(str, Enum):
@@ -17,23 +35,42 @@ class ConversationStatus(str, Enum):
     EXPIRED = "expired"  # Session timeout
 
 
+# Statuses in which a human agent owns the conversation
+HANDOFF_STATUSES = frozenset({ConversationStatus.HANDOFF_PENDING, ConversationStatus.HANDOFF_ACTIVE})
+
+# Statuses of conversations that are still open for new messages
+OPEN_STATUSES = frozenset({ConversationStatus.ACTIVE, *HANDOFF_STATUSES})
+
+
 class ConversationSummary(BaseModel):
     """Compressed summary of conversation history for long-term memory."""
 
+    model_config = ConfigDict(defer_build=True)
+
     summary_text: str
     key_topics: list[str] = Field(default_factory=list)
     user_preferences: dict[str, Any] = Field(default_factory=dict)
     unresolved_issues: list[str] = Field(default_factory=list)
     sentiment_trend: str = "neutral"  # positive, neutral, negative
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
     message_range: tuple[int, int] = (0, 0)  # Start and end message indices
 
 
+# Formatted prompt contexts keyed by their knowledge base and summary text;
+# nearby turns of a conversation usually retrieve the same documents
+_prompt_contexts: TTLCache[tuple[tuple[str, ...], tuple[str, ...]], str] = TTLCache(
+    maxsize=512, ttl=600.0
+)
+
+
 class ConversationContext(BaseModel):
     """Context information passed to the LLM."""
 
+    model_config = ConfigDict(defer_build=True)
+
     # From RAG
     knowledge_base_context: list[str] = Field(default_factory=list)
+    knowledge_base_ids: list[str] = Field(default_factory=list)  # Sources of the context above
 
     # From memory
     recent_messages: list[dict[str, str]] = Field(default_factory=list)
@@ -53,28 +90,46 @@ class ConversationContext(BaseModel):
     fallback_count: int = 0
 
     def to_prompt_context(self) -> str:
-        """Format context for LLM prompt."""
-        parts = []
+        """Format context for LLM prompt.
+
+        The result is reused for identical knowledge base and summary
+        sections, so long retrieved documents are not re-formatted every
+        turn. Contexts with user preferences are always formatted fresh.
+        """
+        if self.user_preferences:
+            return self._format_prompt_context()
+
+        key = (tuple(self.knowledge_base_context), tuple(self.conversation_summaries))
+        formatted = _prompt_contexts.get(key)
+        if formatted is None:
+            formatted = self._format_prompt_context()
+            _prompt_contexts.set(key, formatted)
+        return formatted
+
+    def _format_prompt_context(self) -> str:
+        """Render the prompt context sections."""
+        parts: list[str] = []
 
         if self.knowledge_base_context:
             parts.append("## Relevant Information from Knowledge Base:")
-            for i, ctx in enumerate(self.knowledge_base_context, 1):
-                parts.append(f"{i}. {ctx}")
+            parts.extend(f"{i}. {ctx}" for i, ctx in enumerate(self.knowledge_base_context, 1))
 
         if self.conversation_summaries:
             parts.append("\n## Previous Conversation Summary:")
-            for summary in self.conversation_summaries:
-                parts.append(summary)
+            parts.extend(self.conversation_summaries)
 
         if self.user_preferences:
             parts.append(f"\n## User Preferences: {self.user_preferences}")
 
-        return "\n".join(parts) if parts else ""
+        # Joined once into the final string; an empty context yields ""
+        return "\n".join(parts)
 
 
 class Conversation(BaseModel):
     """Main conversation model representing a chat session."""
 
+    model_config = ConfigDict(defer_build=True)
+
     id: str = Field(..., description="Unique conversation identifier")
     tenant_id: str = Field(..., description="Tenant this conversation belongs to")
     user_id: str = Field(..., description="External user identifier (e.g., WhatsApp ID)")
@@ -84,8 +139,8 @@ class Conversation(BaseModel):
     channel: str = "whatsapp"
 
     # Timestamps
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
+    updated_at: datetime = Field(default_factory=utc_now)
     last_message_at: datetime | None = None
 
     # WhatsApp 24h window tracking
@@ -100,9 +155,11 @@ class Conversation(BaseModel):
     # Sentiment tracking
     average_sentiment: float = 0.0
     sentiment_history: list[float] = Field(default_factory=list)
+    recent_sentiment_sum: float = 0.0  # Sum of the last RECENT_SENTIMENT_WINDOW scores
 
     # Memory
     summaries: list[ConversationSummary] = Field(default_factory=list)
+    last_summarized_index: int = 0  # message_count covered by the latest summary
 
     # Handoff
     handoff_reason: str | None = None
@@ -112,24 +169,36 @@ class Conversation(BaseModel):
     # Metadata
     metadata: dict[str, Any] = Field(default_factory=dict)
 
+    def model_post_init(self, __context: Any) -> None:
+        """Post-initialization hook."""
+        # Conversations stored before last_summarized_index existed
+        if self.summaries and not self.last_summarized_index:
+            self.last_summarized_index = self.summaries[-1].message_range[1]
+        # Conversations stored before recent_sentiment_sum existed
+        if self.sentiment_history and not self.recent_sentiment_sum:
+            self.recent_sentiment_sum = sum(self.sentiment_history[-RECENT_SENTIMENT_WINDOW:])
+
     def is_within_session_window(self, window_hours: int = 24) -> bool:
         """Check if conversation is within WhatsApp's session window."""
         if not self.last_user_message_at:
             return False
-        elapsed = datetime.utcnow() - self.last_user_message_at
+        elapsed = utc_now() - self.last_user_message_at
         return elapsed.total_seconds() < (window_hours * 3600)
 
     def update_sentiment(self, new_score: float) -> None:
         """Update sentiment tracking with new score."""
-        self.sentiment_history.append(new_score)
-        # Keep last 10 sentiment scores
-        if len(self.sentiment_history) > 10:
-            self.sentiment_history = self.sentiment_history[-10:]
+        history = self.sentiment_history
+        history.append(new_score)
+        # Slide the recent window: add the new score, drop the one leaving it
+        self.recent_sentiment_sum += new_score
+        if len(history) > RECENT_SENTIMENT_WINDOW:
+            self.recent_sentiment_sum -= history[-RECENT_SENTIMENT_WINDOW - 1]
+        # Keep last SENTIMENT_WINDOW sentiment scores, trimming in place
+        if len(history) > SENTIMENT_WINDOW:
+            del history[:-SENTIMENT_WINDOW]
         # Calculate weighted average (recent scores matter more)
-        weights = list(range(1, len(self.sentiment_history) + 1))
-        total_weight = sum(weights)
-        weighted_sum = sum(s * w for s, w in zip(self.sentiment_history, weights))
-        self.average_sentiment = weighted_sum / total_weight
+        weighted_sum = sum(s * w for s, w in zip(history, _SENTIMENT_WEIGHTS))
+        self.average_sentiment = weighted_sum / _SENTIMENT_WEIGHT_TOTALS[len(history) - 1]
 
     def increment_fallback(self) -> int:
         """Increment fallback counter and return new count."""
@@ -138,8 +207,12 @@ class Conversation(BaseModel):
 
     def should_summarize(self, threshold: int = 15) -> bool:
         """Check if conversation should be summarized."""
-        last_summarized = 0
-        if self.summaries:
-            last_summarized = self.summaries[-1].message_range[1]
-        messages_since_summary = self.message_count - last_summarized
-        return messages_since_summary >= threshold
+        return self.message_count - self.last_summarized_index >= threshold
+
+    def add_summary(self, summary: ConversationSummary) -> None:
+        """Record a new summary, keeping only the latest MAX_SUMMARIES."""
+        summaries = self.summaries
+        summaries.append(summary)
+        if len(summaries) > MAX_SUMMARIES:
+            del summaries[:-MAX_SUMMARIES]
+        self.last_summarized_index = summary.message_range[1]
@@ -4,7 +4,9 @@ from datetime import datetime
 from enum import Enum
 from typing import Any
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+from src.core.clock import utc_now
 
 
 class ChannelType(str, Enum):
@@ -23,6 +25,13 @@ class MessageDirection(str, Enum):
     OUTBOUND = "outbound"  # To user
 
 
+# Speaker prefix per direction for plain-text transcripts
+_TRANSCRIPT_PREFIXES = {
+    MessageDirection.INBOUND: "User: ",
+    MessageDirection.OUTBOUND: "Assistant: ",
+}
+
+
 class MessageType(str, Enum):
     """Type of message content."""
 
@@ -39,6 +48,8 @@ class MessageType(str, Enum):
 class MessageMetadata(BaseModel):
     """Channel-specific message metadata."""
 
+    model_config = ConfigDict(defer_build=True)
+
     # Twilio/WhatsApp specific
     twilio_message_sid: str | None = None
     whatsapp_message_id: str | None = None
@@ -70,6 +81,8 @@ class MessageMetadata(BaseModel):
 class Message(BaseModel):
     """Universal message model for all channels."""
 
+    model_config = ConfigDict(defer_build=True)
+
     id: str = Field(..., description="Unique message identifier")
     conversation_id: str = Field(..., description="Parent conversation ID")
     tenant_id: str = Field(..., description="Tenant ID")
@@ -87,8 +100,11 @@ class Message(BaseModel):
     user_name: str | None = None
     user_phone: str | None = None
 
+    # 0-based index within the conversation (message_count before this message)
+    position: int | None = None
+
     # Timestamps
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
     delivered_at: datetime | None = None
     read_at: datetime | None = None
 
@@ -112,10 +128,16 @@ class Message(BaseModel):
         else:
             return {"role": "assistant", "content": self.content}
 
+    def to_transcript_line(self) -> str:
+        """Format as a "Speaker: text" transcript line."""
+        return _TRANSCRIPT_PREFIXES[self.direction] + self.content
+
 
 class IncomingWebhookMessage(BaseModel):
     """Normalized incoming message from any webhook."""
 
+    model_config = ConfigDict(defer_build=True)
+
     # Required fields
     channel: ChannelType
     user_id: str  # Channel-specific user ID
@@ -130,7 +152,8 @@ class IncomingWebhookMessage(BaseModel):
     tenant_id: str | None = None  # May be determined by webhook path
 
     # Channel-specific data
-    raw_payload: dict[str, Any] = Field(default_factory=dict)
+    external_id: str | None = None  # Channel's message ID (e.g. Twilio MessageSid)
+    raw_payload: dict[str, Any] = Field(default_factory=dict)  # Only kept when enabled
 
     # Media (if applicable)
     media_url: str | None = None
@@ -140,6 +163,8 @@ class IncomingWebhookMessage(BaseModel):
 class OutgoingMessage(BaseModel):
     """Message to be sent to user."""
 
+    model_config = ConfigDict(defer_build=True)
+
     content: str
     message_type: MessageType = MessageType.TEXT
     recipient_id: str
@@ -1,10 +1,38 @@
 """Tenant models for multi-tenancy support."""
 
+import sys
 from datetime import datetime
 from enum import Enum
+from functools import lru_cache
 from typing import Any
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+from src.core.clock import utc_now
+
+
+@lru_cache(maxsize=1024)
+def default_system_prompt(company_name: str) -> str:
+    """Build the default system prompt for a company.
+
+    Cached and interned so every tenant load reuses one string, which also
+    keeps the prompt prefix byte-identical for provider prompt caching.
+    """
+    return sys.intern(f"""You are a helpful customer support assistant for {company_name}.
+
+Your role is to:
+- Answer questions about products, services, and policies
+- Help resolve customer issues
+- Provide accurate information based on the knowledge base
+- Be polite, professional, and empathetic
+
+Guidelines:
+- If you don't know the answer, say so honestly and offer to connect with a human agent
+- Never make up information
+- Keep responses concise but helpful
+- If the customer seems frustrated, acknowledge their feelings
+
+Always respond in the same language the customer uses.""")
 
 
 class TenantStatus(str, Enum):
@@ -19,6 +47,8 @@ class TenantStatus(str, Enum):
 class TenantConfig(BaseModel):
     """Tenant-specific configuration."""
 
+    model_config = ConfigDict(defer_build=True)
+
     # Branding
     company_name: str
     welcome_message: str = "Hello! How can I help you today?"
@@ -54,14 +84,16 @@ class TenantConfig(BaseModel):
 class Tenant(BaseModel):
     """Tenant (customer organization) model."""
 
+    model_config = ConfigDict(defer_build=True)
+
     id: str = Field(..., description="Unique tenant identifier")
     name: str = Field(..., description="Tenant display name")
     status: TenantStatus = TenantStatus.TRIAL
     config: TenantConfig
 
     # Timestamps
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
+    updated_at: datetime = Field(default_factory=utc_now)
 
     # Usage tracking
     total_conversations: int = 0
@@ -84,26 +116,14 @@ class Tenant(BaseModel):
 
     def _default_system_prompt(self) -> str:
         """Generate default system prompt for the tenant."""
-        return f"""You are a helpful customer support assistant for {self.config.company_name}.
-
-Your role is to:
-- Answer questions about products, services, and policies
-- Help resolve customer issues
-- Provide accurate information based on the knowledge base
-- Be polite, professional, and empathetic
-
-Guidelines:
-- If you don't know the answer, say so honestly and offer to connect with a human agent
-- Never make up information
-- Keep responses concise but helpful
-- If the customer seems frustrated, acknowledge their feelings
-
-Always respond in the same language the customer uses."""
+        return default_system_prompt(self.config.company_name)
 
 
 class TenantUsageStats(BaseModel):
     """Tenant usage statistics for billing/monitoring."""
 
+    model_config = ConfigDict(defer_build=True)
+
     tenant_id: str
     period_start: datetime
     period_end: datetime
@@ -1,12 +1,15 @@
 """Twilio WhatsApp channel adapter."""
 
+import asyncio
+import base64
 import hmac
 import hashlib
-from typing import Any
+import logging
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
 from urllib.parse import urlencode
 
 import structlog
-from twilio.rest import Client as TwilioClient
 from twilio.base.exceptions import TwilioRestException
 
 from src.core.config import settings
@@ -14,7 +17,35 @@ from src.core.exceptions import ChannelError
 from src.models import ChannelType, IncomingWebhookMessage, MessageType, OutgoingMessage
 from src.services.channels.base import ChannelAdapter
 
+if TYPE_CHECKING:
+    from twilio.rest import Client as TwilioClient
+
 logger = structlog.get_logger()
+# Same stdlib logger structlog writes to; checked before building costly debug fields
+_stdlib_logger = logging.getLogger(__name__)
+
+# Message type by the major part of a media MIME type; anything else is a document
+_MEDIA_MESSAGE_TYPES = {
+    "image": MessageType.IMAGE,
+    "audio": MessageType.AUDIO,
+    "video": MessageType.VIDEO,
+}
+
+# Seconds before a Twilio API request is abandoned; requests has no default
+TWILIO_HTTP_TIMEOUT = 10.0
+
+
+@lru_cache(maxsize=4096)
+def _whatsapp_address(number: str) -> str:
+    """Format a phone number as a Twilio WhatsApp address.
+
+    Cached because replies go to the same few active users over and over.
+    """
+    return number if number.startswith("whatsapp:") else f"whatsapp:{number}"
+
+
+# A send waiting for a worker: the message and the future its caller awaits
+_QueuedSend = tuple[OutgoingMessage, "asyncio.Future[dict[str, Any]]"]
 
 
 class TwilioWhatsAppAdapter(ChannelAdapter):
@@ -22,7 +53,7 @@ class TwilioWhatsAppAdapter(ChannelAdapter):
 
     Handles:
     - Webhook parsing for incoming WhatsApp messages
-    - Sending messages via Twilio API
+    - Sending messages via Twilio API, through a pool of send workers
     - Webhook signature validation
     """
 
@@ -31,15 +62,43 @@ class TwilioWhatsAppAdapter(ChannelAdapter):
         account_sid: str | None = None,
         auth_token: str | None = None,
         whatsapp_number: str | None = None,
+        send_workers: int | None = None,
+        send_concurrency: int | None = None,
     ) -> None:
         self.account_sid = account_sid or settings.twilio_account_sid
         self.auth_token = auth_token or settings.twilio_auth_token
         self.whatsapp_number = whatsapp_number or settings.twilio_whatsapp_number
-
-        self._client: TwilioClient | None = None
+        self.send_workers = max(1, send_workers or settings.wa_send_workers)
+        self.send_concurrency = max(1, send_concurrency or settings.wa_send_concurrency)
+
+        self._client: "TwilioClient | None" = None
+        # Parameters shared by every send, copied per message
+        self._base_params: dict[str, Any] = {"from_": self.whatsapp_number}
+
+        # One outbound queue per worker, started on the first send in a loop
+        self._send_queues: list[asyncio.Queue[_QueuedSend]] = []
+        self._send_tasks: list[asyncio.Task[None]] = []
+        self._send_loop: asyncio.AbstractEventLoop | None = None
+
+        # Keyed HMAC prepared once; validation copies it instead of re-deriving the key pads
+        self._signature_hmac = (
+            hmac.new(self.auth_token.encode("utf-8"), digestmod=hashlib.sha1)
+            if self.auth_token
+            else None
+        )
 
         if self.account_sid and self.auth_token:
-            self._client = TwilioClient(self.account_sid, self.auth_token)
+            # Imported here: the Twilio REST package is slow to import
+            from twilio.http.http_client import TwilioHttpClient
+            from twilio.rest import Client as TwilioClient
+
+            # One pooled keep-alive session for every send, so consecutive
+            # messages reuse a warm TLS connection to the Twilio API
+            self._client = TwilioClient(
+                self.account_sid,
+                self.auth_token,
+                http_client=TwilioHttpClient(pool_connections=True, timeout=TWILIO_HTTP_TIMEOUT),
+            )
             logger.info("Twilio WhatsApp adapter initialized")
         else:
             logger.warning("Twilio credentials not configured")
@@ -48,7 +107,7 @@ class TwilioWhatsAppAdapter(ChannelAdapter):
     def channel_name(self) -> str:
         return "whatsapp"
 
-    def _get_client(self) -> TwilioClient:
+    def _get_client(self) -> "TwilioClient":
         """Get Twilio client, raising error if not configured."""
         if self._client is None:
             raise ChannelError(
@@ -71,7 +130,8 @@ class TwilioWhatsAppAdapter(ChannelAdapter):
         # Check if this is a message event
         message_sid = payload.get("MessageSid")
         if not message_sid:
-            logger.debug("Webhook is not a message event", payload_keys=list(payload.keys()))
+            if _stdlib_logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Webhook is not a message event", payload_keys=list(payload))
             return None
 
         # Extract sender info
@@ -97,14 +157,8 @@ class TwilioWhatsAppAdapter(ChannelAdapter):
             media_url = payload.get("MediaUrl0")
             media_content_type = payload.get("MediaContentType0", "")
 
-            if media_content_type.startswith("image/"):
-                message_type = MessageType.IMAGE
-            elif media_content_type.startswith("audio/"):
-                message_type = MessageType.AUDIO
-            elif media_content_type.startswith("video/"):
-                message_type = MessageType.VIDEO
-            else:
-                message_type = MessageType.DOCUMENT
+            major_type = media_content_type.partition("/")[0]
+            message_type = _MEDIA_MESSAGE_TYPES.get(major_type, MessageType.DOCUMENT)
 
         # Get user name if available (from profile)
         user_name = payload.get("ProfileName")
@@ -118,7 +172,8 @@ class TwilioWhatsAppAdapter(ChannelAdapter):
             user_phone=user_id,
             media_url=media_url,
             media_content_type=media_content_type,
-            raw_payload=payload,
+            external_id=message_sid,
+            raw_payload=payload if settings.store_raw_payloads else {},
         )
 
         logger.info(
@@ -130,43 +185,113 @@ class TwilioWhatsAppAdapter(ChannelAdapter):
 
         return incoming_message
 
+    async def parse_webhook_batch(
+        self,
+        payloads: list[dict[str, Any]],
+    ) -> list[IncomingWebhookMessage]:
+        """Parse several webhook payloads, keeping only message events.
+
+        Args:
+            payloads: Twilio webhook payloads, in arrival order
+
+        Returns:
+            Parsed messages, in the same order
+        """
+        parsed = [await self.parse_webhook(payload) for payload in payloads]
+        return [message for message in parsed if message is not None]
+
     async def send_message(self, message: OutgoingMessage) -> dict[str, Any]:
         """Send a WhatsApp message via Twilio.
 
+        The message is queued for a send worker, so concurrent callers
+        share a bounded number of in-flight Twilio requests (workers times
+        per-worker concurrency). Messages to the same recipient are sent in
+        the order they were queued.
+
         Args:
             message: OutgoingMessage to send
 
         Returns:
             Dict with message SID and status
         """
+        # Fail fast rather than queueing a send that cannot happen
+        self._get_client()
+
+        future: asyncio.Future[dict[str, Any]] = asyncio.get_running_loop().create_future()
+        self._send_queue_for(message.recipient_id).put_nowait((message, future))
+        return await future
+
+    def _send_queue_for(self, recipient_id: str) -> "asyncio.Queue[_QueuedSend]":
+        """Get the queue for a recipient, starting the workers if needed."""
+        loop = asyncio.get_running_loop()
+        if self._send_loop is not loop:
+            # First send, or the workers belonged to a loop that has since closed
+            self._send_loop = loop
+            self._send_queues = [asyncio.Queue() for _ in range(self.send_workers)]
+            self._send_tasks = [
+                loop.create_task(self._send_worker(queue)) for queue in self._send_queues
+            ]
+        return self._send_queues[hash(recipient_id) % len(self._send_queues)]
+
+    async def _send_worker(self, queue: "asyncio.Queue[_QueuedSend]") -> None:
+        """Send queued messages, taking everything that piled up per wake-up.
+
+        Recipients are served concurrently, up to `send_concurrency`
+        Twilio requests at a time.
+        """
+        limit = asyncio.Semaphore(self.send_concurrency)
+        while True:
+            batch = [await queue.get()]
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+
+            by_recipient: dict[str, list[_QueuedSend]] = {}
+            for item in batch:
+                by_recipient.setdefault(item[0].recipient_id, []).append(item)
+
+            try:
+                await asyncio.gather(
+                    *(self._send_in_order(items, limit) for items in by_recipient.values())
+                )
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _send_in_order(self, items: list[_QueuedSend], limit: asyncio.Semaphore) -> None:
+        """Send one recipient's messages sequentially, resolving each caller."""
+        for message, future in items:
+            if future.done():
+                # Caller was cancelled before its turn
+                continue
+            try:
+                async with limit:
+                    result = await self._send_now(message)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+
+    async def _send_now(self, message: OutgoingMessage) -> dict[str, Any]:
+        """Send a message through the Twilio API immediately."""
         client = self._get_client()
 
-        # Format recipient as WhatsApp number
-        to_number = message.recipient_id
-        if not to_number.startswith("whatsapp:"):
-            to_number = f"whatsapp:{to_number}"
+        to_number = _whatsapp_address(message.recipient_id)
 
         try:
-            # Build message parameters
-            params: dict[str, Any] = {
-                "from_": self.whatsapp_number,
-                "to": to_number,
-            }
-
-            # Handle template messages
-            if message.template_name:
-                # For template messages, use content_sid approach
-                # This is simplified - real implementation would use Twilio Content API
-                params["body"] = message.content
-            else:
-                params["body"] = message.content
+            params = self._base_params.copy()
+            params["to"] = to_number
+            # Template messages are sent as plain text for now; a full
+            # implementation would use the Twilio Content API (content_sid)
+            params["body"] = message.content
 
             # Handle media
             if message.media_url:
                 params["media_url"] = [message.media_url]
 
-            # Send message
-            twilio_message = client.messages.create(**params)
+            # Send message; the Twilio SDK is blocking, so run it off the event loop
+            twilio_message = await asyncio.to_thread(client.messages.create, **params)
 
             logger.info(
                 "Sent WhatsApp message",
@@ -197,16 +322,18 @@ class TwilioWhatsAppAdapter(ChannelAdapter):
     def validate_webhook(self, request_data: bytes, signature: str) -> bool:
         """Validate Twilio webhook signature.
 
-        Twilio signs requests using HMAC-SHA1.
+        Twilio signs requests using HMAC-SHA1 over the full request URL
+        followed by the POST parameters sorted by name (see
+        `build_signature_payload`).
 
         Args:
-            request_data: Raw request body
+            request_data: Signed payload (URL + sorted form parameters)
             signature: X-Twilio-Signature header value
 
         Returns:
             True if signature is valid
         """
-        if not self.auth_token:
+        if self._signature_hmac is None:
             logger.warning("Cannot validate webhook: auth token not configured")
             return False
 
@@ -215,28 +342,32 @@ class TwilioWhatsAppAdapter(ChannelAdapter):
             logger.warning("Skipping webhook validation in development mode")
             return True
 
-        # Twilio signature validation
-        # The signature is computed over the full URL + sorted POST parameters
-        # For simplicity, we'll use the request body approach
-        try:
-            # Decode request data to dict
-            from urllib.parse import parse_qs
-            params = parse_qs(request_data.decode("utf-8"))
-            # Flatten single-value lists
-            flat_params = {k: v[0] if len(v) == 1 else v for k, v in params.items()}
-
-            # This is a simplified validation
-            # Full implementation would need the request URL
-            # For now, we trust Twilio if signature header is present
-            if signature:
-                return True
-
+        if not signature:
             return False
 
+        try:
+            mac = self._signature_hmac.copy()
+            mac.update(request_data)
+            expected = base64.b64encode(mac.digest())
+            return hmac.compare_digest(expected, signature.encode("utf-8"))
+
         except Exception as e:
             logger.error("Webhook validation failed", error=str(e))
             return False
 
+    @staticmethod
+    def build_signature_payload(url: str, params: list[tuple[str, str]]) -> bytes:
+        """Build the payload Twilio signs from the URL and form parameters.
+
+        Args:
+            url: Full request URL, including query string
+            params: Form parameters as (name, value) pairs
+
+        Returns:
+            URL followed by each name+value, sorted by name then value
+        """
+        return (url + "".join(k + v for k, v in sorted(params))).encode("utf-8")
+
     async def send_template(
         self,
         recipient_id: str,
@@ -263,6 +394,20 @@ class TwilioWhatsAppAdapter(ChannelAdapter):
         )
         return await self.send_message(message)
 
+    async def close(self) -> None:
+        """Wait for queued sends to finish, then stop the send workers."""
+        if self._send_loop is asyncio.get_running_loop():
+            for queue in self._send_queues:
+                await queue.join()
+
+        for task in self._send_tasks:
+            task.cancel()
+        await asyncio.gather(*self._send_tasks, return_exceptions=True)
+
+        self._send_queues = []
+        self._send_tasks = []
+        self._send_loop = None
+
 
 # Singleton instance
 _whatsapp_adapter: TwilioWhatsAppAdapter | None = None
@@ -274,3 +419,9 @@ def get_whatsapp_adapter() -> TwilioWhatsAppAdapter:
     if _whatsapp_adapter is None:
         _whatsapp_adapter = TwilioWhatsAppAdapter()
     return _whatsapp_adapter
+
+
+async def close_whatsapp_adapter() -> None:
+    """Flush the adapter singleton's outbound queue (for shutdown)."""
+    if _whatsapp_adapter is not None:
+        await _whatsapp_adapter.close()
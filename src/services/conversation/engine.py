@@ -1,11 +1,13 @@
 """Main conversation engine - orchestrates RAG, LLM, and memory."""
 
-from datetime import datetime
+import asyncio
+from collections.abc import Awaitable, Callable
 from typing import Any
 from uuid import uuid4
 
 import structlog
 
+from src.core.clock import utc_now
 from src.core.config import settings
 from src.core.exceptions import HandoffRequired, TenantNotFound
 from src.models import (
@@ -19,8 +21,9 @@ from src.models import (
 )
 from src.services.conversation.memory import ConversationMemory
 from src.services.llm.provider import LLMProvider, LLMResponse, get_llm_provider
-from src.services.rag.retriever import RAGRetriever, get_rag_retriever
+from src.services.rag.retriever import RAGRetriever, RetrievalResult, get_rag_retriever
 from src.storage.base import StorageBackend
+from src.storage.tenant_cache import get_tenant_cached
 
 logger = structlog.get_logger()
 
@@ -50,6 +53,11 @@ class ConversationEngine:
             llm_provider=self.llm,
             rag_retriever=self.retriever,
         )
+        # Memory processing scheduled after a reply, kept referenced until done
+        self._background_tasks: set[asyncio.Task[None]] = set()
+        # Conversations with a summary being written; turns arriving meanwhile
+        # still see the old summarized index and must not start another
+        self._summarizing: set[str] = set()
 
     async def get_or_create_conversation(
         self,
@@ -108,6 +116,7 @@ class ConversationEngine:
         conversation: Conversation,
         user_message: str,
         message_metadata: MessageMetadata | None = None,
+        deliver: Callable[[str], Awaitable[Any]] | None = None,
     ) -> tuple[str, Message, LLMResponse]:
         """Process an incoming user message and generate response.
 
@@ -116,6 +125,8 @@ class ConversationEngine:
             conversation: Current conversation
             user_message: User's message content
             message_metadata: Optional metadata
+            deliver: Optional coroutine sending the response to the user; it
+                runs concurrently with persisting the exchange
 
         Returns:
             Tuple of (response_text, saved_message, llm_response)
@@ -123,7 +134,10 @@ class ConversationEngine:
         Raises:
             HandoffRequired: If human handoff is triggered
         """
-        # Save incoming message
+        # One clock read for the message and the conversation timestamps
+        now = utc_now()
+
+        # Incoming message; saved together with the reply below
         incoming_msg = Message(
             id=str(uuid4()),
             conversation_id=conversation.id,
@@ -131,28 +145,33 @@ class ConversationEngine:
             content=user_message,
             direction=MessageDirection.INBOUND,
             user_id=conversation.user_id,
+            position=conversation.message_count,
             metadata=message_metadata or MessageMetadata(),
+            created_at=now,
         )
-        await self.storage.save_message(incoming_msg)
 
         # Update conversation stats
         conversation.message_count += 1
         conversation.user_message_count += 1
-        conversation.last_message_at = datetime.utcnow()
-        conversation.last_user_message_at = datetime.utcnow()
-
-        # Build context
-        context = await self._build_context(tenant, conversation, user_message)
-
-        # Generate response
-        llm_response = await self._generate_response(
-            tenant=tenant,
-            conversation=conversation,
-            user_message=user_message,
-            context=context,
-        )
+        conversation.last_message_at = conversation.last_user_message_at = now
+
+        try:
+            # Build context
+            context = await self._build_context(tenant, conversation, user_message)
+
+            # Generate response
+            llm_response = await self._generate_response(
+                tenant=tenant,
+                conversation=conversation,
+                user_message=user_message,
+                context=context,
+            )
+        except Exception:
+            # Keep the user's message even when no reply could be generated
+            await self.storage.save_message(incoming_msg)
+            raise
 
-        # Save outgoing message
+        # Outgoing message
         outgoing_msg = Message(
             id=str(uuid4()),
             conversation_id=conversation.id,
@@ -160,25 +179,39 @@ class ConversationEngine:
             content=llm_response.content,
             direction=MessageDirection.OUTBOUND,
             user_id=conversation.user_id,
+            position=conversation.message_count,
             is_from_bot=True,
             metadata=MessageMetadata(
                 llm_model_used=llm_response.model,
                 tokens_used=llm_response.tokens_input + llm_response.tokens_output,
                 processing_time_ms=int(llm_response.latency_ms),
-                knowledge_sources_used=[
-                    r.id for r in context.knowledge_base_results
-                ] if hasattr(context, 'knowledge_base_results') else [],
+                knowledge_sources_used=context.knowledge_base_ids,
             ),
         )
-        await self.storage.save_message(outgoing_msg)
 
         # Update conversation
         conversation.message_count += 1
         conversation.bot_message_count += 1
-        await self.storage.save_conversation(conversation)
 
-        # Process memory (summarize if needed)
-        await self.memory.process_conversation_memory(conversation)
+        # Persist the exchange in one batch while the response is delivered;
+        # the write finishes even if delivery fails, then the first error is raised
+        pending = [self.storage.save_batch([incoming_msg, outgoing_msg], [conversation])]
+        if deliver is not None:
+            pending.append(deliver(llm_response.content))
+        for result in await asyncio.gather(*pending, return_exceptions=True):
+            if isinstance(result, BaseException):
+                raise result
+
+        # Summarize off the reply path, and only when due; a summary only
+        # matters for later turns, and most turns need none
+        if (
+            conversation.id not in self._summarizing
+            and conversation.should_summarize(self.memory.summary_threshold)
+        ):
+            self._summarizing.add(conversation.id)
+            task = asyncio.create_task(self._process_memory(conversation))
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
 
         logger.info(
             "Processed message",
@@ -189,6 +222,30 @@ class ConversationEngine:
 
         return llm_response.content, outgoing_msg, llm_response
 
+    async def _process_memory(self, conversation: Conversation) -> None:
+        """Summarize the conversation if due and persist the new summary.
+
+        Only the summary fields are written; later turns may already have
+        saved newer counters, sentiment or status.
+        """
+        try:
+            summary = await self.memory.process_conversation_memory(conversation)
+            if summary is not None:
+                await self.storage.save_conversation_summaries(conversation)
+        except Exception as e:
+            logger.error(
+                "Failed to process conversation memory",
+                conversation_id=conversation.id,
+                error=str(e),
+            )
+        finally:
+            self._summarizing.discard(conversation.id)
+
+    async def close(self) -> None:
+        """Wait for scheduled memory processing to finish."""
+        if self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+
     async def _build_context(
         self,
         tenant: Tenant,
@@ -205,23 +262,39 @@ class ConversationEngine:
         Returns:
             ConversationContext object
         """
-        # Retrieve from knowledge base
-        retrieval_result = await self.retriever.retrieve(
-            query=user_message,
-            tenant_id=tenant.id,
-            user_id=conversation.user_id,
-            include_kb=True,
-            include_memory=True,
+        # Retrieve from knowledge base and get recent messages concurrently
+        retrieval_result, recent_messages = await asyncio.gather(
+            self.retriever.retrieve(
+                query=user_message,
+                tenant_id=tenant.id,
+                user_id=conversation.user_id,
+                include_kb=True,
+                include_memory=True,
+            ),
+            self.memory.get_context_messages(conversation.id),
+            return_exceptions=True,
         )
 
-        # Get recent messages
-        recent_messages = await self.memory.get_context_messages(conversation.id)
+        # Answer without knowledge base context rather than not at all
+        if isinstance(retrieval_result, Exception):
+            logger.warning(
+                "Retrieval failed, continuing without context",
+                conversation_id=conversation.id,
+                error=str(retrieval_result),
+            )
+            retrieval_result = RetrievalResult(
+                knowledge_base_results=[], memory_results=[], formatted_context=""
+            )
+        if isinstance(recent_messages, BaseException):
+            raise recent_messages
 
         # Get conversation summaries
         summaries = [s.summary_text for s in conversation.summaries[-2:]]
 
+        kb_results = retrieval_result.knowledge_base_results
         context = ConversationContext(
-            knowledge_base_context=[r.content for r in retrieval_result.knowledge_base_results],
+            knowledge_base_context=[r.content for r in kb_results],
+            knowledge_base_ids=[r.id for r in kb_results],
             recent_messages=recent_messages,
             conversation_summaries=summaries,
             turn_count=conversation.message_count,
@@ -229,9 +302,6 @@ class ConversationEngine:
             sentiment_score=conversation.average_sentiment,
         )
 
-        # Store retrieval results for metadata
-        context._retrieval_result = retrieval_result  # type: ignore
-
         return context
 
     async def _generate_response(
@@ -256,13 +326,13 @@ class ConversationEngine:
         formatted_context = context.to_prompt_context()
 
         # Build messages for LLM
-        messages = context.recent_messages.copy()
-        messages.append({"role": "user", "content": user_message})
+        messages = [*context.recent_messages, {"role": "user", "content": user_message}]
 
         # Generate response
         response = await self.llm.complete(
             messages=messages,
-            system_prompt=f"{tenant.config.system_prompt}\n\n{formatted_context}",
+            system_prompt=tenant.config.system_prompt,
+            prompt_context=formatted_context,
             temperature=tenant.config.temperature,
             max_tokens=tenant.config.max_tokens,
         )
@@ -309,7 +379,7 @@ class ConversationEngine:
         Raises:
             TenantNotFound: If tenant doesn't exist
         """
-        tenant = await self.storage.get_tenant(tenant_id)
+        tenant = await get_tenant_cached(self.storage, tenant_id)
         if not tenant:
             raise TenantNotFound(tenant_id)
         return tenant
@@ -330,7 +400,7 @@ class ConversationEngine:
         """
         conversation.status = ConversationStatus.RESOLVED
         conversation.metadata["closure_reason"] = reason
-        conversation.metadata["closed_at"] = datetime.utcnow().isoformat()
+        conversation.metadata["closed_at"] = utc_now().isoformat()
 
         await self.storage.save_conversation(conversation)
 
@@ -366,6 +436,12 @@ def get_conversation_engine(storage: StorageBackend | None = None) -> Conversati
     return _engine_instance
 
 
+async def close_conversation_engine() -> None:
+    """Let the engine singleton finish its background work (for shutdown)."""
+    if _engine_instance is not None:
+        await _engine_instance.close()
+
+
 def reset_conversation_engine() -> None:
     """Reset the conversation engine singleton (for testing)."""
     global _engine_instance
@@ -1,18 +1,102 @@
 """Handoff evaluator - determines when to escalate to human agent."""
 
+import asyncio
+import re
+from collections.abc import Callable
 from dataclasses import dataclass
 from enum import Enum
+from functools import lru_cache, partial
 from typing import Any
 
 import structlog
 
+from src.core.cache import TTLCache
 from src.core.config import settings
 from src.core.exceptions import HandoffRequired
 from src.models import Conversation, Message, Tenant
+from src.models.conversation import RECENT_SENTIMENT_WINDOW
 from src.services.sentiment.analyzer import SentimentAnalyzer, SentimentResult, get_sentiment_analyzer
 
+try:
+    import hyperscan
+except ImportError:  # optional accelerator; the keyword regex is used alone
+    hyperscan = None
+
 logger = structlog.get_logger()
 
+# How long a decision is reused for the same message in the same conversation
+DECISION_CACHE_TTL = 2.0
+
+# Conversation ID, message, tenant keywords, conversation status and
+# fallback count: everything a cached decision depends on besides sentiment
+_DecisionKey = tuple[str, str, tuple[str, ...], str, int]
+
+
+def _trie_pattern(node: dict[str, dict]) -> str:
+    """Render a character trie as a regex that shares common prefixes.
+
+    Optional suffixes are greedy, so the longest keyword at a position wins.
+    """
+    branches = [re.escape(ch) + _trie_pattern(child) for ch, child in sorted(node.items()) if ch]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    return f"(?:{body})?" if "" in node else body
+
+
+@lru_cache(maxsize=1024)
+def _compile_keywords(keywords: frozenset[str]) -> re.Pattern[str]:
+    """Compile handoff keywords into one case-insensitive pattern.
+
+    Keywords are merged into a trie first, so the regex engine walks each
+    shared prefix once per position instead of retrying every keyword, the
+    same single-pass idea as an Aho-Corasick automaton. "real person"
+    still wins over "person".
+    """
+    trie: dict[str, dict] = {}
+    for keyword in keywords:
+        if not keyword.strip():
+            continue  # a blank keyword would match every message
+        node = trie
+        for ch in keyword.lower():
+            node = node.setdefault(ch, {})
+        node[""] = {}
+    return re.compile(_trie_pattern(trie) or "(?!)", re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
+def _compile_prefilter(keywords: frozenset[str]) -> Callable[[str], bool] | None:
+    """Compile a hyperscan check for whether any keyword occurs in a message.
+
+    Hyperscan scans all keywords at once with a SIMD-accelerated automaton,
+    so the usual message without a keyword skips the regex entirely. Only
+    built for ASCII keyword sets, where byte-level caseless matching agrees
+    with the regex; returns None otherwise or when hyperscan is missing.
+    """
+    if hyperscan is None:
+        return None
+
+    literals = sorted({k.lower() for k in keywords if k.strip()})
+    if not literals or not all(k.isascii() for k in literals):
+        return None
+
+    database = hyperscan.Database()
+    database.compile(
+        expressions=[re.escape(k).encode("ascii") for k in literals],
+        ids=list(range(len(literals))),
+        flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * len(literals),
+    )
+
+    def any_keyword(message: str) -> bool:
+        hits: list[int] = []
+        database.scan(
+            message.encode("utf-8"),
+            match_event_handler=lambda keyword_id, *_: hits.append(keyword_id),
+        )
+        return bool(hits)
+
+    return any_keyword
+
 
 class HandoffTrigger(str, Enum):
     """Reasons for triggering handoff."""
@@ -58,12 +142,26 @@ class HandoffEvaluator:
         self.max_fallbacks = max_fallbacks or settings.handoff_max_fallbacks
 
         # Default handoff keywords (can be overridden per tenant)
-        self.default_handoff_keywords = {
+        self.default_handoff_keywords = frozenset({
             "agent", "human", "person", "representative", "operator",
             "speak to someone", "talk to someone", "real person",
             "agente", "humano", "persona", "representante",
             "hablar con alguien",
-        }
+        })
+
+        # Recent and in-flight decisions, so rapid-fire repeats of a message
+        # are evaluated once while the tenant config and conversation state
+        # they were based on still hold
+        self._recent_decisions: TTLCache[_DecisionKey, HandoffDecision] = TTLCache(
+            maxsize=4096, ttl=DECISION_CACHE_TTL
+        )
+        self._pending_decisions: dict[_DecisionKey, asyncio.Task[HandoffDecision]] = {}
+
+        # Keyword pattern and optional prefilter per tenant, with the
+        # keyword list they were built from
+        self._keyword_patterns: dict[
+            str, tuple[list[str], re.Pattern[str], Callable[[str], bool] | None]
+        ] = {}
 
     async def evaluate(
         self,
@@ -87,6 +185,46 @@ class HandoffEvaluator:
         if not tenant.config.enable_auto_handoff:
             return HandoffDecision(should_handoff=False)
 
+        key = (
+            conversation.id,
+            message,
+            tuple(tenant.config.handoff_keywords),
+            conversation.status,
+            conversation.fallback_count,
+        )
+        cached = self._recent_decisions.get(key)
+        if cached is not None:
+            return cached
+
+        task = self._pending_decisions.get(key)
+        if task is None:
+            task = asyncio.create_task(
+                self._evaluate(message, conversation, tenant, sentiment_result)
+            )
+            self._pending_decisions[key] = task
+            task.add_done_callback(partial(self._on_decision, key))
+
+        # Shield so one cancelled caller doesn't cancel the shared evaluation
+        return await asyncio.shield(task)
+
+    def _on_decision(
+        self,
+        key: _DecisionKey,
+        task: asyncio.Task[HandoffDecision],
+    ) -> None:
+        """Cache a finished evaluation and drop it from the in-flight set."""
+        del self._pending_decisions[key]
+        if not task.cancelled() and task.exception() is None:
+            self._recent_decisions.set(key, task.result())
+
+    async def _evaluate(
+        self,
+        message: str,
+        conversation: Conversation,
+        tenant: Tenant,
+        sentiment_result: SentimentResult | None,
+    ) -> HandoffDecision:
+        """Run the handoff checks in priority order."""
         # 1. Check for explicit request
         explicit_decision = self._check_explicit_request(message, tenant)
         if explicit_decision.should_handoff:
@@ -135,23 +273,46 @@ class HandoffEvaluator:
         tenant: Tenant,
     ) -> HandoffDecision:
         """Check if user explicitly requested human agent."""
-        message_lower = message.lower()
-
-        # Use tenant's custom keywords or defaults
-        keywords = set(tenant.config.handoff_keywords) or self.default_handoff_keywords
+        pattern, prefilter = self._keyword_matcher(tenant)
+        if prefilter is not None and not prefilter(message):
+            return HandoffDecision(should_handoff=False)
 
-        for keyword in keywords:
-            if keyword.lower() in message_lower:
-                return HandoffDecision(
-                    should_handoff=True,
-                    trigger=HandoffTrigger.EXPLICIT_REQUEST,
-                    confidence=1.0,
-                    reason=f"User requested human agent (keyword: {keyword})",
-                    context={"matched_keyword": keyword},
-                )
+        match = pattern.search(message)
+        if match:
+            keyword = match.group(0).lower()
+            return HandoffDecision(
+                should_handoff=True,
+                trigger=HandoffTrigger.EXPLICIT_REQUEST,
+                confidence=1.0,
+                reason=f"User requested human agent (keyword: {keyword})",
+                context={"matched_keyword": keyword},
+            )
 
         return HandoffDecision(should_handoff=False)
 
+    def _keyword_matcher(
+        self,
+        tenant: Tenant,
+    ) -> tuple[re.Pattern[str], Callable[[str], bool] | None]:
+        """Get the compiled handoff keyword pattern and prefilter for a tenant.
+
+        Reused until the tenant's keyword list changes, so ordinary
+        messages don't rebuild and rehash the keyword set. The prefilter,
+        when available, rules out messages without any keyword; the
+        pattern then finds the longest keyword in messages that have one.
+        """
+        keywords = tenant.config.handoff_keywords
+        cached = self._keyword_patterns.get(tenant.id)
+        if cached is not None and cached[0] == keywords:
+            return cached[1], cached[2]
+
+        # Use tenant's custom keywords or defaults
+        keyword_set = frozenset(keywords) or self.default_handoff_keywords
+        pattern = _compile_keywords(keyword_set)
+        prefilter = _compile_prefilter(keyword_set)
+        self._keyword_patterns[tenant.id] = (list(keywords), pattern, prefilter)
+        return pattern, prefilter
+
     def _check_sentiment(
         self,
         sentiment: SentimentResult,
@@ -173,8 +334,8 @@ class HandoffEvaluator:
             )
 
         # Also check for sustained negative sentiment
-        if len(conversation.sentiment_history) >= 3:
-            recent_avg = sum(conversation.sentiment_history[-3:]) / 3
+        if len(conversation.sentiment_history) >= RECENT_SENTIMENT_WINDOW:
+            recent_avg = conversation.recent_sentiment_sum / RECENT_SENTIMENT_WINDOW
             if recent_avg < self.sentiment_threshold:
                 return HandoffDecision(
                     should_handoff=True,
@@ -183,7 +344,7 @@ class HandoffEvaluator:
                     reason=f"Sustained negative sentiment (avg: {recent_avg:.2f})",
                     context={
                         "recent_average": recent_avg,
-                        "history": conversation.sentiment_history[-3:],
+                        "history": conversation.sentiment_history[-RECENT_SENTIMENT_WINDOW:],
                     },
                 )
 
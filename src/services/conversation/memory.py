@@ -1,6 +1,11 @@
 """Conversation memory management - short-term and long-term memory."""
 
+import asyncio
+import hashlib
+import math
 from datetime import datetime
+from functools import cache
+from typing import Any
 
 import structlog
 
@@ -8,10 +13,37 @@ from src.core.config import settings
 from src.models import Conversation, ConversationSummary, Message
 from src.services.llm.provider import LLMProvider, get_llm_provider
 from src.services.rag.retriever import RAGRetriever, get_rag_retriever
+from src.services.rag.vectorstore import SearchResult
 from src.storage.base import StorageBackend
 
 logger = structlog.get_logger()
 
+# Token budgets for summarization input: each message keeps its start, and
+# the transcript as a whole keeps its most recent part
+SUMMARY_MESSAGE_MAX_TOKENS = 512
+SUMMARY_INPUT_MAX_TOKENS = 8192
+
+
+@cache
+def _token_encoding() -> Any:
+    """Get the cl100k_base tokenizer, which LiteLLM bundles for offline use."""
+    import litellm
+
+    return litellm.encoding
+
+
+def _truncate_tokens(text: str, max_tokens: int, keep_tail: bool = False) -> str:
+    """Cut text to at most `max_tokens` tokens, keeping its start or its end."""
+    # Every token covers at least one byte, so short texts need no tokenizing
+    if len(text.encode("utf-8")) <= max_tokens:
+        return text
+
+    encoding = _token_encoding()
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[-max_tokens:] if keep_tail else tokens[:max_tokens])
+
 
 class ConversationMemory:
     """Manages conversation memory: short-term (messages) and long-term (summaries).
@@ -71,24 +103,68 @@ class ConversationMemory:
         Returns:
             List of relevant memory strings
         """
-        results = await self.retriever.vector_store.search(
-            query=query,
-            tenant_id=tenant_id,
-            doc_type="memory",
-            limit=limit,
-            additional_filters={"user_id": user_id},
-        )
-
+        results = await self._search_user_memory(tenant_id, user_id, query, limit)
         return [r.content for r in results]
 
+    async def _search_user_memory(
+        self,
+        tenant_id: str,
+        user_id: str,
+        query: str,
+        limit: int,
+    ) -> list[SearchResult]:
+        """Search the user's stored memories by relevance to a query.
+
+        Memories are best-effort: the search uses a small HNSW ef, since only
+        a few memories are wanted, is not retried, and gives up after
+        MEMORY_SEARCH_TIMEOUT_MS. A failed or slow search yields no memories.
+        Concurrent conversations' searches share one batched request.
+        """
+        try:
+            return await asyncio.wait_for(
+                self.retriever.vector_store.search(
+                    query=query,
+                    tenant_id=tenant_id,
+                    doc_type="memory",
+                    limit=limit,
+                    additional_filters={"user_id": user_id},
+                    hnsw_ef=settings.memory_search_ef,
+                    timeout=math.ceil(settings.memory_search_timeout_ms / 1000),
+                    batched=True,
+                    retry_on_error=False,
+                ),
+                timeout=settings.memory_search_timeout_ms / 1000,
+            )
+        except Exception as e:
+            logger.warning(
+                "User memory search failed, continuing without memories",
+                tenant_id=tenant_id,
+                user_id=user_id,
+                error=repr(e),
+            )
+            return []
+
+    @staticmethod
+    def build_memory_pack(memories: list[SearchResult]) -> tuple[str, str]:
+        """Render user memories as a deterministic prompt block.
+
+        Memories are ordered by document ID rather than by relevance, so
+        the block (and any prompt prefix cached up to it) stays identical
+        across turns until the set of memories changes.
+
+        Args:
+            memories: Retrieved memory documents
+
+        Returns:
+            The rendered pack and a short version hash of it
+        """
+        pack = "\n".join(f"- {m.content}" for m in sorted(memories, key=lambda m: m.id))
+        version = hashlib.blake2b(pack.encode("utf-8"), digest_size=6).hexdigest()
+        return pack, version
+
     async def should_summarize(self, conversation: Conversation) -> bool:
         """Check if conversation should be summarized."""
-        last_summarized = 0
-        if conversation.summaries:
-            last_summarized = conversation.summaries[-1].message_range[1]
-
-        messages_since = conversation.message_count - last_summarized
-        return messages_since >= self.summary_threshold
+        return conversation.should_summarize(self.summary_threshold)
 
     async def create_summary(
         self,
@@ -107,17 +183,31 @@ class ConversationMemory:
         if not messages:
             raise ValueError("No messages to summarize")
 
-        # Format messages for summarization
-        conversation_text = "\n".join([
-            f"{'User' if msg.direction == 'inbound' else 'Assistant'}: {msg.content}"
-            for msg in messages
-        ])
-
-        # Generate summary using LLM
-        summary_text = await self.llm.summarize(conversation_text, max_length=200)
+        # Format messages for summarization, within the token budgets
+        conversation_text = _truncate_tokens(
+            "\n".join(
+                _truncate_tokens(msg.to_transcript_line(), SUMMARY_MESSAGE_MAX_TOKENS)
+                for msg in messages
+            ),
+            SUMMARY_INPUT_MAX_TOKENS,
+            keep_tail=True,
+        )
 
-        # Extract key topics and entities
-        extraction = await self.llm.extract_entities(conversation_text)
+        # Summarize and extract key topics and entities concurrently
+        summary_text, extraction = await asyncio.gather(
+            self.llm.summarize(conversation_text, max_length=200),
+            self.llm.extract_entities(conversation_text),
+            return_exceptions=True,
+        )
+        for step, result in (("summarize", summary_text), ("extract_entities", extraction)):
+            if isinstance(result, BaseException):
+                logger.warning(
+                    "Summary step failed",
+                    conversation_id=conversation.id,
+                    step=step,
+                    error=str(result),
+                )
+                raise result
 
         summary = ConversationSummary(
             summary_text=summary_text,
@@ -125,7 +215,7 @@ class ConversationMemory:
             user_preferences=extraction.get("entities", {}).get("preferences", {}),
             unresolved_issues=extraction.get("entities", {}).get("unresolved", []),
             sentiment_trend=extraction.get("sentiment", "neutral"),
-            message_range=(messages[0].created_at.timestamp(), messages[-1].created_at.timestamp()),
+            message_range=(conversation.last_summarized_index, conversation.message_count),
         )
 
         logger.info(
@@ -195,19 +285,13 @@ Sentiment: {summary.sentiment_trend}
             return None
 
         # Get messages since last summary
-        start_index = 0
-        if conversation.summaries:
-            start_index = int(conversation.summaries[-1].message_range[1])
-
-        # Get all messages (we need to filter by index)
-        all_messages = await self.storage.get_messages(
+        messages_since = conversation.message_count - conversation.last_summarized_index
+        messages_to_summarize = await self.storage.get_messages(
             conversation.id,
-            limit=self.summary_threshold + 5,
+            limit=messages_since,
+            offset=conversation.last_summarized_index,
         )
 
-        # Take messages since last summary
-        messages_to_summarize = all_messages[start_index:] if start_index < len(all_messages) else all_messages[-self.summary_threshold:]
-
         if len(messages_to_summarize) < self.summary_threshold:
             return None
 
@@ -216,7 +300,7 @@ Sentiment: {summary.sentiment_trend}
             await self.store_summary_as_memory(conversation, summary)
 
             # Add to conversation
-            conversation.summaries.append(summary)
+            conversation.add_summary(summary)
 
             return summary
 
@@ -242,22 +326,29 @@ Sentiment: {summary.sentiment_trend}
         Returns:
             Dict with all context components
         """
-        # Get recent messages
-        recent_messages = await self.get_context_messages(conversation.id)
-
-        # Get relevant user memories
-        user_memories = await self.get_user_memory(
-            tenant_id=conversation.tenant_id,
-            user_id=conversation.user_id,
-            query=current_query,
+        # Recent messages and relevant user memories are fetched concurrently;
+        # a slow or failing memory search yields no memories rather than
+        # holding up the reply
+        recent_messages, memories = await asyncio.gather(
+            self.get_context_messages(conversation.id),
+            self._search_user_memory(
+                tenant_id=conversation.tenant_id,
+                user_id=conversation.user_id,
+                query=current_query,
+                limit=3,
+            ),
         )
 
+        memories_pack, memories_version = self.build_memory_pack(memories)
+
         # Get conversation summaries
         summaries = [s.summary_text for s in conversation.summaries[-2:]]  # Last 2 summaries
 
         return {
             "recent_messages": recent_messages,
-            "user_memories": user_memories,
+            "user_memories": [m.content for m in memories],
+            "user_memories_pack": memories_pack,
+            "user_memories_version": memories_version,
             "conversation_summaries": summaries,
             "turn_count": conversation.message_count,
             "average_sentiment": conversation.average_sentiment,
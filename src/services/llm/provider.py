@@ -1,27 +1,152 @@
 """LLM Provider using LiteLLM for multi-provider abstraction."""
 
+import re
+import threading
+from collections.abc import AsyncIterator, Callable
 from dataclasses import dataclass, field
+from functools import cache, lru_cache, partial
+from types import ModuleType
 from typing import Any
 
-import litellm
+import numpy as np
+import orjson
 import structlog
-from tenacity import retry, stop_after_attempt, wait_exponential
+from numpy.typing import NDArray
 
 from src.core.config import settings
 from src.core.exceptions import LLMError
+from src.core.retry import retry_transient
+from src.core.semantic_cache import SemanticCache
 
 logger = structlog.get_logger()
 
-# Configure LiteLLM
-litellm.set_verbose = settings.app_debug
+# Attempts per model on transient errors before moving to the next fallback
+LLM_ATTEMPTS_PER_MODEL = 2
 
-# Set API keys from settings
-if settings.openai_api_key:
-    litellm.openai_key = settings.openai_api_key
-if settings.anthropic_api_key:
-    litellm.anthropic_key = settings.anthropic_api_key
-if settings.google_api_key:
-    litellm.google_key = settings.google_api_key
+# Completions sampled hotter than this vary too much to be reused
+SEMANTIC_CACHE_MAX_TEMPERATURE = 0.2
+
+_EXTRACT_ENTITIES_PROMPT = """Extract key information from this customer message. Return JSON with:
+- "intent": main intent (question, complaint, request, feedback, other)
+- "entities": dict of extracted entities (product names, order numbers, dates, etc)
+- "sentiment": positive, neutral, or negative
+- "urgency": low, medium, or high
+
+Message: {text}
+
+JSON:"""
+
+# Outermost JSON object in a reply, with or without a ``` fence around it
+_JSON_OBJECT = re.compile(r"\{.*\}", re.DOTALL)
+
+
+@cache
+def _get_litellm() -> ModuleType:
+    """Import and configure LiteLLM on first use.
+
+    LiteLLM takes seconds to import, so it is kept out of app startup.
+    """
+    import litellm
+
+    # Configure LiteLLM
+    litellm.set_verbose = settings.app_debug
+
+    # Set API keys from settings
+    if settings.openai_api_key:
+        litellm.openai_key = settings.openai_api_key
+    if settings.anthropic_api_key:
+        litellm.anthropic_key = settings.anthropic_api_key
+    if settings.google_api_key:
+        litellm.google_key = settings.google_api_key
+
+    return litellm
+
+
+def _transient_errors() -> tuple[type[Exception], ...]:
+    """LiteLLM errors worth retrying on the same model."""
+    litellm = _get_litellm()
+    # Timeout subclasses APIConnectionError
+    return (
+        litellm.RateLimitError,
+        litellm.APIConnectionError,
+        litellm.InternalServerError,
+        litellm.ServiceUnavailableError,
+    )
+
+
+@lru_cache(maxsize=8192)
+def _token_cost(model: str, tokens_input: int, tokens_output: int) -> float:
+    """Price a completion in USD from LiteLLM's model cost map.
+
+    Cost depends only on the model and token counts, so repeated shapes
+    skip the cost map lookups. Models missing from the map cost 0.0, with
+    a warning logged once per model and token counts.
+    """
+    try:
+        return sum(_get_litellm().cost_per_token(
+            model=model,
+            prompt_tokens=tokens_input,
+            completion_tokens=tokens_output,
+        ))
+    except Exception as e:
+        logger.warning("LLM cost lookup failed", model=model, error=str(e))
+        return 0.0
+
+
+@lru_cache(maxsize=256)
+def _system_formatter(model: str, system_prompt: str) -> Callable[[str | None], dict[str, Any]]:
+    """Build a system-message formatter for one model and system prompt.
+
+    OpenAI and Gemini cache a repeated prompt prefix automatically;
+    Anthropic models need an explicit cache_control breakpoint. The model
+    check and the stable prompt parts are resolved once per pair, and the
+    key includes the prompt itself, so an edited tenant prompt gets a new
+    formatter without any invalidation.
+    """
+    if "claude" not in model and not model.startswith("anthropic/"):
+        prefix = f"{system_prompt}\n\n"
+
+        def format_plain(prompt_context: str | None) -> dict[str, Any]:
+            content = prefix + prompt_context if prompt_context else system_prompt
+            return {"role": "system", "content": content}
+
+        return format_plain
+
+    prompt_block = (
+        {"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}
+        if system_prompt
+        else None
+    )
+
+    def format_blocks(prompt_context: str | None) -> dict[str, Any]:
+        # Copied so a caller mutating the message cannot change the cached block
+        blocks: list[dict[str, Any]] = [dict(prompt_block)] if prompt_block else []
+        if prompt_context:
+            blocks.append({"type": "text", "text": prompt_context})
+        return {"role": "system", "content": blocks}
+
+    return format_blocks
+
+
+def _system_message(
+    model: str,
+    system_prompt: str,
+    prompt_context: str | None,
+) -> dict[str, Any]:
+    """Build the system message, marking the stable prompt as cacheable."""
+    return _system_formatter(model, system_prompt)(prompt_context)
+
+
+def _with_system_message(
+    model: str,
+    messages: list[dict[str, str]],
+    system_prompt: str | None,
+    prompt_context: str | None,
+) -> list[dict[str, Any]]:
+    """Prepend the system message for a model, if there is one."""
+    if not system_prompt and not prompt_context:
+        return list(messages)
+    return [_system_message(model, system_prompt or "", prompt_context), *messages]
 
 
 @dataclass
@@ -50,11 +175,13 @@ class LLMProvider:
         fallback_models: list[str] | None = None,
         default_temperature: float = 0.7,
         default_max_tokens: int = 500,
+        semantic_cache: SemanticCache[LLMResponse] | None = None,
     ) -> None:
         self.primary_model = primary_model or settings.litellm_primary_model
         self.fallback_models = fallback_models or [settings.litellm_fallback_model]
         self.default_temperature = default_temperature
         self.default_max_tokens = default_max_tokens
+        self.semantic_cache = semantic_cache
 
         logger.info(
             "LLM Provider initialized",
@@ -62,11 +189,6 @@ class LLMProvider:
             fallbacks=self.fallback_models,
         )
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=10),
-        reraise=True,
-    )
     async def complete(
         self,
         messages: list[dict[str, str]],
@@ -74,16 +196,23 @@ class LLMProvider:
         temperature: float | None = None,
         max_tokens: int | None = None,
         model: str | None = None,
+        prompt_context: str | None = None,
         **kwargs: Any,
     ) -> LLMResponse:
         """Generate a completion using the LLM.
 
+        Each model is tried up to LLM_ATTEMPTS_PER_MODEL times on transient
+        errors (rate limits, timeouts, connection and server errors); any
+        other error moves straight on to the next fallback model.
+
         Args:
             messages: List of message dicts with 'role' and 'content'
             system_prompt: Optional system prompt to prepend
             temperature: Sampling temperature (0-2)
             max_tokens: Maximum tokens to generate
             model: Override model selection
+            prompt_context: Per-request context appended to the system prompt.
+                Kept separate so the stable system prompt stays a cacheable prefix.
             **kwargs: Additional parameters passed to LiteLLM
 
         Returns:
@@ -95,89 +224,239 @@ class LLMProvider:
         temp = temperature if temperature is not None else self.default_temperature
         max_tok = max_tokens or self.default_max_tokens
 
-        # Prepare messages with system prompt
-        full_messages = []
-        if system_prompt:
-            full_messages.append({"role": "system", "content": system_prompt})
-        full_messages.extend(messages)
-
         start_time = time.perf_counter()
 
-        try:
-            response = await litellm.acompletion(
-                model=model_to_use,
-                messages=full_messages,
-                temperature=temp,
-                max_tokens=max_tok,
-                **kwargs,
+        # Near-duplicate questions in an unchanged context reuse a cached answer
+        cache_entry: tuple[bytes, NDArray[np.float32]] | None = None
+        if (
+            self.semantic_cache is not None
+            and model is None
+            and not kwargs
+            and temp <= SEMANTIC_CACHE_MAX_TEMPERATURE
+            and messages
+            and messages[-1].get("role") == "user"
+        ):
+            scope = self.semantic_cache.scope_key(
+                model_to_use, temp, max_tok, system_prompt, prompt_context, messages[:-1]
             )
+            vector = await self.semantic_cache.embed_question(messages[-1]["content"])
+            if vector is not None:
+                hit = self.semantic_cache.get(scope, vector)
+                if hit is not None:
+                    cached, similarity = hit
+                    logger.info("LLM semantic cache hit", similarity=round(similarity, 4))
+                    return LLMResponse(
+                        content=cached.content,
+                        model=cached.model,
+                        finish_reason=cached.finish_reason,
+                        latency_ms=(time.perf_counter() - start_time) * 1000,
+                        metadata={"semantic_cache_similarity": similarity},
+                    )
+                cache_entry = (scope, vector)
 
-            latency_ms = (time.perf_counter() - start_time) * 1000
+        transient = _transient_errors()
+        candidates = [model_to_use, *(m for m in self.fallback_models if m != model_to_use)]
+        last_error: Exception | None = None
 
-            # Extract usage info
-            usage = response.usage or {}
-            tokens_input = getattr(usage, "prompt_tokens", 0)
-            tokens_output = getattr(usage, "completion_tokens", 0)
+        for candidate in candidates:
+            full_messages = _with_system_message(
+                candidate, messages, system_prompt, prompt_context
+            )
 
-            # Calculate cost using LiteLLM's cost tracking
             try:
-                cost = litellm.completion_cost(completion_response=response)
-            except Exception:
-                cost = 0.0
+                llm_response = await retry_transient(
+                    partial(
+                        self._complete_once,
+                        candidate,
+                        full_messages,
+                        temperature=temp,
+                        max_tokens=max_tok,
+                        **kwargs,
+                    ),
+                    transient,
+                    attempts=LLM_ATTEMPTS_PER_MODEL,
+                )
+            except Exception as e:
+                last_error = e
+                logger.warning(
+                    "LLM completion failed, trying fallback",
+                    model=candidate,
+                    error=str(e),
+                )
+                continue
+
+            if (
+                cache_entry is not None
+                and candidate == model_to_use
+                and llm_response.finish_reason == "stop"
+            ):
+                self.semantic_cache.set(*cache_entry, llm_response)
+
+            return llm_response
+
+        raise LLMError(f"All LLM providers failed: {last_error}", provider=model_to_use)
+
+    async def _complete_once(
+        self,
+        model: str,
+        messages: list[dict[str, Any]],
+        **kwargs: Any,
+    ) -> LLMResponse:
+        """Make one completion request to one model."""
+        import time
+
+        litellm = _get_litellm()
+        start_time = time.perf_counter()
+
+        response = await litellm.acompletion(model=model, messages=messages, **kwargs)
+
+        latency_ms = (time.perf_counter() - start_time) * 1000
 
-            content = response.choices[0].message.content or ""
-            finish_reason = response.choices[0].finish_reason or "stop"
+        # Extract usage info
+        usage = response.usage or {}
+        tokens_input = getattr(usage, "prompt_tokens", 0)
+        tokens_output = getattr(usage, "completion_tokens", 0)
+
+        cost = _token_cost(model, tokens_input, tokens_output)
+
+        content = response.choices[0].message.content or ""
+        finish_reason = response.choices[0].finish_reason or "stop"
+
+        logger.info(
+            "LLM completion successful",
+            model=model,
+            tokens_in=tokens_input,
+            tokens_out=tokens_output,
+            latency_ms=round(latency_ms, 2),
+            cost_usd=round(cost, 6),
+        )
+
+        return LLMResponse(
+            content=content,
+            model=model,
+            tokens_input=tokens_input,
+            tokens_output=tokens_output,
+            finish_reason=finish_reason,
+            latency_ms=latency_ms,
+            cost_usd=cost,
+            metadata={"raw_response_id": response.id if hasattr(response, "id") else None},
+        )
+
+    async def stream(
+        self,
+        messages: list[dict[str, str]],
+        system_prompt: str | None = None,
+        temperature: float | None = None,
+        max_tokens: int | None = None,
+        model: str | None = None,
+        prompt_context: str | None = None,
+        on_complete: Callable[[LLMResponse], None] | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[str]:
+        """Stream a completion, yielding content chunks as they arrive.
+
+        Opening the stream is retried and falls back like `complete`. Once
+        any text has been yielded a failure can no longer fall back, since
+        the caller has already used it, and is raised as LLMError. Streamed
+        completions bypass the semantic cache.
+
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            system_prompt: Optional system prompt to prepend
+            temperature: Sampling temperature (0-2)
+            max_tokens: Maximum tokens to generate
+            model: Override model selection
+            prompt_context: Per-request context appended to the system prompt
+            on_complete: Called with the full LLMResponse once the stream ends
+            **kwargs: Additional parameters passed to LiteLLM
+
+        Yields:
+            Content chunks, in order
+        """
+        import time
+
+        litellm = _get_litellm()
+        model_to_use = model or self.primary_model
+        temp = temperature if temperature is not None else self.default_temperature
+        max_tok = max_tokens or self.default_max_tokens
+
+        transient = _transient_errors()
+        candidates = [model_to_use, *(m for m in self.fallback_models if m != model_to_use)]
+        last_error: Exception | None = None
+
+        for candidate in candidates:
+            start_time = time.perf_counter()
+            parts: list[str] = []
+            usage = None
+            finish_reason = "stop"
+
+            try:
+                response = await retry_transient(
+                    partial(
+                        litellm.acompletion,
+                        model=candidate,
+                        messages=_with_system_message(
+                            candidate, messages, system_prompt, prompt_context
+                        ),
+                        temperature=temp,
+                        max_tokens=max_tok,
+                        stream=True,
+                        stream_options={"include_usage": True},
+                        **kwargs,
+                    ),
+                    transient,
+                    attempts=LLM_ATTEMPTS_PER_MODEL,
+                )
+
+                async for chunk in response:
+                    usage = getattr(chunk, "usage", None) or usage
+                    if not chunk.choices:
+                        continue
+                    choice = chunk.choices[0]
+                    finish_reason = choice.finish_reason or finish_reason
+                    if choice.delta.content:
+                        parts.append(choice.delta.content)
+                        yield choice.delta.content
+
+            except Exception as e:
+                if parts:
+                    raise LLMError(f"LLM stream failed: {e}", provider=candidate) from e
+                last_error = e
+                logger.warning(
+                    "LLM stream failed, trying fallback",
+                    model=candidate,
+                    error=str(e),
+                )
+                continue
+
+            latency_ms = (time.perf_counter() - start_time) * 1000
+            tokens_input = getattr(usage, "prompt_tokens", 0) or 0
+            tokens_output = getattr(usage, "completion_tokens", 0) or 0
+
+            cost = _token_cost(candidate, tokens_input, tokens_output)
 
             logger.info(
-                "LLM completion successful",
-                model=model_to_use,
+                "LLM stream successful",
+                model=candidate,
                 tokens_in=tokens_input,
                 tokens_out=tokens_output,
                 latency_ms=round(latency_ms, 2),
                 cost_usd=round(cost, 6),
             )
 
-            return LLMResponse(
-                content=content,
-                model=model_to_use,
-                tokens_input=tokens_input,
-                tokens_output=tokens_output,
-                finish_reason=finish_reason,
-                latency_ms=latency_ms,
-                cost_usd=cost,
-                metadata={"raw_response_id": response.id if hasattr(response, "id") else None},
-            )
-
-        except Exception as e:
-            logger.warning(
-                "LLM completion failed, trying fallback",
-                model=model_to_use,
-                error=str(e),
-            )
+            if on_complete is not None:
+                on_complete(LLMResponse(
+                    content="".join(parts),
+                    model=candidate,
+                    tokens_input=tokens_input,
+                    tokens_output=tokens_output,
+                    finish_reason=finish_reason,
+                    latency_ms=latency_ms,
+                    cost_usd=cost,
+                ))
+            return
 
-            # Try fallback models
-            for fallback_model in self.fallback_models:
-                if fallback_model == model_to_use:
-                    continue
-
-                try:
-                    return await self.complete(
-                        messages=messages,
-                        system_prompt=system_prompt,
-                        temperature=temperature,
-                        max_tokens=max_tokens,
-                        model=fallback_model,
-                        **kwargs,
-                    )
-                except Exception as fallback_error:
-                    logger.warning(
-                        "Fallback model also failed",
-                        model=fallback_model,
-                        error=str(fallback_error),
-                    )
-                    continue
-
-            raise LLMError(f"All LLM providers failed: {e}", provider=model_to_use)
+        raise LLMError(f"All LLM providers failed: {last_error}", provider=model_to_use)
 
     async def complete_with_context(
         self,
@@ -191,18 +470,29 @@ class LLMProvider:
 
         This is a convenience method that formats the prompt with context.
         """
-        # Build the full system prompt with context
-        full_system = f"{system_prompt}\n\n{context}" if context else system_prompt
+        return await self.complete(
+            messages=[*(conversation_history or []), {"role": "user", "content": user_message}],
+            system_prompt=system_prompt,
+            prompt_context=context or None,
+            **kwargs,
+        )
 
-        # Build messages
-        messages = []
-        if conversation_history:
-            messages.extend(conversation_history)
-        messages.append({"role": "user", "content": user_message})
+    def stream_with_context(
+        self,
+        user_message: str,
+        context: str,
+        system_prompt: str,
+        conversation_history: list[dict[str, str]] | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[str]:
+        """Stream a completion with RAG context included.
 
-        return await self.complete(
-            messages=messages,
-            system_prompt=full_system,
+        The streaming counterpart of `complete_with_context`; see `stream`.
+        """
+        return self.stream(
+            messages=[*(conversation_history or []), {"role": "user", "content": user_message}],
+            system_prompt=system_prompt,
+            prompt_context=context or None,
             **kwargs,
         )
 
@@ -242,41 +532,25 @@ Summary:""",
         text: str,
     ) -> dict[str, Any]:
         """Extract named entities and key information from text."""
-        messages = [
-            {
-                "role": "user",
-                "content": f"""Extract key information from this customer message. Return JSON with:
-- "intent": main intent (question, complaint, request, feedback, other)
-- "entities": dict of extracted entities (product names, order numbers, dates, etc)
-- "sentiment": positive, neutral, or negative
-- "urgency": low, medium, or high
-
-Message: {text}
-
-JSON:""",
-            }
-        ]
+        messages = [{"role": "user", "content": _EXTRACT_ENTITIES_PROMPT.format(text=text)}]
 
+        # JSON mode where the model supports it; LiteLLM drops the
+        # parameter for models that don't, and the reply is searched instead
         response = await self.complete(
             messages=messages,
             temperature=0.1,
             max_tokens=200,
+            response_format={"type": "json_object"},
+            drop_params=True,
         )
 
-        # Parse JSON from response
-        import json
-
+        match = _JSON_OBJECT.search(response.content)
         try:
-            # Try to extract JSON from the response
-            content = response.content.strip()
-            if content.startswith("```json"):
-                content = content[7:]
-            if content.startswith("```"):
-                content = content[3:]
-            if content.endswith("```"):
-                content = content[:-3]
-            return json.loads(content.strip())
-        except json.JSONDecodeError:
+            extraction = orjson.loads(match.group(0)) if match else None
+        except orjson.JSONDecodeError:
+            extraction = None
+
+        if not isinstance(extraction, dict):
             logger.warning("Failed to parse entity extraction response", content=response.content)
             return {
                 "intent": "other",
@@ -285,14 +559,32 @@ JSON:""",
                 "urgency": "medium",
             }
 
+        return extraction
+
 
 # Singleton instance
 _llm_provider: LLMProvider | None = None
+_llm_provider_lock = threading.Lock()
 
 
 def get_llm_provider() -> LLMProvider:
     """Get or create the LLM provider singleton."""
     global _llm_provider
     if _llm_provider is None:
-        _llm_provider = LLMProvider()
+        # Sync dependencies run in FastAPI's threadpool, so concurrent
+        # requests can both get here; construct the provider only once
+        with _llm_provider_lock:
+            if _llm_provider is None:
+                semantic_cache = None
+                if settings.llm_semantic_cache_enabled:
+                    # Shares the vector store's query embeddings, which retrieval
+                    # computes for the same user message anyway
+                    from src.services.rag.vectorstore import get_vector_store
+
+                    semantic_cache = SemanticCache(
+                        embed=get_vector_store().embed_query,
+                        threshold=settings.llm_semantic_cache_threshold,
+                        ttl=settings.llm_semantic_cache_ttl,
+                    )
+                _llm_provider = LLMProvider(semantic_cache=semantic_cache)
     return _llm_provider
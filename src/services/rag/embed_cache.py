@@ -0,0 +1,119 @@
+"""Persistent content-addressed cache for document embeddings."""
+
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+import numpy as np
+import structlog
+from numpy.typing import NDArray
+
+logger = structlog.get_logger()
+
+# SQLite limits the number of bound parameters per statement
+_MAX_LOOKUP_PARAMS = 500
+
+
+class EmbeddingCache:
+    """SQLite-backed embedding cache keyed by content hash.
+
+    Each vector is stored under blake2b(text | model), so re-ingesting
+    unchanged chunks returns the stored vector instead of calling the
+    embedding API again. Vectors are stored as packed float32 blobs.
+    """
+
+    def __init__(self, path: str | Path = ".embed_cache.db") -> None:
+        self.path = Path(path)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS embeddings (
+                hash BLOB PRIMARY KEY,
+                model TEXT NOT NULL,
+                vector BLOB NOT NULL
+            )"""
+        )
+        self._conn.commit()
+        # Queries run in worker threads; the connection is not safe to share concurrently
+        self._db_lock = threading.Lock()
+
+        logger.info("Embedding cache opened", path=str(self.path))
+
+    @staticmethod
+    def content_key(text: str, model: str) -> bytes:
+        """Compute the cache key for a text embedded with a given model."""
+        return hashlib.blake2b(
+            text.encode("utf-8") + b"|" + model.encode("utf-8"),
+            digest_size=16,
+        ).digest()
+
+    def get_many(self, keys: list[bytes]) -> dict[bytes, NDArray[np.float32]]:
+        """Look up cached vectors by key, returning only the hits."""
+        hits: dict[bytes, NDArray[np.float32]] = {}
+        with self._db_lock:
+            for start in range(0, len(keys), _MAX_LOOKUP_PARAMS):
+                batch = keys[start:start + _MAX_LOOKUP_PARAMS]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT hash, vector FROM embeddings WHERE hash IN ({placeholders})",
+                    batch,
+                )
+                for key, blob in rows:
+                    hits[key] = np.frombuffer(blob, dtype=np.float32)
+        return hits
+
+    def put_many(self, items: list[tuple[bytes, NDArray[np.float32]]], model: str) -> None:
+        """Store vectors under their keys."""
+        with self._db_lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (hash, model, vector) VALUES (?, ?, ?)",
+                [(key, model, vector.tobytes()) for key, vector in items],
+            )
+            self._conn.commit()
+
+    async def get_or_compute_many(
+        self,
+        texts: list[str],
+        model: str,
+        compute_batch: Callable[[list[str]], Awaitable[NDArray[np.float32]]],
+    ) -> NDArray[np.float32]:
+        """Return embeddings for texts, computing only the cache misses.
+
+        Args:
+            texts: Texts to embed
+            model: Model identifier, part of the cache key
+            compute_batch: Coroutine embedding a list of texts
+
+        Returns:
+            Embeddings as float32 rows in the same order as `texts`
+        """
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        keys = [self.content_key(text, model) for text in texts]
+        hits = await asyncio.to_thread(self.get_many, keys)
+
+        miss_indices = [i for i, key in enumerate(keys) if key not in hits]
+        if miss_indices:
+            computed = np.asarray(
+                await compute_batch([texts[i] for i in miss_indices]), dtype=np.float32
+            )
+            new_items = [(keys[i], vector) for i, vector in zip(miss_indices, computed)]
+            await asyncio.to_thread(self.put_many, new_items, model)
+            hits.update(new_items)
+
+        logger.debug(
+            "Embedding cache lookup",
+            total=len(texts),
+            hits=len(texts) - len(miss_indices),
+            model=model,
+        )
+
+        return np.stack([hits[key] for key in keys])
+
+    def close(self) -> None:
+        """Close the underlying database."""
+        with self._db_lock:
+            self._conn.close()
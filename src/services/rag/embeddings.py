@@ -1,16 +1,48 @@
 """Embedding service with multi-provider support (OpenAI, Google, etc.)."""
 
+import asyncio
+import threading
 from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
+from functools import partial
 from typing import Any
 
+import numpy as np
 import structlog
+from numpy.typing import NDArray
 from tenacity import retry, stop_after_attempt, wait_exponential
 
+from src.core.batching import MicroBatcher
+from src.core.cache import TTLCache
 from src.core.config import settings
+from src.core.retry import retry_transient
+from src.services.rag.embed_cache import EmbeddingCache
 
 logger = structlog.get_logger()
 
+# Maximum texts per Google batch embedding request
+_GOOGLE_MAX_BATCH = 100
+
+# Recently computed vectors kept in memory, as float16 arrays (~3 KB per
+# 1536-dimension vector instead of ~50 KB as a list of floats); half
+# precision moves cosine similarities by well under 0.001
+VECTOR_CACHE_SIZE = 4096
+VECTOR_CACHE_TTL = 3600.0
+
+# Concurrent single-text embeddings (mostly search queries) are sent
+# together within this window
+EMBED_BATCH_WINDOW_SECONDS = 0.008
+
+# Texts per OpenAI embedding request, and requests in flight per service.
+# The API accepts up to 2048 inputs, but huge requests trip rate limits
+OPENAI_REQUEST_BATCH = 96
+OPENAI_MAX_CONCURRENT_REQUESTS = 4
+
+# Attempts per OpenAI embedding request on transient errors
+EMBED_ATTEMPTS = 3
+
 
 class EmbeddingProvider(str, Enum):
     """Supported embedding providers."""
@@ -34,14 +66,20 @@ class BaseEmbeddingService(ABC):
         """Get the provider name."""
         pass
 
+    @property
+    @abstractmethod
+    def model_name(self) -> str:
+        """Get an identifier for the model producing the vectors."""
+        pass
+
     @abstractmethod
     async def embed_text(self, text: str) -> list[float]:
         """Generate embedding for a single text."""
         pass
 
     @abstractmethod
-    async def embed_texts(self, texts: list[str]) -> list[list[float]]:
-        """Generate embeddings for multiple texts."""
+    async def embed_texts(self, texts: list[str]) -> NDArray[np.float32]:
+        """Generate embeddings for multiple texts, one float32 row per text."""
         pass
 
     async def embed_for_search(self, query: str) -> list[float]:
@@ -65,9 +103,14 @@ class OpenAIEmbeddingService(BaseEmbeddingService):
         self,
         model: str = "text-embedding-3-small",
         dimensions: int | None = None,
+        max_batch_size: int = OPENAI_REQUEST_BATCH,
+        max_concurrent_requests: int = OPENAI_MAX_CONCURRENT_REQUESTS,
+        batch_window: float = EMBED_BATCH_WINDOW_SECONDS,
     ) -> None:
         self.model = model
         self.dimensions = dimensions
+        self.max_batch_size = max_batch_size
+        self._request_slots = asyncio.Semaphore(max_concurrent_requests)
 
         self._model_dimensions = {
             "text-embedding-3-small": 1536,
@@ -75,6 +118,12 @@ class OpenAIEmbeddingService(BaseEmbeddingService):
             "text-embedding-ada-002": 1536,
         }
 
+        self._batcher: MicroBatcher[str, NDArray[np.float32]] = MicroBatcher(
+            self.embed_texts,
+            max_batch_size=max_batch_size,
+            max_wait=batch_window,
+        )
+
         logger.info("OpenAI Embedding service initialized", model=self.model)
 
     @property
@@ -87,44 +136,35 @@ class OpenAIEmbeddingService(BaseEmbeddingService):
     def provider_name(self) -> str:
         return "openai"
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=10),
-        reraise=True,
-    )
+    @property
+    def model_name(self) -> str:
+        return f"openai/{self.model}:{self.vector_size}"
+
     async def embed_text(self, text: str) -> list[float]:
-        embeddings = await self.embed_texts([text])
-        return embeddings[0]
+        """Embed one text, sharing an API request with concurrent callers.
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=10),
-        reraise=True,
-    )
-    async def embed_texts(self, texts: list[str]) -> list[list[float]]:
+        Retries happen in embed_texts, once for the whole batch.
+        """
+        return (await self._batcher.submit(text)).tolist()
+
+    async def embed_texts(self, texts: list[str]) -> NDArray[np.float32]:
+        """Embed texts in requests of at most `max_batch_size`, run concurrently."""
         if not texts:
-            return []
+            return np.empty((0, self.vector_size), dtype=np.float32)
 
         try:
-            import litellm
-
-            kwargs: dict[str, Any] = {}
-            if self.dimensions and "text-embedding-3" in self.model:
-                kwargs["dimensions"] = self.dimensions
-
-            response = await litellm.aembedding(
-                model=self.model,
-                input=texts,
-                **kwargs,
-            )
-
-            embeddings = [item["embedding"] for item in response.data]
+            batches = await asyncio.gather(*[
+                self._embed_request(texts[start:start + self.max_batch_size])
+                for start in range(0, len(texts), self.max_batch_size)
+            ])
+            embeddings = batches[0] if len(batches) == 1 else np.concatenate(batches)
 
             logger.debug(
                 "Generated OpenAI embeddings",
                 count=len(texts),
+                requests=len(batches),
                 model=self.model,
-                dimensions=len(embeddings[0]) if embeddings else 0,
+                dimensions=embeddings.shape[1],
             )
 
             return embeddings
@@ -133,6 +173,30 @@ class OpenAIEmbeddingService(BaseEmbeddingService):
             logger.error("Failed to generate OpenAI embeddings", error=str(e))
             raise
 
+    async def _embed_request(self, texts: list[str]) -> NDArray[np.float32]:
+        """Embed texts in one API request, once a request slot is free."""
+        import litellm
+
+        kwargs: dict[str, Any] = {}
+        if self.dimensions and "text-embedding-3" in self.model:
+            kwargs["dimensions"] = self.dimensions
+
+        async with self._request_slots:
+            # Only transient errors are retried; bad requests and auth
+            # failures go straight to the caller (or the fallback provider)
+            response = await retry_transient(
+                partial(litellm.aembedding, model=self.model, input=texts, **kwargs),
+                (
+                    litellm.RateLimitError,
+                    litellm.APIConnectionError,
+                    litellm.InternalServerError,
+                    litellm.ServiceUnavailableError,
+                ),
+                attempts=EMBED_ATTEMPTS,
+            )
+
+        return np.asarray([item["embedding"] for item in response.data], dtype=np.float32)
+
 
 class GoogleEmbeddingService(BaseEmbeddingService):
     """Google AI embedding service using text-embedding-004.
@@ -147,17 +211,29 @@ class GoogleEmbeddingService(BaseEmbeddingService):
         self,
         model: str = "text-embedding-004",
         task_type: str = "RETRIEVAL_DOCUMENT",
+        max_workers: int = 8,
+        batch_window: float = EMBED_BATCH_WINDOW_SECONDS,
     ) -> None:
         self.model = model
         self.task_type = task_type
         self._client = None
         self._initialized = False
+        # Dedicated pool so blocking SDK calls don't compete with the default executor
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="google-embed"
+        )
 
         self._model_dimensions = {
             "text-embedding-004": 768,
             "embedding-001": 768,
         }
 
+        self._query_batcher: MicroBatcher[str, NDArray[np.float32]] = MicroBatcher(
+            partial(self._embed, task_type="RETRIEVAL_QUERY"),
+            max_batch_size=_GOOGLE_MAX_BATCH,
+            max_wait=batch_window,
+        )
+
         logger.info("Google Embedding service initialized", model=self.model)
 
     def _ensure_initialized(self) -> None:
@@ -190,57 +266,62 @@ class GoogleEmbeddingService(BaseEmbeddingService):
     def provider_name(self) -> str:
         return "google"
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=10),
-        reraise=True,
-    )
+    @property
+    def model_name(self) -> str:
+        return f"google/{self.model}"
+
     async def embed_text(self, text: str) -> list[float]:
+        # Retries happen in embed_texts
         embeddings = await self.embed_texts([text])
-        return embeddings[0]
+        return embeddings[0].tolist()
+
+    async def embed_texts(self, texts: list[str]) -> NDArray[np.float32]:
+        return await self._embed(texts, self.task_type)
 
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=1, max=10),
         reraise=True,
     )
-    async def embed_texts(self, texts: list[str]) -> list[list[float]]:
+    async def _embed(self, texts: list[str], task_type: str) -> NDArray[np.float32]:
+        """Embed texts for a task type, in concurrent requests of up to 100."""
         if not texts:
-            return []
+            return np.empty((0, self.vector_size), dtype=np.float32)
 
         self._ensure_initialized()
 
         try:
-            import asyncio
-
             import google.generativeai as genai
 
-            # Google's embed_content is sync, so we run in executor
+            # Google's embed_content is sync and accepts a list of texts,
+            # so each slice is one batched request run on the worker pool
             def _embed_batch(batch: list[str], task_type: str) -> list[list[float]]:
-                results = []
-                for text in batch:
-                    result = genai.embed_content(
-                        model=f"models/{self.model}",
-                        content=text,
-                        task_type=task_type,
-                    )
-                    results.append(result["embedding"])
-                return results
-
-            # Run sync function in thread pool
-            loop = asyncio.get_event_loop()
-            embeddings = await loop.run_in_executor(
-                None,
-                _embed_batch,
-                texts,
-                self.task_type,
+                result = genai.embed_content(
+                    model=f"models/{self.model}",
+                    content=batch,
+                    task_type=task_type,
+                )
+                return result["embedding"]
+
+            loop = asyncio.get_running_loop()
+            batches = await asyncio.gather(*[
+                loop.run_in_executor(
+                    self._executor,
+                    _embed_batch,
+                    texts[start:start + _GOOGLE_MAX_BATCH],
+                    task_type,
+                )
+                for start in range(0, len(texts), _GOOGLE_MAX_BATCH)
+            ])
+            embeddings = np.asarray(
+                [vector for batch in batches for vector in batch], dtype=np.float32
             )
 
             logger.debug(
                 "Generated Google embeddings",
                 count=len(texts),
                 model=self.model,
-                dimensions=len(embeddings[0]) if embeddings else 0,
+                dimensions=embeddings.shape[1],
             )
 
             return embeddings
@@ -253,25 +334,16 @@ class GoogleEmbeddingService(BaseEmbeddingService):
         """Generate embedding optimized for search queries.
 
         Uses RETRIEVAL_QUERY task type for better search relevance.
+        Concurrent queries share one request.
         """
-        original_task = self.task_type
-        self.task_type = "RETRIEVAL_QUERY"
-        try:
-            return await self.embed_text(query)
-        finally:
-            self.task_type = original_task
+        return (await self._query_batcher.submit(query)).tolist()
 
     async def embed_for_storage(self, document: str) -> list[float]:
         """Generate embedding optimized for document storage.
 
         Uses RETRIEVAL_DOCUMENT task type.
         """
-        original_task = self.task_type
-        self.task_type = "RETRIEVAL_DOCUMENT"
-        try:
-            return await self.embed_text(document)
-        finally:
-            self.task_type = original_task
+        return (await self._embed([document], "RETRIEVAL_DOCUMENT"))[0].tolist()
 
 
 class EmbeddingService(BaseEmbeddingService):
@@ -285,6 +357,7 @@ class EmbeddingService(BaseEmbeddingService):
         provider: EmbeddingProvider | str | None = None,
         model: str | None = None,
         fallback_provider: EmbeddingProvider | str | None = None,
+        persistent_cache: EmbeddingCache | None = None,
     ) -> None:
         # Determine provider from settings or parameter
         if provider is None:
@@ -308,6 +381,15 @@ class EmbeddingService(BaseEmbeddingService):
         if self._fallback_provider_type:
             self._fallback_service = self._create_provider(self._fallback_provider_type)
 
+        # Primary-provider vectors keyed by content hash of (model, task, text);
+        # fallback vectors are never cached, so a recovered primary takes over
+        self._vectors: TTLCache[bytes, NDArray[np.float16]] = TTLCache(
+            maxsize=VECTOR_CACHE_SIZE, ttl=VECTOR_CACHE_TTL
+        )
+        # Optional second tier on disk, under the same keys, so a restarted
+        # process doesn't pay again for texts it has embedded before
+        self._persistent_cache = persistent_cache
+
         logger.info(
             "Embedding service initialized",
             provider=provider.value,
@@ -324,10 +406,13 @@ class EmbeddingService(BaseEmbeddingService):
         if provider == EmbeddingProvider.OPENAI:
             return OpenAIEmbeddingService(
                 model=model or settings.openai_embedding_model,
+                batch_window=settings.embedding_batch_window_ms / 1000,
             )
         elif provider == EmbeddingProvider.GOOGLE:
             return GoogleEmbeddingService(
                 model=model or settings.google_embedding_model,
+                max_workers=settings.google_embed_concurrency,
+                batch_window=settings.embedding_batch_window_ms / 1000,
             )
         else:
             raise ValueError(f"Unknown embedding provider: {provider}")
@@ -340,9 +425,76 @@ class EmbeddingService(BaseEmbeddingService):
     def provider_name(self) -> str:
         return self._service.provider_name
 
+    @property
+    def model_name(self) -> str:
+        return self._service.model_name
+
+    async def _embed_cached(
+        self,
+        task: str,
+        texts: list[str],
+        compute: Callable[[list[str]], Awaitable[NDArray[np.float32]]],
+    ) -> NDArray[np.float32]:
+        """Embed texts with the primary provider, computing only cache misses.
+
+        Args:
+            task: Kind of embedding, part of the cache key
+            texts: Texts to embed
+            compute: Coroutine embedding a list of texts
+
+        Returns:
+            Embeddings as rows in the same order as `texts`
+        """
+        scope = f"{self.model_name}|{task}"
+        keys = [EmbeddingCache.content_key(text, scope) for text in texts]
+
+        rows: list[NDArray[np.floating] | None] = [self._vectors.get(key) for key in keys]
+        miss_indices = [i for i, row in enumerate(rows) if row is None]
+
+        if miss_indices:
+            miss_texts = [texts[i] for i in miss_indices]
+            if self._persistent_cache is not None:
+                computed = await self._persistent_cache.get_or_compute_many(
+                    miss_texts, scope, compute
+                )
+            else:
+                computed = np.asarray(await compute(miss_texts), dtype=np.float32)
+            for i, row in zip(miss_indices, computed):
+                rows[i] = row
+                self._vectors.set(keys[i], row.astype(np.float16))
+
+        if not rows:
+            return np.empty((0, self.vector_size), dtype=np.float32)
+        return np.stack(rows, dtype=np.float32)  # type: ignore[arg-type]
+
+    async def _embed_one_cached(
+        self,
+        task: str,
+        text: str,
+        compute: Callable[[str], Awaitable[list[float]]],
+    ) -> list[float]:
+        """Embed one text with the primary provider unless cached."""
+        scope = f"{self.model_name}|{task}"
+        key = EmbeddingCache.content_key(text, scope)
+        cached = self._vectors.get(key)
+        if cached is not None:
+            return cached.tolist()
+
+        if self._persistent_cache is not None:
+            async def compute_one(texts: list[str]) -> NDArray[np.float32]:
+                return np.asarray([await compute(texts[0])], dtype=np.float32)
+
+            vectors = await self._persistent_cache.get_or_compute_many([text], scope, compute_one)
+            self._vectors.set(key, vectors[0].astype(np.float16))
+            return vectors[0].tolist()
+
+        vector = await compute(text)
+        self._vectors.set(key, np.asarray(vector, dtype=np.float16))
+        return vector
+
     async def embed_text(self, text: str) -> list[float]:
         try:
-            return await self._service.embed_text(text)
+            return await self._embed_one_cached("text", text, self._service.embed_text)
         except Exception as e:
             if self._fallback_service:
                 logger.warning(
@@ -354,9 +506,9 @@ class EmbeddingService(BaseEmbeddingService):
                 return await self._fallback_service.embed_text(text)
             raise
 
-    async def embed_texts(self, texts: list[str]) -> list[list[float]]:
+    async def embed_texts(self, texts: list[str]) -> NDArray[np.float32]:
         try:
-            return await self._service.embed_texts(texts)
+            return await self._embed_cached("text", texts, self._service.embed_texts)
         except Exception as e:
             if self._fallback_service:
                 logger.warning(
@@ -368,6 +520,10 @@ class EmbeddingService(BaseEmbeddingService):
                 return await self._fallback_service.embed_texts(texts)
             raise
 
+    async def warmup(self) -> None:
+        """Make one throwaway request so the first real one skips client setup."""
+        await self.embed_for_search("warmup")
+
     async def embed_for_search(self, query: str) -> list[float]:
         try:
             return await self._service.embed_for_search(query)
@@ -378,7 +534,9 @@ class EmbeddingService(BaseEmbeddingService):
 
     async def embed_for_storage(self, document: str) -> list[float]:
         try:
-            return await self._service.embed_for_storage(document)
+            return await self._embed_one_cached(
+                "storage", document, self._service.embed_for_storage
+            )
         except Exception as e:
             if self._fallback_service:
                 return await self._fallback_service.embed_for_storage(document)
@@ -387,13 +545,22 @@ class EmbeddingService(BaseEmbeddingService):
 
 # Singleton instance
 _embedding_service: EmbeddingService | None = None
+_embedding_service_lock = threading.Lock()
 
 
 def get_embedding_service() -> EmbeddingService:
     """Get or create the embedding service singleton."""
     global _embedding_service
     if _embedding_service is None:
-        _embedding_service = EmbeddingService()
+        with _embedding_service_lock:
+            if _embedding_service is None:
+                _embedding_service = EmbeddingService(
+                    persistent_cache=(
+                        EmbeddingCache(settings.embedding_cache_path)
+                        if settings.embedding_cache_path
+                        else None
+                    ),
+                )
     return _embedding_service
 
 
@@ -1,5 +1,7 @@
 """RAG Retriever with hybrid search support."""
 
+import asyncio
+import threading
 from dataclasses import dataclass
 from typing import Any
 
@@ -66,28 +68,49 @@ class RAGRetriever:
         """
         kb_results: list[SearchResult] = []
         memory_results: list[SearchResult] = []
+        search_memory = include_memory and user_id
+        if not include_kb and not search_memory:
+            return RetrievalResult(
+                knowledge_base_results=kb_results,
+                memory_results=memory_results,
+                formatted_context="",
+            )
+
+        # Both searches share one query embedding and, when both are needed,
+        # go to Qdrant together as one batch request
+        query_embedding = await self.vector_store.embed_query(query)
+        batched = bool(include_kb and search_memory)
+        searches = []
 
         # Search knowledge base
         if include_kb:
-            kb_results = await self.vector_store.search(
-                query=query,
+            searches.append(self.vector_store.search_by_vector(
+                query_embedding,
                 tenant_id=tenant_id,
                 doc_type="knowledge",
                 limit=kb_limit or self.default_kb_limit,
                 score_threshold=self.score_threshold,
-            )
-            logger.debug("KB retrieval", results=len(kb_results), tenant_id=tenant_id)
+                batched=batched,
+            ))
 
         # Search user memory (conversation summaries)
-        if include_memory and user_id:
-            memory_results = await self.vector_store.search(
-                query=query,
+        if search_memory:
+            searches.append(self.vector_store.search_by_vector(
+                query_embedding,
                 tenant_id=tenant_id,
                 doc_type="memory",
                 limit=memory_limit or self.default_memory_limit,
                 score_threshold=self.score_threshold,
                 additional_filters={"user_id": user_id},
-            )
+                batched=batched,
+            ))
+
+        results = iter(await asyncio.gather(*searches))
+        if include_kb:
+            kb_results = next(results)
+            logger.debug("KB retrieval", results=len(kb_results), tenant_id=tenant_id)
+        if search_memory:
+            memory_results = next(results)
             logger.debug("Memory retrieval", results=len(memory_results), user_id=user_id)
 
         # Format context for LLM
@@ -198,11 +221,14 @@ class RAGRetriever:
 
 # Singleton instance
 _rag_retriever: RAGRetriever | None = None
+_rag_retriever_lock = threading.Lock()
 
 
 def get_rag_retriever() -> RAGRetriever:
     """Get or create the RAG retriever singleton."""
     global _rag_retriever
     if _rag_retriever is None:
-        _rag_retriever = RAGRetriever()
+        with _rag_retriever_lock:
+            if _rag_retriever is None:
+                _rag_retriever = RAGRetriever()
     return _rag_retriever
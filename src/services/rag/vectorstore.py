@@ -1,19 +1,139 @@
 """Qdrant vector store for knowledge base and memory."""
 
+import asyncio
+import threading
 from dataclasses import dataclass
+from functools import lru_cache, partial
 from typing import Any
 from uuid import uuid4
 
+import numpy as np
 import structlog
+from numpy.typing import NDArray
 from qdrant_client import AsyncQdrantClient, models
 from tenacity import retry, stop_after_attempt, wait_exponential
 
+from src.core.batching import MicroBatcher
+from src.core.cache import TTLCache
 from src.core.config import settings
 from src.core.exceptions import VectorStoreError
+from src.core.retry import retry_transient
+from src.core.semantic_cache import SemanticCache
+from src.services.rag.embed_cache import EmbeddingCache
 from src.services.rag.embeddings import EmbeddingService, get_embedding_service
 
 logger = structlog.get_logger()
 
+# Query embeddings kept in memory; repeated questions skip the embedding API
+QUERY_CACHE_SIZE = 4096
+QUERY_CACHE_TTL = 3600.0
+
+# Quantized vectors kept in RAM, with full-precision vectors on disk. Int8
+# quarters vector memory for a <1% recall loss; binary cuts it 32x and suits
+# high-dimensional models, relying on rescoring to recover recall
+QUANTIZATION_CONFIGS: dict[str, models.QuantizationConfig | None] = {
+    "none": None,
+    "int8": models.ScalarQuantization(
+        scalar=models.ScalarQuantizationConfig(
+            type=models.ScalarType.INT8,
+            always_ram=True,
+        ),
+    ),
+    "binary": models.BinaryQuantization(
+        binary=models.BinaryQuantizationConfig(always_ram=True),
+    ),
+}
+
+# Quantized searches fetch this many times `limit` candidates and rescore
+# them with the full-precision vectors
+QUANTIZATION_OVERSAMPLING = 2.0
+
+# Result sets kept per search scope (tenant, doc type, filters, limit)
+SEARCH_CACHE_ENTRIES_PER_SCOPE = 1024
+
+# Batched searches issued within this window share one Qdrant request
+SEARCH_BATCH_WINDOW_SECONDS = 0.005
+SEARCH_MAX_BATCH = 64
+
+# Attempts for a failed search, with backoff starting at one second
+SEARCH_ATTEMPTS = 3
+
+
+@lru_cache(maxsize=4096)
+def _search_filter(
+    tenant_id: str,
+    doc_type: str | None,
+    additional_filters: tuple[tuple[str, Any], ...],
+) -> models.Filter:
+    """Build the payload filter for a search, reused across identical searches."""
+    must_conditions = [
+        models.FieldCondition(
+            key="tenant_id",
+            match=models.MatchValue(value=tenant_id),
+        )
+    ]
+
+    if doc_type:
+        must_conditions.append(
+            models.FieldCondition(
+                key="doc_type",
+                match=models.MatchValue(value=doc_type),
+            )
+        )
+
+    for key, value in additional_filters:
+        must_conditions.append(
+            models.FieldCondition(
+                key=key,
+                match=models.MatchValue(value=value),
+            )
+        )
+
+    return models.Filter(must=must_conditions)
+
+
+# Shared by every vector store, so the process keeps one connection pool
+_qdrant_client: AsyncQdrantClient | None = None
+_qdrant_client_lock = threading.Lock()
+
+
+def get_qdrant_client() -> AsyncQdrantClient:
+    """Get or create the shared Qdrant client.
+
+    Connections are opened on first use; see `QdrantVectorStore.startup`.
+    """
+    global _qdrant_client
+    if _qdrant_client is None:
+        with _qdrant_client_lock:
+            if _qdrant_client is None:
+                if settings.qdrant_url:
+                    # Cloud/Remote Qdrant
+                    _qdrant_client = AsyncQdrantClient(
+                        url=settings.qdrant_url,
+                        api_key=settings.qdrant_api_key or None,
+                        prefer_grpc=settings.qdrant_prefer_grpc,
+                        timeout=settings.qdrant_timeout,
+                    )
+                else:
+                    # Local Qdrant
+                    _qdrant_client = AsyncQdrantClient(
+                        host=settings.qdrant_host,
+                        port=settings.qdrant_port,
+                        grpc_port=settings.qdrant_grpc_port,
+                        prefer_grpc=settings.qdrant_prefer_grpc,
+                        timeout=settings.qdrant_timeout,
+                    )
+                logger.info("Qdrant client initialized", grpc=settings.qdrant_prefer_grpc)
+    return _qdrant_client
+
+
+async def close_qdrant_client() -> None:
+    """Close the shared Qdrant client."""
+    global _qdrant_client
+    if _qdrant_client is not None:
+        await _qdrant_client.close()
+        _qdrant_client = None
+
 
 @dataclass
 class SearchResult:
@@ -28,41 +148,85 @@ class SearchResult:
 class QdrantVectorStore:
     """Qdrant vector store with multi-tenant support.
 
-    Uses metadata filtering for tenant isolation.
+    Uses metadata filtering for tenant isolation. Stored vectors are quantized
+    inside Qdrant ("none", "int8" or "binary"; applied when a collection is
+    created), and quantized searches rescore an oversampled candidate set
+    with the full-precision vectors. An optional embedding cache
+    lets bulk ingestion skip re-embedding documents it has already seen, and
+    query embeddings are cached in memory for repeated searches.
+
+    With a search cache, a query close enough to a recent one with the same
+    tenant, filters and limit reuses its results without calling Qdrant.
+    Adding or deleting a tenant's documents through this store invalidates
+    the tenant's cached results; writes from other processes are only
+    picked up once the cached results expire.
     """
 
     def __init__(
         self,
         embedding_service: EmbeddingService | None = None,
         collection_name: str | None = None,
+        embedding_cache: EmbeddingCache | None = None,
+        quantization: str | None = None,
+        search_cache: SemanticCache[tuple[SearchResult, ...]] | None = None,
     ) -> None:
         self.embedding_service = embedding_service or get_embedding_service()
         self.default_collection = collection_name or settings.qdrant_collection_name
+        self.embedding_cache = embedding_cache
+        self.quantization = quantization or settings.embedding_quantization
+        self.search_cache = search_cache
+        # Bumped on every write for a tenant, retiring its cached results
+        self._tenant_generations: dict[str, int] = {}
+        self._search_params = (
+            None
+            if QUANTIZATION_CONFIGS[self.quantization] is None
+            else models.SearchParams(
+                quantization=models.QuantizationSearchParams(
+                    rescore=True,
+                    oversampling=QUANTIZATION_OVERSAMPLING,
+                ),
+            )
+        )
+        # Held as float32 arrays, a quarter the size of lists of floats
+        self._query_embeddings: TTLCache[tuple[str, str], NDArray[np.float32]] = TTLCache(
+            maxsize=QUERY_CACHE_SIZE, ttl=QUERY_CACHE_TTL
+        )
+        # In-flight query embeddings, shared by concurrent identical searches
+        self._pending_queries: dict[tuple[str, str], asyncio.Task[list[float]]] = {}
+        self._search_batchers: dict[
+            str, MicroBatcher[tuple[models.QueryRequest, int | None], list[models.ScoredPoint]]
+        ] = {}
         self._client: AsyncQdrantClient | None = None
         self._initialized = False
+        # Collections known to exist, so writes skip the existence check
+        self._ensured: set[str] = set()
 
     async def _get_client(self) -> AsyncQdrantClient:
-        """Get or create the Qdrant client."""
+        """Get the Qdrant client, shared across vector stores."""
         if self._client is None:
-            if settings.qdrant_url:
-                # Cloud/Remote Qdrant
-                self._client = AsyncQdrantClient(
-                    url=settings.qdrant_url,
-                    api_key=settings.qdrant_api_key or None,
-                )
-            else:
-                # Local Qdrant
-                self._client = AsyncQdrantClient(
-                    host=settings.qdrant_host,
-                    port=settings.qdrant_port,
-                )
-            logger.info("Qdrant client initialized")
+            self._client = get_qdrant_client()
         return self._client
 
-    async def ensure_collection(self, collection_name: str | None = None) -> None:
-        """Ensure the collection exists with proper configuration."""
+    async def startup(self) -> None:
+        """Connect to Qdrant and ensure the default collection exists.
+
+        Run at application startup so the first request doesn't pay for
+        DNS resolution and connection setup.
+        """
         client = await self._get_client()
+        await client.get_collections()
+        await self.ensure_collection()
+        logger.info("Vector store ready", collection=self.default_collection)
+
+    async def ensure_collection(self, collection_name: str | None = None) -> None:
+        """Ensure the collection exists with proper configuration.
+
+        Only the first call per collection asks Qdrant.
+        """
         name = collection_name or self.default_collection
+        if name in self._ensured:
+            return
+        client = await self._get_client()
 
         try:
             collections = await client.get_collections()
@@ -74,7 +238,9 @@ class QdrantVectorStore:
                     vectors_config=models.VectorParams(
                         size=self.embedding_service.vector_size,
                         distance=models.Distance.COSINE,
+                        on_disk=True,
                     ),
+                    quantization_config=QUANTIZATION_CONFIGS[self.quantization],
                 )
                 logger.info("Created Qdrant collection", collection=name)
 
@@ -93,6 +259,8 @@ class QdrantVectorStore:
             else:
                 logger.debug("Collection already exists", collection=name)
 
+            self._ensured.add(name)
+
         except Exception as e:
             logger.error("Failed to ensure collection", collection=name, error=str(e))
             raise VectorStoreError(f"Failed to ensure collection: {e}", operation="ensure_collection")
@@ -131,7 +299,7 @@ class QdrantVectorStore:
         await self.ensure_collection(collection)
 
         # Generate embeddings
-        embeddings = await self.embedding_service.embed_texts(documents)
+        embeddings = await self._embed_documents(documents)
 
         # Prepare points
         points = []
@@ -151,13 +319,15 @@ class QdrantVectorStore:
             points.append(
                 models.PointStruct(
                     id=doc_id,
-                    vector=embedding,
+                    # The client API takes plain lists, not numpy rows
+                    vector=embedding.tolist(),
                     payload=payload,
                 )
             )
 
         # Upsert to Qdrant
         await client.upsert(collection_name=collection, points=points)
+        self._invalidate_tenant(tenant_id)
 
         logger.info(
             "Added documents to vector store",
@@ -168,11 +338,28 @@ class QdrantVectorStore:
 
         return ids
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=10),
-        reraise=True,
-    )
+    async def _embed_documents(self, documents: list[str]) -> NDArray[np.float32]:
+        """Embed documents, computing each distinct text only once.
+
+        Repeated chunks (boilerplate headers, disclaimers) share one vector.
+        """
+        unique = list(dict.fromkeys(documents))
+
+        if self.embedding_cache:
+            vectors = await self.embedding_cache.get_or_compute_many(
+                unique,
+                model=self.embedding_service.model_name,
+                compute_batch=self.embedding_service.embed_texts,
+            )
+        else:
+            vectors = await self.embedding_service.embed_texts(unique)
+
+        if len(unique) == len(documents):
+            return vectors
+
+        row_of = {text: i for i, text in enumerate(unique)}
+        return vectors[[row_of[doc] for doc in documents]]
+
     async def search(
         self,
         query: str,
@@ -182,6 +369,10 @@ class QdrantVectorStore:
         score_threshold: float = 0.5,
         collection_name: str | None = None,
         additional_filters: dict[str, Any] | None = None,
+        hnsw_ef: int | None = None,
+        timeout: int | None = None,
+        batched: bool = False,
+        retry_on_error: bool = True,
     ) -> list[SearchResult]:
         """Search for similar documents.
 
@@ -193,52 +384,136 @@ class QdrantVectorStore:
             score_threshold: Minimum similarity score
             collection_name: Override collection name
             additional_filters: Additional Qdrant filters
+            hnsw_ef: HNSW candidate list size; lower trades recall for latency
+            timeout: Seconds Qdrant may spend on the search
+            batched: Send together with other batched searches made within
+                a few milliseconds, in one Qdrant request
+            retry_on_error: Retry a failed search with backoff; best-effort
+                searches with a latency budget turn this off
 
         Returns:
             List of SearchResult objects
         """
-        client = await self._get_client()
-        collection = collection_name or self.default_collection
-
-        # Generate query embedding
-        query_embedding = await self.embedding_service.embed_for_search(query)
+        return await self.search_by_vector(
+            await self.embed_query(query),
+            tenant_id=tenant_id,
+            doc_type=doc_type,
+            limit=limit,
+            score_threshold=score_threshold,
+            collection_name=collection_name,
+            additional_filters=additional_filters,
+            hnsw_ef=hnsw_ef,
+            timeout=timeout,
+            batched=batched,
+            retry_on_error=retry_on_error,
+        )
 
-        # Build filters
-        must_conditions = [
-            models.FieldCondition(
-                key="tenant_id",
-                match=models.MatchValue(value=tenant_id),
-            )
-        ]
+    async def search_by_vector(
+        self,
+        query_embedding: list[float],
+        tenant_id: str,
+        doc_type: str | None = None,
+        limit: int = 5,
+        score_threshold: float = 0.5,
+        collection_name: str | None = None,
+        additional_filters: dict[str, Any] | None = None,
+        hnsw_ef: int | None = None,
+        timeout: int | None = None,
+        batched: bool = False,
+        retry_on_error: bool = True,
+    ) -> list[SearchResult]:
+        """Search for documents similar to an already embedded query.
 
-        if doc_type:
-            must_conditions.append(
-                models.FieldCondition(
-                    key="doc_type",
-                    match=models.MatchValue(value=doc_type),
-                )
-            )
+        Lets several searches for one query share its embedding; see
+        `search` for the arguments.
+        """
+        search = partial(
+            self._search_by_vector,
+            query_embedding,
+            tenant_id,
+            doc_type,
+            limit,
+            score_threshold,
+            collection_name,
+            additional_filters,
+            hnsw_ef,
+            timeout,
+            batched,
+        )
+        if not retry_on_error:
+            return await search()
+        return await retry_transient(search, (VectorStoreError,), attempts=SEARCH_ATTEMPTS)
 
-        if additional_filters:
-            for key, value in additional_filters.items():
-                must_conditions.append(
-                    models.FieldCondition(
-                        key=key,
-                        match=models.MatchValue(value=value),
-                    )
-                )
+    async def _search_by_vector(
+        self,
+        query_embedding: list[float],
+        tenant_id: str,
+        doc_type: str | None,
+        limit: int,
+        score_threshold: float,
+        collection_name: str | None,
+        additional_filters: dict[str, Any] | None,
+        hnsw_ef: int | None,
+        timeout: int | None,
+        batched: bool,
+    ) -> list[SearchResult]:
+        """Run one search attempt; see `search` for the arguments."""
+        client = await self._get_client()
+        collection = collection_name or self.default_collection
 
-        query_filter = models.Filter(must=must_conditions)
+        query_filter = _search_filter(
+            tenant_id,
+            doc_type,
+            tuple(additional_filters.items()) if additional_filters else (),
+        )
+        search_params = self._search_params_for(hnsw_ef)
+
+        # Near-duplicate queries over the same documents reuse recent results
+        cache_entry: tuple[bytes, NDArray[np.float32]] | None = None
+        if self.search_cache is not None:
+            scope = self.search_cache.scope_key(
+                self.embedding_service.model_name,
+                collection,
+                tenant_id,
+                self._tenant_generations.get(tenant_id, 0),
+                doc_type,
+                additional_filters,
+                limit,
+                score_threshold,
+            )
+            vector = self.search_cache.normalize(query_embedding)
+            hit = self.search_cache.get(scope, vector)
+            if hit is not None:
+                logger.debug("Vector search cache hit", similarity=round(hit[1], 4))
+                return list(hit[0])
+            cache_entry = (scope, vector)
 
         # Search
         try:
-            results = await client.search(
-                collection_name=collection,
-                query_vector=query_embedding,
-                query_filter=query_filter,
-                limit=limit,
-                score_threshold=score_threshold,
-            )
+            if batched:
+                results = await self._search_batcher(collection).submit((
+                    models.QueryRequest(
+                        query=query_embedding,
+                        filter=query_filter,
+                        params=search_params,
+                        limit=limit,
+                        score_threshold=score_threshold,
+                        with_payload=True,
+                    ),
+                    timeout,
+                ))
+            else:
+                response = await client.query_points(
+                    collection_name=collection,
+                    query=query_embedding,
+                    query_filter=query_filter,
+                    search_params=search_params,
+                    limit=limit,
+                    timeout=timeout,
+                    score_threshold=score_threshold,
+                    with_payload=True,
+                )
+                results = response.points
 
             search_results = [
                 SearchResult(
@@ -252,17 +527,110 @@ class QdrantVectorStore:
 
             logger.debug(
                 "Vector search completed",
-                query_length=len(query),
                 results=len(search_results),
                 tenant_id=tenant_id,
             )
 
+            if cache_entry is not None:
+                self.search_cache.set(*cache_entry, tuple(search_results))
+
             return search_results
 
         except Exception as e:
             logger.error("Vector search failed", error=str(e))
             raise VectorStoreError(f"Search failed: {e}", operation="search")
 
+    def _search_batcher(
+        self, collection: str
+    ) -> MicroBatcher[tuple[models.QueryRequest, int | None], list[models.ScoredPoint]]:
+        """Get the batcher coalescing searches on one collection."""
+        batcher = self._search_batchers.get(collection)
+        if batcher is None:
+            batcher = MicroBatcher(
+                partial(self._search_batch, collection),
+                max_batch_size=SEARCH_MAX_BATCH,
+                max_wait=SEARCH_BATCH_WINDOW_SECONDS,
+            )
+            self._search_batchers[collection] = batcher
+        return batcher
+
+    async def _search_batch(
+        self,
+        collection: str,
+        items: list[tuple[models.QueryRequest, int | None]],
+    ) -> list[list[models.ScoredPoint]]:
+        """Run several searches on a collection as one Qdrant request."""
+        client = await self._get_client()
+        timeouts = [timeout for _, timeout in items if timeout is not None]
+        responses = await client.query_batch_points(
+            collection_name=collection,
+            requests=[request for request, _ in items],
+            timeout=max(timeouts) if timeouts else None,
+        )
+        return [response.points for response in responses]
+
+    def _search_params_for(self, hnsw_ef: int | None) -> models.SearchParams | None:
+        """Combine the quantization search params with an optional HNSW ef."""
+        if hnsw_ef is None:
+            return self._search_params
+        return models.SearchParams(
+            hnsw_ef=hnsw_ef,
+            exact=False,
+            quantization=self._search_params.quantization if self._search_params else None,
+        )
+
+    async def embed_query(self, query: str) -> list[float]:
+        """Embed a search query, reusing cached or in-flight embeddings.
+
+        Queries are keyed by model and case/whitespace-normalized text.
+        """
+        key = (self.embedding_service.model_name, " ".join(query.lower().split()))
+
+        cached = self._query_embeddings.get(key)
+        if cached is not None:
+            return cached.tolist()
+
+        task = self._pending_queries.get(key)
+        if task is None:
+            task = asyncio.create_task(self.embedding_service.embed_for_search(query))
+            self._pending_queries[key] = task
+            task.add_done_callback(partial(self._on_query_embedded, key))
+
+        # Shield so one cancelled caller doesn't cancel the shared embedding
+        return await asyncio.shield(task)
+
+    async def warm_up(self, queries: list[str]) -> None:
+        """Warm the embedding client and pre-embed queries into the query cache.
+
+        Failures are logged, never raised; warm-up only saves latency.
+        """
+        try:
+            await self.embedding_service.warmup()
+        except Exception as e:
+            logger.warning("Embedding warm-up failed", error=str(e))
+            return
+
+        results = await asyncio.gather(
+            *(self.embed_query(query) for query in queries),
+            return_exceptions=True,
+        )
+        failed = sum(isinstance(result, BaseException) for result in results)
+        logger.info("Embedding warm-up done", queries=len(queries), failed=failed)
+
+    def _on_query_embedded(
+        self,
+        key: tuple[str, str],
+        task: asyncio.Task[list[float]],
+    ) -> None:
+        """Cache a finished query embedding."""
+        del self._pending_queries[key]
+        if not task.cancelled() and task.exception() is None:
+            self._query_embeddings.set(key, np.asarray(task.result(), dtype=np.float32))
+
+    def _invalidate_tenant(self, tenant_id: str) -> None:
+        """Retire a tenant's cached search results after a write."""
+        self._tenant_generations[tenant_id] = self._tenant_generations.get(tenant_id, 0) + 1
+
     async def delete_by_tenant(
         self,
         tenant_id: str,
@@ -286,6 +654,7 @@ class QdrantVectorStore:
             ),
         )
 
+        self._invalidate_tenant(tenant_id)
         logger.info("Deleted tenant documents", tenant_id=tenant_id)
         return result.status
 
@@ -302,11 +671,21 @@ class QdrantVectorStore:
 
 # Singleton instance
 _vector_store: QdrantVectorStore | None = None
+_vector_store_lock = threading.Lock()
 
 
 def get_vector_store() -> QdrantVectorStore:
     """Get or create the vector store singleton."""
     global _vector_store
     if _vector_store is None:
-        _vector_store = QdrantVectorStore()
+        with _vector_store_lock:
+            if _vector_store is None:
+                search_cache = None
+                if settings.vector_search_cache_enabled:
+                    search_cache = SemanticCache(
+                        threshold=settings.vector_search_cache_threshold,
+                        ttl=settings.vector_search_cache_ttl,
+                        max_entries_per_scope=SEARCH_CACHE_ENTRIES_PER_SCOPE,
+                    )
+                _vector_store = QdrantVectorStore(search_cache=search_cache)
     return _vector_store
@@ -1,14 +1,29 @@
 """Sentiment analysis using AWS Comprehend or fallback."""
 
+import asyncio
 from dataclasses import dataclass
+from functools import partial
 from typing import Literal
 
 import structlog
 
+from src.core.batching import MicroBatcher
 from src.core.config import settings
 
 logger = structlog.get_logger()
 
+# Languages Comprehend sentiment detection supports; others are sent as English
+COMPREHEND_LANGUAGES = ("en", "es", "fr", "de", "it", "pt")
+
+# Comprehend batch_detect_sentiment accepts at most 25 documents
+COMPREHEND_MAX_BATCH = 25
+
+# How long concurrent analyze() calls wait to be batched together
+BATCH_WINDOW_SECONDS = 0.008
+
+# Messages shorter than this ("ok", "si", emoji) carry no usable sentiment
+MIN_ANALYZABLE_LENGTH = 4
+
 
 @dataclass
 class SentimentResult:
@@ -34,6 +49,7 @@ class SentimentAnalyzer:
     def __init__(self) -> None:
         self._comprehend_client = None
         self._use_comprehend = False
+        self._batchers: dict[str, MicroBatcher[str, SentimentResult]] = {}
 
         # Try to initialize AWS Comprehend
         if settings.aws_access_key_id and settings.aws_secret_access_key:
@@ -56,6 +72,8 @@ class SentimentAnalyzer:
     async def analyze(self, text: str, language: str = "en") -> SentimentResult:
         """Analyze sentiment of text.
 
+        With Comprehend, concurrent calls are coalesced into batch requests.
+
         Args:
             text: Text to analyze
             language: Language code (default: en)
@@ -63,7 +81,7 @@ class SentimentAnalyzer:
         Returns:
             SentimentResult
         """
-        if not text.strip():
+        if len(text.strip()) < MIN_ANALYZABLE_LENGTH:
             return SentimentResult(
                 sentiment="NEUTRAL",
                 score=0.0,
@@ -71,51 +89,115 @@ class SentimentAnalyzer:
             )
 
         if self._use_comprehend:
-            return await self._analyze_with_comprehend(text, language)
+            return await self._get_batcher(language).submit(text)
         else:
             return self._analyze_with_keywords(text)
 
-    async def _analyze_with_comprehend(self, text: str, language: str) -> SentimentResult:
-        """Analyze using AWS Comprehend."""
-        try:
-            # Comprehend has a max text length
-            truncated_text = text[:5000] if len(text) > 5000 else text
+    async def analyze_batch(self, texts: list[str], language: str = "en") -> list[SentimentResult]:
+        """Analyze sentiment of several texts at once.
 
-            response = self._comprehend_client.detect_sentiment(
-                Text=truncated_text,
-                LanguageCode=language if language in ["en", "es", "fr", "de", "it", "pt"] else "en",
-            )
+        Args:
+            texts: Texts to analyze
+            language: Language code (default: en)
 
-            sentiment = response["Sentiment"]
-            scores = response["SentimentScore"]
+        Returns:
+            SentimentResult for each text, in order
+        """
+        results: list[SentimentResult | None] = [None] * len(texts)
+        indices = []
+        for i, text in enumerate(texts):
+            if len(text.strip()) >= MIN_ANALYZABLE_LENGTH:
+                indices.append(i)
+            else:
+                results[i] = SentimentResult(sentiment="NEUTRAL", score=0.0, confidence=1.0)
 
-            # Calculate composite score (-1 to 1)
-            composite_score = scores["Positive"] - scores["Negative"]
+        if self._use_comprehend:
+            analyzed = await self._analyze_batch_with_comprehend(
+                [texts[i] for i in indices], language
+            )
+        else:
+            analyzed = [self._analyze_with_keywords(texts[i]) for i in indices]
 
-            # Confidence is the max score
-            confidence = max(scores.values())
+        for i, result in zip(indices, analyzed):
+            results[i] = result
 
-            result = SentimentResult(
-                sentiment=sentiment,
-                score=composite_score,
-                confidence=confidence,
-                positive_score=scores["Positive"],
-                negative_score=scores["Negative"],
-                neutral_score=scores["Neutral"],
-                mixed_score=scores["Mixed"],
-            )
+        return results  # type: ignore[return-value]
 
-            logger.debug(
-                "Comprehend sentiment analysis",
-                sentiment=sentiment,
-                score=round(composite_score, 3),
+    def _get_batcher(self, language: str) -> MicroBatcher[str, SentimentResult]:
+        """Get the request batcher for a language."""
+        batcher = self._batchers.get(language)
+        if batcher is None:
+            batcher = MicroBatcher(
+                partial(self._analyze_batch_with_comprehend, language=language),
+                max_batch_size=COMPREHEND_MAX_BATCH,
+                max_wait=BATCH_WINDOW_SECONDS,
             )
+            self._batchers[language] = batcher
+        return batcher
+
+    async def _analyze_batch_with_comprehend(
+        self,
+        texts: list[str],
+        language: str,
+    ) -> list[SentimentResult]:
+        """Analyze non-empty texts using AWS Comprehend batch requests."""
+        if not texts:
+            return []
+
+        language_code = language if language in COMPREHEND_LANGUAGES else "en"
+        # Comprehend has a max text length
+        truncated = [text[:5000] for text in texts]
+        starts = range(0, len(truncated), COMPREHEND_MAX_BATCH)
 
-            return result
-
+        try:
+            # boto3 is blocking, so each batch request runs in a worker thread
+            responses = await asyncio.gather(*[
+                asyncio.to_thread(
+                    self._comprehend_client.batch_detect_sentiment,
+                    TextList=truncated[start:start + COMPREHEND_MAX_BATCH],
+                    LanguageCode=language_code,
+                )
+                for start in starts
+            ])
         except Exception as e:
             logger.error("Comprehend analysis failed, using fallback", error=str(e))
-            return self._analyze_with_keywords(text)
+            return [self._analyze_with_keywords(text) for text in texts]
+
+        results: list[SentimentResult | None] = [None] * len(texts)
+        for start, response in zip(starts, responses):
+            for item in response["ResultList"]:
+                results[start + item["Index"]] = self._comprehend_result(
+                    item["Sentiment"], item["SentimentScore"]
+                )
+            for error in response["ErrorList"]:
+                index = start + error["Index"]
+                logger.error(
+                    "Comprehend analysis failed, using fallback",
+                    error=error.get("ErrorMessage"),
+                )
+                results[index] = self._analyze_with_keywords(texts[index])
+
+        logger.debug("Comprehend batch sentiment analysis", count=len(texts))
+
+        return results  # type: ignore[return-value]
+
+    def _comprehend_result(self, sentiment: str, scores: dict[str, float]) -> SentimentResult:
+        """Build a SentimentResult from a Comprehend sentiment response."""
+        # Calculate composite score (-1 to 1)
+        composite_score = scores["Positive"] - scores["Negative"]
+
+        # Confidence is the max score
+        confidence = max(scores.values())
+
+        return SentimentResult(
+            sentiment=sentiment,
+            score=composite_score,
+            confidence=confidence,
+            positive_score=scores["Positive"],
+            negative_score=scores["Negative"],
+            neutral_score=scores["Neutral"],
+            mixed_score=scores["Mixed"],
+        )
 
     def _analyze_with_keywords(self, text: str) -> SentimentResult:
         """Simple keyword-based sentiment analysis as fallback.
@@ -1,5 +1,6 @@
 """Abstract base class for storage backends."""
 
+import asyncio
 from abc import ABC, abstractmethod
 from typing import TypeVar
 
@@ -83,8 +84,14 @@ class StorageBackend(ABC):
         conversation_id: str,
         limit: int = 50,
         before_id: str | None = None,
+        offset: int | None = None,
     ) -> list[Message]:
-        """Get messages for a conversation."""
+        """Get messages for a conversation.
+
+        Without an offset, returns up to `limit` messages. With an offset,
+        returns up to `limit` messages from that position onwards, oldest
+        first.
+        """
         ...
 
     @abstractmethod
@@ -96,6 +103,37 @@ class StorageBackend(ABC):
         """Get most recent messages for context."""
         ...
 
+    async def save_batch(
+        self,
+        messages: list[Message],
+        conversations: list[Conversation],
+    ) -> None:
+        """Save several messages and conversations together.
+
+        The default saves each item concurrently; backends with batched
+        writes override this to commit everything in one round-trip.
+        """
+        await asyncio.gather(
+            *map(self.save_message, messages),
+            *map(self.save_conversation, conversations),
+        )
+
+    async def save_conversation_summaries(self, conversation: Conversation) -> None:
+        """Save only a conversation's summaries and last summarized index.
+
+        Summaries are written in the background after a turn, so the rest of
+        the conversation may have been updated since. The default re-reads
+        the stored conversation and merges the summary fields into it;
+        backends with field-level updates override this.
+        """
+        stored = await self.get_conversation(conversation.id)
+        if stored is None:
+            await self.save_conversation(conversation)
+            return
+        stored.summaries = conversation.summaries
+        stored.last_summarized_index = conversation.last_summarized_index
+        await self.save_conversation(stored)
+
     # ==================== Session/Cache Operations ====================
 
     @abstractmethod
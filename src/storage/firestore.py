@@ -1,16 +1,29 @@
 """Firestore storage backend for production."""
 
 import os
-from datetime import datetime, timedelta
+from datetime import timedelta
 from typing import Any
 
 import structlog
+from pydantic import TypeAdapter
 
-from src.models import Conversation, Message, Tenant
+from src.core.clock import utc_now
+from src.models import OPEN_STATUSES, Conversation, Message, Tenant
 from src.storage.base import StorageBackend
 
 logger = structlog.get_logger()
 
+# List validators decode whole query results in one pass rather than per document
+_tenant_list = TypeAdapter(list[Tenant])
+_conversation_list = TypeAdapter(list[Conversation])
+_message_list = TypeAdapter(list[Message])
+
+# Conversation fields written only by save_conversation_summaries
+_SUMMARY_FIELDS = frozenset({"summaries", "last_summarized_index"})
+
+# Firestore "in" filters take a list of raw values
+_OPEN_STATUS_VALUES = sorted(status.value for status in OPEN_STATUSES)
+
 
 class FirestoreStorage(StorageBackend):
     """Firestore storage implementation for production.
@@ -57,7 +70,7 @@ class FirestoreStorage(StorageBackend):
 
     async def save_tenant(self, tenant: Tenant) -> Tenant:
         await self._ensure_initialized()
-        tenant.updated_at = datetime.utcnow()
+        tenant.updated_at = utc_now()
         await self._db.collection("tenants").document(tenant.id).set(
             tenant.model_dump(mode="json")
         )
@@ -70,7 +83,7 @@ class FirestoreStorage(StorageBackend):
             query = query.where("status", "==", status)
 
         docs = await query.get()
-        return [Tenant(**doc.to_dict()) for doc in docs]
+        return _tenant_list.validate_python([doc.to_dict() for doc in docs])
 
     async def delete_tenant(self, tenant_id: str) -> bool:
         await self._ensure_initialized()
@@ -110,7 +123,7 @@ class FirestoreStorage(StorageBackend):
             .where("tenant_id", "==", tenant_id)
             .where("user_id", "==", user_id)
             .where("channel", "==", channel)
-            .where("status", "in", ["active", "handoff_pending", "handoff_active"])
+            .where("status", "in", _OPEN_STATUS_VALUES)
             .limit(1)
         )
 
@@ -121,12 +134,19 @@ class FirestoreStorage(StorageBackend):
 
     async def save_conversation(self, conversation: Conversation) -> Conversation:
         await self._ensure_initialized()
-        conversation.updated_at = datetime.utcnow()
+        conversation.updated_at = utc_now()
         await self._db.collection("conversations").document(conversation.id).set(
             conversation.model_dump(mode="json")
         )
         return conversation
 
+    async def save_conversation_summaries(self, conversation: Conversation) -> None:
+        await self._ensure_initialized()
+        conversation.updated_at = utc_now()
+        await self._db.collection("conversations").document(conversation.id).update(
+            conversation.model_dump(mode="json", include=_SUMMARY_FIELDS | {"updated_at"})
+        )
+
     async def list_conversations(
         self,
         tenant_id: str,
@@ -143,7 +163,7 @@ class FirestoreStorage(StorageBackend):
         query = query.order_by("updated_at", direction="DESCENDING").limit(limit)
         docs = await query.get()
 
-        return [Conversation(**doc.to_dict()) for doc in docs]
+        return _conversation_list.validate_python([doc.to_dict() for doc in docs])
 
     # ==================== Message Operations ====================
 
@@ -161,14 +181,62 @@ class FirestoreStorage(StorageBackend):
         )
         return message
 
+    async def save_batch(
+        self,
+        messages: list[Message],
+        conversations: list[Conversation],
+    ) -> None:
+        await self._ensure_initialized()
+        batch = self._db.batch()
+        for message in messages:
+            batch.set(
+                self._db.collection("messages").document(message.id),
+                message.model_dump(mode="json"),
+            )
+        now = utc_now()
+        for conversation in conversations:
+            conversation.updated_at = now
+            # Merge, leaving the summary fields to save_conversation_summaries;
+            # this copy may predate a summary written in the background
+            batch.set(
+                self._db.collection("conversations").document(conversation.id),
+                conversation.model_dump(mode="json", exclude=_SUMMARY_FIELDS),
+                merge=True,
+            )
+        await batch.commit()
+
     async def get_messages(
         self,
         conversation_id: str,
         limit: int = 50,
         before_id: str | None = None,
+        offset: int | None = None,
     ) -> list[Message]:
         await self._ensure_initialized()
 
+        if offset is not None:
+            # Served by the (conversation_id, position) composite index in
+            # firestore.indexes.json, so only the requested messages are read
+            query = (
+                self._db.collection("messages")
+                .where("conversation_id", "==", conversation_id)
+                .where("position", ">=", offset)
+                .order_by("position")
+                .limit(limit)
+            )
+            docs = await query.get()
+            if len(docs) < limit:
+                # Messages stored before positions were recorded lack the
+                # field and never match; page by creation time instead
+                query = (
+                    self._db.collection("messages")
+                    .where("conversation_id", "==", conversation_id)
+                    .order_by("created_at")
+                    .limit(offset + limit)
+                )
+                docs = (await query.get())[offset:]
+            return _message_list.validate_python([doc.to_dict() for doc in docs])
+
         query = (
             self._db.collection("messages")
             .where("conversation_id", "==", conversation_id)
@@ -178,7 +246,7 @@ class FirestoreStorage(StorageBackend):
 
         # TODO: Implement cursor-based pagination with before_id
         docs = await query.get()
-        return [Message(**doc.to_dict()) for doc in docs]
+        return _message_list.validate_python([doc.to_dict() for doc in docs])
 
     async def get_recent_messages(
         self,
@@ -195,7 +263,7 @@ class FirestoreStorage(StorageBackend):
         )
 
         docs = await query.get()
-        messages = [Message(**doc.to_dict()) for doc in docs]
+        messages = _message_list.validate_python([doc.to_dict() for doc in docs])
         # Reverse to get chronological order
         return list(reversed(messages))
 
@@ -208,11 +276,11 @@ class FirestoreStorage(StorageBackend):
         ttl_seconds: int = 1800,
     ) -> None:
         await self._ensure_initialized()
-        expiry = datetime.utcnow() + timedelta(seconds=ttl_seconds)
+        now = utc_now()
         await self._db.collection("sessions").document(key).set({
             "data": data,
-            "expires_at": expiry,
-            "created_at": datetime.utcnow(),
+            "expires_at": now + timedelta(seconds=ttl_seconds),
+            "created_at": now,
         })
 
     async def get_session_data(self, key: str) -> dict | None:
@@ -225,7 +293,7 @@ class FirestoreStorage(StorageBackend):
         doc_data = doc.to_dict()
         expires_at = doc_data.get("expires_at")
 
-        if expires_at and datetime.utcnow() > expires_at:
+        if expires_at and utc_now() > expires_at:
             await self.delete_session_data(key)
             return None
 
@@ -1,10 +1,11 @@
 """In-memory storage backend for development and testing."""
 
 import asyncio
-from datetime import datetime, timedelta
+import time
 from typing import Any
 
-from src.models import Conversation, Message, Tenant
+from src.core.clock import utc_now
+from src.models import OPEN_STATUSES, Conversation, Message, Tenant
 from src.storage.base import StorageBackend
 
 
@@ -15,7 +16,7 @@ class InMemoryStorage(StorageBackend):
         self._tenants: dict[str, Tenant] = {}
         self._conversations: dict[str, Conversation] = {}
         self._messages: dict[str, Message] = {}
-        self._session_data: dict[str, tuple[dict[str, Any], datetime]] = {}
+        self._session_data: dict[str, tuple[dict[str, Any], float]] = {}
         self._lock = asyncio.Lock()
 
     # ==================== Tenant Operations ====================
@@ -24,7 +25,7 @@ class InMemoryStorage(StorageBackend):
         return self._tenants.get(tenant_id)
 
     async def save_tenant(self, tenant: Tenant) -> Tenant:
-        tenant.updated_at = datetime.utcnow()
+        tenant.updated_at = utc_now()
         self._tenants[tenant.id] = tenant
         return tenant
 
@@ -56,13 +57,13 @@ class InMemoryStorage(StorageBackend):
                 conv.tenant_id == tenant_id
                 and conv.user_id == user_id
                 and conv.channel == channel
-                and conv.status in ["active", "handoff_pending", "handoff_active"]
+                and conv.status in OPEN_STATUSES
             ):
                 return conv
         return None
 
     async def save_conversation(self, conversation: Conversation) -> Conversation:
-        conversation.updated_at = datetime.utcnow()
+        conversation.updated_at = utc_now()
         self._conversations[conversation.id] = conversation
         return conversation
 
@@ -92,10 +93,14 @@ class InMemoryStorage(StorageBackend):
         conversation_id: str,
         limit: int = 50,
         before_id: str | None = None,
+        offset: int | None = None,
     ) -> list[Message]:
         messages = [m for m in self._messages.values() if m.conversation_id == conversation_id]
         messages.sort(key=lambda x: x.created_at)
 
+        if offset is not None:
+            return messages[offset:offset + limit]
+
         if before_id:
             try:
                 idx = next(i for i, m in enumerate(messages) if m.id == before_id)
@@ -120,7 +125,7 @@ class InMemoryStorage(StorageBackend):
         data: dict,
         ttl_seconds: int = 1800,
     ) -> None:
-        expiry = datetime.utcnow() + timedelta(seconds=ttl_seconds)
+        expiry = time.monotonic() + ttl_seconds
         self._session_data[key] = (data, expiry)
 
     async def get_session_data(self, key: str) -> dict | None:
@@ -128,7 +133,7 @@ class InMemoryStorage(StorageBackend):
             return None
 
         data, expiry = self._session_data[key]
-        if datetime.utcnow() > expiry:
+        if time.monotonic() > expiry:
             del self._session_data[key]
             return None
 
@@ -0,0 +1,48 @@
+"""Process-wide cache of tenants read from storage."""
+
+import asyncio
+
+from src.core.cache import TTLCache
+from src.models import Tenant
+from src.storage.base import StorageBackend
+
+# Tenants change rarely; recently read ones are served without a storage round-trip.
+# Code that modifies a tenant must update or invalidate its entry.
+tenant_cache: TTLCache[str, Tenant] = TTLCache(maxsize=1024, ttl=60.0)
+
+# In-flight tenant reads, shared by concurrent misses for the same tenant
+_pending_reads: dict[str, asyncio.Task[Tenant | None]] = {}
+
+
+async def get_tenant_cached(storage: StorageBackend, tenant_id: str) -> Tenant | None:
+    """Get a tenant through the tenant cache.
+
+    Concurrent misses for the same tenant share one storage read.
+
+    Args:
+        storage: Storage backend used on a cache miss
+        tenant_id: Tenant ID
+
+    Returns:
+        Tenant, or None if it doesn't exist
+    """
+    tenant = tenant_cache.get(tenant_id)
+    if tenant is not None:
+        return tenant
+
+    task = _pending_reads.get(tenant_id)
+    if task is None:
+        task = asyncio.create_task(_load_tenant(storage, tenant_id))
+        _pending_reads[tenant_id] = task
+        task.add_done_callback(lambda _: _pending_reads.pop(tenant_id, None))
+
+    # Shield so one cancelled caller doesn't cancel the shared read
+    return await asyncio.shield(task)
+
+
+async def _load_tenant(storage: StorageBackend, tenant_id: str) -> Tenant | None:
+    """Read a tenant from storage and cache it if it exists."""
+    tenant = await storage.get_tenant(tenant_id)
+    if tenant is not None:
+        tenant_cache.set(tenant_id, tenant)
+    return tenant
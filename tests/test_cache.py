@@ -0,0 +1,69 @@
+"""Tests for in-process caches."""
+
+import pytest
+
+from src.core.cache import TTLCache
+
+
+def test_get_returns_stored_value():
+    """Test basic set/get."""
+    cache: TTLCache[str, int] = TTLCache()
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.get("missing") is None
+
+
+def test_entries_expire(monkeypatch):
+    """Test that entries are dropped after the TTL."""
+    now = [100.0]
+    monkeypatch.setattr("src.core.cache.time.monotonic", lambda: now[0])
+
+    cache: TTLCache[str, int] = TTLCache(ttl=30.0)
+    cache.set("a", 1)
+
+    now[0] += 29.0
+    assert cache.get("a") == 1
+
+    now[0] += 1.0
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_is_evicted():
+    """Test that the oldest unused entry is evicted when full."""
+    cache: TTLCache[str, int] = TTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_invalidate():
+    """Test dropping a single entry."""
+    cache: TTLCache[str, int] = TTLCache()
+    cache.set("a", 1)
+    cache.invalidate("a")
+    cache.invalidate("missing")
+    assert cache.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_tenant_misses_share_one_read(storage, demo_tenant):
+    """Test concurrent cache misses for a tenant issue one storage read."""
+    import asyncio
+    from unittest.mock import AsyncMock
+
+    from src.storage.tenant_cache import get_tenant_cached, tenant_cache
+
+    tenant_cache.invalidate(demo_tenant.id)
+    storage.get_tenant = AsyncMock(wraps=storage.get_tenant)
+
+    tenants = await asyncio.gather(*[get_tenant_cached(storage, demo_tenant.id) for _ in range(5)])
+
+    assert all(t is demo_tenant for t in tenants)
+    storage.get_tenant.assert_awaited_once()
+    tenant_cache.invalidate(demo_tenant.id)
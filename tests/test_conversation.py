@@ -0,0 +1,67 @@
+"""Tests for conversation models."""
+
+import pytest
+
+from src.models import Conversation
+from src.models.conversation import MAX_SUMMARIES, RECENT_SENTIMENT_WINDOW, ConversationSummary
+
+
+def test_should_summarize_counts_messages_since_last_summary():
+    """Test the summarize check uses the index of the latest summary."""
+    conversation = Conversation(id="c1", tenant_id="t1", user_id="u1", message_count=20)
+    assert conversation.should_summarize(threshold=15)
+
+    conversation.add_summary(ConversationSummary(summary_text="s", message_range=(0, 20)))
+    assert conversation.last_summarized_index == 20
+    assert not conversation.should_summarize(threshold=15)
+
+
+def test_add_summary_keeps_latest_summaries():
+    """Test only the latest MAX_SUMMARIES summaries are kept."""
+    conversation = Conversation(id="c1", tenant_id="t1", user_id="u1")
+    for i in range(MAX_SUMMARIES + 3):
+        conversation.add_summary(
+            ConversationSummary(summary_text=f"s{i}", message_range=(i * 15, (i + 1) * 15))
+        )
+
+    assert len(conversation.summaries) == MAX_SUMMARIES
+    assert conversation.summaries[-1].summary_text == f"s{MAX_SUMMARIES + 2}"
+
+
+def test_last_summarized_index_backfilled_from_summaries():
+    """Test conversations stored without the index derive it from summaries."""
+    conversation = Conversation.model_validate({
+        "id": "c1",
+        "tenant_id": "t1",
+        "user_id": "u1",
+        "summaries": [{"summary_text": "s", "message_range": [0, 30]}],
+    })
+    assert conversation.last_summarized_index == 30
+
+
+def test_recent_sentiment_sum_tracks_last_scores():
+    """Test the running sum covers only the latest scores."""
+    conversation = Conversation(id="c1", tenant_id="t1", user_id="u1")
+    scores = [0.5, -0.2, -0.8, -0.9, 0.1, -0.6] * 3
+    for score in scores:
+        conversation.update_sentiment(score)
+
+    expected = sum(scores[-RECENT_SENTIMENT_WINDOW:])
+    assert conversation.recent_sentiment_sum == pytest.approx(expected)
+
+
+def test_prompt_context_reused_for_same_sections():
+    """Test identical knowledge base and summary sections are formatted once."""
+    from src.models import ConversationContext
+
+    sections = {
+        "knowledge_base_context": ["Opens at 9am"],
+        "conversation_summaries": ["Asked about hours"],
+    }
+    first = ConversationContext(**sections)
+    second = ConversationContext(**sections)
+    other = ConversationContext(knowledge_base_context=["Closes at 5pm"])
+
+    assert first.to_prompt_context() is second.to_prompt_context()
+    assert "1. Opens at 9am" in first.to_prompt_context()
+    assert "Closes at 5pm" in other.to_prompt_context()
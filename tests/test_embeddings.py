@@ -1,8 +1,12 @@
 """Tests for embedding service with multi-provider support."""
 
+import sys
+
+import numpy as np
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 
+from src.services.rag.embed_cache import EmbeddingCache
 from src.services.rag.embeddings import (
     EmbeddingProvider,
     EmbeddingService,
@@ -10,6 +14,7 @@ from src.services.rag.embeddings import (
     OpenAIEmbeddingService,
     reset_embedding_service,
 )
+from src.services.rag.vectorstore import QdrantVectorStore
 
 
 class TestOpenAIEmbeddingService:
@@ -62,6 +67,8 @@ class TestEmbeddingService:
         """Test initialization with Google provider."""
         mock_settings.embedding_provider = "google"
         mock_settings.google_embedding_model = "text-embedding-004"
+        mock_settings.google_embed_concurrency = 8
+        mock_settings.embedding_batch_window_ms = 8.0
         mock_settings.embedding_fallback_provider = None
 
         service = EmbeddingService(provider=EmbeddingProvider.GOOGLE)
@@ -73,6 +80,7 @@ class TestEmbeddingService:
         """Test initialization with OpenAI provider."""
         mock_settings.embedding_provider = "openai"
         mock_settings.openai_embedding_model = "text-embedding-3-small"
+        mock_settings.embedding_batch_window_ms = 8.0
         mock_settings.embedding_fallback_provider = None
 
         service = EmbeddingService(provider=EmbeddingProvider.OPENAI)
@@ -84,6 +92,8 @@ class TestEmbeddingService:
         """Test initialization with string provider."""
         mock_settings.embedding_provider = "google"
         mock_settings.google_embedding_model = "text-embedding-004"
+        mock_settings.google_embed_concurrency = 8
+        mock_settings.embedding_batch_window_ms = 8.0
         mock_settings.embedding_fallback_provider = None
 
         service = EmbeddingService(provider="google")
@@ -94,6 +104,8 @@ class TestEmbeddingService:
         """Test fallback provider configuration."""
         mock_settings.embedding_provider = "google"
         mock_settings.google_embedding_model = "text-embedding-004"
+        mock_settings.google_embed_concurrency = 8
+        mock_settings.embedding_batch_window_ms = 8.0
         mock_settings.openai_embedding_model = "text-embedding-3-small"
         mock_settings.embedding_fallback_provider = None
 
@@ -105,6 +117,60 @@ class TestEmbeddingService:
         assert service._fallback_service is not None
         assert service._fallback_service.provider_name == "openai"
 
+    @pytest.mark.asyncio
+    async def test_repeated_texts_reuse_cached_vectors(self):
+        """Only texts not embedded before should reach the provider."""
+        service = EmbeddingService(provider=EmbeddingProvider.OPENAI)
+        service._service.embed_texts = AsyncMock(
+            side_effect=lambda texts: [[float(len(t)), 0.5] for t in texts]
+        )
+
+        first = await service.embed_texts(["a", "bb"])
+        second = await service.embed_texts(["bb", "ccc", "a"])
+
+        assert first.dtype == np.float32
+        assert first.tolist() == [[1.0, 0.5], [2.0, 0.5]]
+        assert second.tolist() == [[2.0, 0.5], [3.0, 0.5], [1.0, 0.5]]
+        assert service._service.embed_texts.await_args_list[1].args == (["ccc"],)
+
+    @pytest.mark.asyncio
+    async def test_cached_vectors_are_half_precision(self):
+        """Cached vectors should be held as float16 and returned as float32."""
+        service = EmbeddingService(provider=EmbeddingProvider.OPENAI)
+        vector = np.random.default_rng(0).normal(size=(1, 256)).astype(np.float32)
+        service._service.embed_texts = AsyncMock(return_value=vector)
+
+        first = await service.embed_texts(["a"])
+        second = await service.embed_texts(["a"])
+
+        cached = next(iter(service._vectors._entries.values()))[1]
+        assert cached.dtype == np.float16
+        assert second.dtype == np.float32
+        cosine = float(first[0] @ second[0]) / float(np.linalg.norm(first[0]) * np.linalg.norm(second[0]))
+        assert cosine > 0.999
+
+    @pytest.mark.asyncio
+    async def test_persistent_cache_survives_a_new_service(self, tmp_path):
+        """A restarted service should read earlier vectors from disk, not the provider."""
+        cache = EmbeddingCache(tmp_path / "cache.db")
+        first = EmbeddingService(provider=EmbeddingProvider.OPENAI, persistent_cache=cache)
+        first._service.embed_texts = AsyncMock(
+            side_effect=lambda texts: np.array([[len(t), 0.5] for t in texts], dtype=np.float32)
+        )
+        first._service.embed_for_storage = AsyncMock(return_value=[9.0, 0.5])
+        await first.embed_texts(["a", "bb"])
+        await first.embed_for_storage("doc")
+
+        second = EmbeddingService(provider=EmbeddingProvider.OPENAI, persistent_cache=cache)
+        second._service.embed_texts = AsyncMock()
+        second._service.embed_for_storage = AsyncMock()
+
+        assert (await second.embed_texts(["bb", "a"])).tolist() == [[2.0, 0.5], [1.0, 0.5]]
+        assert await second.embed_for_storage("doc") == [9.0, 0.5]
+        second._service.embed_texts.assert_not_awaited()
+        second._service.embed_for_storage.assert_not_awaited()
+        cache.close()
+
 
 class TestEmbeddingDimensions:
     """Test embedding dimensions for different providers."""
@@ -123,3 +189,421 @@ class TestEmbeddingDimensions:
         """OpenAI text-embedding-3-large should have 3072 dimensions."""
         service = OpenAIEmbeddingService(model="text-embedding-3-large")
         assert service.vector_size == 3072
+
+
+class TestEmbeddingCache:
+    """Tests for the persistent embedding cache."""
+
+    @pytest.mark.asyncio
+    async def test_only_misses_are_computed(self, tmp_path):
+        """Cached texts should not be sent to the embedding provider again."""
+        cache = EmbeddingCache(tmp_path / "cache.db")
+        compute = AsyncMock(side_effect=lambda texts: [[float(len(t)), 0.5] for t in texts])
+
+        first = await cache.get_or_compute_many(["a", "bb"], "model", compute)
+        second = await cache.get_or_compute_many(["bb", "ccc", "a"], "model", compute)
+
+        assert first.dtype == np.float32
+        assert first.tolist() == [[1.0, 0.5], [2.0, 0.5]]
+        assert second.tolist() == [[2.0, 0.5], [3.0, 0.5], [1.0, 0.5]]
+        assert compute.await_args_list[1].args == (["ccc"],)
+        cache.close()
+
+    @pytest.mark.asyncio
+    async def test_keys_are_scoped_by_model(self, tmp_path):
+        """The same text embedded by another model should be a miss."""
+        cache = EmbeddingCache(tmp_path / "cache.db")
+        compute = AsyncMock(return_value=[[1.0]])
+
+        await cache.get_or_compute_many(["text"], "model-a", compute)
+        await cache.get_or_compute_many(["text"], "model-b", compute)
+
+        assert compute.await_count == 2
+        cache.close()
+
+
+class TestGoogleEmbeddingBatching:
+    """Tests for batched Google embedding requests."""
+
+    @pytest.mark.asyncio
+    @patch("src.services.rag.embeddings.settings")
+    async def test_texts_are_sent_in_batches(self, mock_settings):
+        """Texts should be embedded with one request per batch, in order."""
+        mock_settings.google_api_key = "test-key"
+        genai = MagicMock()
+        genai.embed_content.side_effect = lambda model, content, task_type: {
+            "embedding": [[float(len(text))] for text in content]
+        }
+        google = MagicMock(generativeai=genai)
+
+        texts = ["x" * (i % 7) for i in range(150)]
+        with patch.dict(sys.modules, {"google": google, "google.generativeai": genai}):
+            service = GoogleEmbeddingService()
+            embeddings = await service.embed_texts(texts)
+
+        assert embeddings.shape == (150, 1)
+        assert embeddings.tolist() == [[float(len(text))] for text in texts]
+        assert genai.embed_content.call_count == 2
+
+    @pytest.mark.asyncio
+    @patch("src.services.rag.embeddings.settings")
+    async def test_concurrent_queries_share_one_request(self, mock_settings):
+        """Concurrent search queries should be embedded together as queries."""
+        import asyncio
+
+        mock_settings.google_api_key = "test-key"
+        genai = MagicMock()
+        genai.embed_content.side_effect = lambda model, content, task_type: {
+            "embedding": [[float(len(text))] for text in content]
+        }
+        google = MagicMock(generativeai=genai)
+
+        with patch.dict(sys.modules, {"google": google, "google.generativeai": genai}):
+            service = GoogleEmbeddingService()
+            embeddings = await asyncio.gather(
+                service.embed_for_search("a"),
+                service.embed_for_search("bb"),
+            )
+
+        assert embeddings == [[1.0], [2.0]]
+        genai.embed_content.assert_called_once_with(
+            model="models/text-embedding-004", content=["a", "bb"], task_type="RETRIEVAL_QUERY"
+        )
+        assert service.task_type == "RETRIEVAL_DOCUMENT"
+
+
+class TestQueryEmbeddingCache:
+    """Tests for the vector store's in-memory query embedding cache."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_queries_are_embedded_once(self):
+        """Normalized duplicates, including concurrent ones, share one embedding call."""
+        import asyncio
+
+        embedding_service = MagicMock(model_name="test-model")
+        embedding_service.embed_for_search = AsyncMock(return_value=[0.1, 0.2])
+        store = QdrantVectorStore(embedding_service=embedding_service)
+
+        results = await asyncio.gather(
+            store.embed_query("Opening hours?"),
+            store.embed_query("opening   hours?"),
+        )
+        again = await store.embed_query(" OPENING HOURS? ")
+
+        assert results == [[0.1, 0.2], [0.1, 0.2]]
+        assert again == pytest.approx([0.1, 0.2])
+        assert embedding_service.embed_for_search.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_embeddings_are_not_cached(self):
+        """A failed embedding should be retried by the next search."""
+        embedding_service = MagicMock(model_name="test-model")
+        embedding_service.embed_for_search = AsyncMock(side_effect=[RuntimeError("boom"), [1.0]])
+        store = QdrantVectorStore(embedding_service=embedding_service)
+
+        with pytest.raises(RuntimeError):
+            await store.embed_query("hello")
+
+        assert await store.embed_query("hello") == [1.0]
+
+
+class TestDocumentDeduplication:
+    """Tests for embedding deduplication when adding documents."""
+
+    @pytest.mark.asyncio
+    async def test_duplicate_documents_are_embedded_once(self):
+        """Repeated texts should be embedded once and share the vector."""
+        embedding_service = MagicMock(model_name="test-model")
+        embedding_service.embed_texts = AsyncMock(
+            side_effect=lambda texts: np.array([[len(t)] for t in texts], dtype=np.float32)
+        )
+        store = QdrantVectorStore(embedding_service=embedding_service)
+
+        vectors = await store._embed_documents(["a", "bb", "a", "ccc", "bb"])
+
+        assert vectors.tolist() == [[1.0], [2.0], [1.0], [3.0], [2.0]]
+        embedding_service.embed_texts.assert_awaited_once_with(["a", "bb", "ccc"])
+
+
+class TestOpenAIEmbeddingBatching:
+    """Tests for coalescing concurrent OpenAI embedding requests."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_texts_share_one_request(self):
+        """Concurrent single-text embeddings should be sent as one request, in order."""
+        import asyncio
+
+        litellm = MagicMock()
+        litellm.aembedding = AsyncMock(
+            side_effect=lambda model, input: MagicMock(
+                data=[{"embedding": [float(len(text))]} for text in input]
+            )
+        )
+
+        service = OpenAIEmbeddingService()
+        with patch.dict(sys.modules, {"litellm": litellm}):
+            embeddings = await asyncio.gather(
+                service.embed_text("a"),
+                service.embed_text("bb"),
+                service.embed_text("ccc"),
+            )
+
+        assert embeddings == [[1.0], [2.0], [3.0]]
+        litellm.aembedding.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_large_inputs_are_split_into_capped_requests(self):
+        """Texts beyond the batch cap should go out in several requests, in order."""
+        litellm = MagicMock()
+        litellm.aembedding = AsyncMock(
+            side_effect=lambda model, input: MagicMock(
+                data=[{"embedding": [float(len(text))]} for text in input]
+            )
+        )
+        texts = ["x" * (i % 5) for i in range(10)]
+
+        service = OpenAIEmbeddingService(max_batch_size=4)
+        with patch.dict(sys.modules, {"litellm": litellm}):
+            embeddings = await service.embed_texts(texts)
+
+        assert embeddings.tolist() == [[float(len(text))] for text in texts]
+        assert [len(c.kwargs["input"]) for c in litellm.aembedding.await_args_list] == [4, 4, 2]
+
+
+class TestQuantization:
+    """Tests for quantized vector storage and search."""
+
+    @pytest.mark.asyncio
+    async def test_collection_and_search_follow_quantization(self):
+        """New collections use the configured quantization, and searches rescore."""
+        from qdrant_client import models
+
+        embedding_service = MagicMock(model_name="test-model", vector_size=4)
+        store = QdrantVectorStore(embedding_service=embedding_service, quantization="binary")
+        client = AsyncMock()
+        client.get_collections.return_value = MagicMock(collections=[])
+        store._client = client
+
+        await store.ensure_collection("memories")
+
+        config = client.create_collection.await_args.kwargs["quantization_config"]
+        assert isinstance(config, models.BinaryQuantization)
+        assert store._search_params.quantization.rescore is True
+
+    @pytest.mark.asyncio
+    async def test_collection_is_checked_once(self):
+        """Repeated writes should not list collections again."""
+        store = QdrantVectorStore(embedding_service=MagicMock(vector_size=4))
+        client = AsyncMock()
+        client.get_collections.return_value = MagicMock(collections=[MagicMock()])
+        client.get_collections.return_value.collections[0].name = "kb"
+        store._client = client
+
+        await store.ensure_collection("kb")
+        await store.ensure_collection("kb")
+
+        assert client.get_collections.await_count == 1
+        client.create_collection.assert_not_called()
+
+    def test_unquantized_store_searches_plainly(self):
+        """Without quantization there is nothing to rescore."""
+        store = QdrantVectorStore(embedding_service=MagicMock(), quantization="none")
+        assert store._search_params is None
+
+    def test_hnsw_ef_keeps_rescoring(self):
+        """A per-search ef should be added alongside the quantization params."""
+        store = QdrantVectorStore(embedding_service=MagicMock(), quantization="int8")
+
+        params = store._search_params_for(32)
+
+        assert params.hnsw_ef == 32
+        assert params.quantization.rescore is True
+        assert store._search_params_for(None) is store._search_params
+
+
+class TestEmbeddingServiceSingleton:
+    """Tests for the embedding service singleton."""
+
+    def test_concurrent_first_calls_share_one_instance(self):
+        """Threads racing on first use should construct the service once."""
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+
+        from src.services.rag import embeddings
+
+        def slow_service(**kwargs):
+            time.sleep(0.05)
+            return object()
+
+        reset_embedding_service()
+        try:
+            with patch.object(embeddings, "EmbeddingService", side_effect=slow_service) as cls:
+                with ThreadPoolExecutor(max_workers=4) as pool:
+                    instances = list(pool.map(lambda _: embeddings.get_embedding_service(), range(4)))
+
+            assert cls.call_count == 1
+            assert all(instance is instances[0] for instance in instances)
+        finally:
+            reset_embedding_service()
+
+
+class TestEmbeddingWarmup:
+    """Tests for warming the embedding client at startup."""
+
+    @pytest.mark.asyncio
+    async def test_warm_queries_are_served_from_cache(self):
+        """Pre-embedded queries should not call the embedding API again."""
+        embedding_service = MagicMock(model_name="test-model")
+        embedding_service.warmup = AsyncMock()
+        embedding_service.embed_for_search = AsyncMock(return_value=[0.1, 0.2])
+        store = QdrantVectorStore(embedding_service=embedding_service)
+
+        await store.warm_up(["Opening hours?"])
+        vector = await store.embed_query("opening hours?")
+
+        assert vector == pytest.approx([0.1, 0.2])
+        embedding_service.warmup.assert_awaited_once()
+        assert embedding_service.embed_for_search.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_warmup_is_not_raised(self):
+        """An unreachable provider should not fail startup."""
+        embedding_service = MagicMock(model_name="test-model")
+        embedding_service.warmup = AsyncMock(side_effect=RuntimeError("offline"))
+        store = QdrantVectorStore(embedding_service=embedding_service)
+
+        await store.warm_up(["hello"])
+
+        embedding_service.embed_for_search.assert_not_called()
+
+
+class TestQdrantClient:
+    """Tests for the shared Qdrant client."""
+
+    @pytest.mark.asyncio
+    async def test_stores_share_one_client(self):
+        """Every vector store should reuse the process-wide client."""
+        from src.services.rag import vectorstore
+
+        with patch.object(vectorstore, "AsyncQdrantClient") as cls, \
+                patch.object(vectorstore, "_qdrant_client", None):
+            first = QdrantVectorStore(embedding_service=MagicMock())
+            second = QdrantVectorStore(embedding_service=MagicMock())
+
+            assert await first._get_client() is await second._get_client()
+            assert cls.call_count == 1
+            assert cls.call_args.kwargs["prefer_grpc"] is True
+
+    @pytest.mark.asyncio
+    async def test_startup_connects_and_ensures_collection(self):
+        """Startup should reach Qdrant and create the default collection."""
+        store = QdrantVectorStore(
+            embedding_service=MagicMock(vector_size=4),
+            collection_name="kb",
+        )
+        client = AsyncMock()
+        client.get_collections.return_value = MagicMock(collections=[])
+        store._client = client
+
+        await store.startup()
+
+        assert client.create_collection.await_args.kwargs["collection_name"] == "kb"
+
+
+class TestBatchedSearch:
+    """Tests for coalescing concurrent searches into one Qdrant request."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_searches_share_one_request(self):
+        """Each batched search should get its own results from one batch request."""
+        import asyncio
+
+        from qdrant_client import models
+
+        embedding_service = MagicMock(model_name="test-model")
+        embedding_service.embed_for_search = AsyncMock(return_value=[0.1, 0.2])
+        store = QdrantVectorStore(embedding_service=embedding_service, quantization="none")
+        client = AsyncMock()
+        client.query_batch_points.side_effect = lambda collection_name, requests, timeout: [
+            MagicMock(points=[
+                models.ScoredPoint(
+                    id=i, version=0, score=0.9, payload={"content": request.filter.must[-1].match.value}
+                )
+            ])
+            for i, request in enumerate(requests)
+        ]
+        store._client = client
+
+        results = await asyncio.gather(*[
+            store.search(
+                "hello", tenant_id="t1", additional_filters={"user_id": user}, batched=True
+            )
+            for user in ("u1", "u2")
+        ])
+
+        assert [r[0].content for r in results] == ["u1", "u2"]
+        client.query_batch_points.assert_awaited_once()
+        client.query_points.assert_not_called()
+
+
+class TestSearchRetries:
+    """Tests for retrying failed searches."""
+
+    @pytest.mark.asyncio
+    async def test_best_effort_search_fails_without_retrying(self):
+        """A search that opts out of retries should fail after one attempt."""
+        from src.core.exceptions import VectorStoreError
+
+        store = QdrantVectorStore(embedding_service=MagicMock(model_name="test-model"))
+        client = AsyncMock()
+        client.query_points.side_effect = TimeoutError("deadline exceeded")
+        store._client = client
+
+        with patch("src.core.retry.asyncio.sleep", new=AsyncMock()) as sleep:
+            with pytest.raises(VectorStoreError):
+                await store.search_by_vector([0.1, 0.2], tenant_id="t1", retry_on_error=False)
+            assert client.query_points.await_count == 1
+
+            with pytest.raises(VectorStoreError):
+                await store.search_by_vector([0.1, 0.2], tenant_id="t1")
+            assert client.query_points.await_count == 4
+            assert sleep.await_count == 2
+
+
+class TestSearchResultCache:
+    """Tests for reusing search results for near-duplicate queries."""
+
+    @pytest.mark.asyncio
+    async def test_near_duplicate_query_skips_qdrant_until_tenant_writes(self):
+        """A similar query should reuse results, and a write should retire them."""
+        from qdrant_client import models
+
+        from src.core.semantic_cache import SemanticCache
+
+        vectors = {"opening hours": [1.0, 0.0], "when do you open": [0.98, 0.05]}
+        embedding_service = MagicMock(model_name="test-model")
+        embedding_service.embed_for_search = AsyncMock(side_effect=vectors.get)
+        embedding_service.embed_texts = AsyncMock(
+            return_value=np.array([[0.0, 1.0]], dtype=np.float32)
+        )
+        store = QdrantVectorStore(
+            embedding_service=embedding_service,
+            quantization="none",
+            search_cache=SemanticCache(threshold=0.95),
+        )
+        client = AsyncMock()
+        client.query_points.return_value = MagicMock(points=[
+            models.ScoredPoint(id=1, version=0, score=0.9, payload={"content": "9am-5pm"})
+        ])
+        client.get_collections.return_value = MagicMock(collections=[])
+        store._client = client
+
+        first = await store.search("opening hours", tenant_id="t1")
+        second = await store.search("when do you open", tenant_id="t1")
+        await store.search("when do you open", tenant_id="t2")
+        await store.add_documents(["We now open at 8am"], tenant_id="t1")
+        await store.search("when do you open", tenant_id="t1")
+
+        assert second == first
+        assert second is not first
+        assert client.query_points.await_count == 3
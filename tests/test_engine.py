@@ -0,0 +1,180 @@
+"""Tests for the conversation engine."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.services.conversation.engine import ConversationEngine
+from src.services.llm.provider import LLMResponse
+from src.services.rag.retriever import RetrievalResult
+
+
+@pytest.fixture
+def engine(storage):
+    """Create an engine with mocked LLM and retriever."""
+    llm = MagicMock()
+    llm.complete = AsyncMock(return_value=LLMResponse(content="Hello there!", model="test-model"))
+    retriever = MagicMock()
+    retriever.retrieve = AsyncMock(
+        return_value=RetrievalResult(knowledge_base_results=[], memory_results=[], formatted_context="")
+    )
+    return ConversationEngine(storage=storage, llm_provider=llm, rag_retriever=retriever)
+
+
+@pytest.mark.asyncio
+async def test_process_message_delivers_and_persists_response(engine, storage, demo_tenant):
+    """Test the response is delivered and the exchange persisted."""
+    conversation = await engine.get_or_create_conversation(demo_tenant.id, "+15551234567")
+    deliver = AsyncMock()
+
+    response_text, outgoing, _ = await engine.process_message(
+        tenant=demo_tenant,
+        conversation=conversation,
+        user_message="What are your opening hours?",
+        deliver=deliver,
+    )
+
+    deliver.assert_awaited_once_with("Hello there!")
+    assert response_text == "Hello there!"
+    messages = await storage.get_messages(conversation.id)
+    assert [m.content for m in messages] == ["What are your opening hours?", "Hello there!"]
+    saved = await storage.get_conversation(conversation.id)
+    assert saved.message_count == 2
+
+
+@pytest.mark.asyncio
+async def test_process_message_persists_when_delivery_fails(engine, storage, demo_tenant):
+    """Test a failed delivery still persists the exchange before raising."""
+    conversation = await engine.get_or_create_conversation(demo_tenant.id, "+15551234567")
+    deliver = AsyncMock(side_effect=RuntimeError("send failed"))
+
+    with pytest.raises(RuntimeError):
+        await engine.process_message(
+            tenant=demo_tenant,
+            conversation=conversation,
+            user_message="Hi, I need help",
+            deliver=deliver,
+        )
+
+    messages = await storage.get_messages(conversation.id)
+    assert len(messages) == 2
+
+
+@pytest.mark.asyncio
+async def test_process_message_saves_exchange_in_one_batch(engine, storage, demo_tenant):
+    """Test both messages and the conversation are written in one batch."""
+    conversation = await engine.get_or_create_conversation(demo_tenant.id, "+15551234567")
+    storage.save_batch = AsyncMock(wraps=storage.save_batch)
+
+    await engine.process_message(
+        tenant=demo_tenant,
+        conversation=conversation,
+        user_message="Do you ship abroad?",
+    )
+
+    storage.save_batch.assert_awaited_once()
+    prompt_messages = engine.llm.complete.call_args.kwargs["messages"]
+    assert [m["content"] for m in prompt_messages].count("Do you ship abroad?") == 1
+
+
+@pytest.mark.asyncio
+async def test_memory_processing_runs_after_reply(engine, demo_tenant):
+    """Test summarization is scheduled in the background, not awaited."""
+    import asyncio
+
+    release = asyncio.Event()
+
+    async def slow_memory(conversation):
+        await release.wait()
+
+    engine.memory.process_conversation_memory = AsyncMock(side_effect=slow_memory)
+    engine.memory.summary_threshold = 2
+    conversation = await engine.get_or_create_conversation(demo_tenant.id, "+15551234567")
+
+    response_text, _, _ = await engine.process_message(
+        tenant=demo_tenant,
+        conversation=conversation,
+        user_message="Thanks for the help",
+    )
+
+    assert response_text == "Hello there!"
+    assert len(engine._background_tasks) == 1
+
+    release.set()
+    await engine.close()
+    assert not engine._background_tasks
+
+
+@pytest.mark.asyncio
+async def test_turns_during_a_slow_summary_do_not_start_another(engine, demo_tenant):
+    """Test only one summary runs per conversation while later turns arrive."""
+    import asyncio
+
+    release = asyncio.Event()
+
+    async def slow_memory(conversation):
+        await release.wait()
+
+    engine.memory.process_conversation_memory = AsyncMock(side_effect=slow_memory)
+    engine.memory.summary_threshold = 2
+    conversation = await engine.get_or_create_conversation(demo_tenant.id, "+15551234567")
+
+    for text in ["Hi", "Where is my order?", "Thanks"]:
+        await engine.process_message(tenant=demo_tenant, conversation=conversation, user_message=text)
+
+    release.set()
+    await engine.close()
+    assert engine.memory.process_conversation_memory.await_count == 1
+    assert not engine._summarizing
+
+
+@pytest.mark.asyncio
+async def test_retrieval_failure_still_answers(engine, demo_tenant):
+    """Test a failing retriever degrades to answering without context."""
+    engine.retriever.retrieve = AsyncMock(side_effect=ConnectionError("qdrant down"))
+    conversation = await engine.get_or_create_conversation(demo_tenant.id, "+15551234567")
+
+    response_text, _, _ = await engine.process_message(
+        tenant=demo_tenant,
+        conversation=conversation,
+        user_message="Where is my order?",
+    )
+
+    assert response_text == "Hello there!"
+
+
+@pytest.mark.asyncio
+async def test_response_records_knowledge_sources(engine, demo_tenant):
+    """Test the retrieved knowledge base documents are recorded on the response."""
+    from src.services.rag.vectorstore import SearchResult
+
+    engine.retriever.retrieve.return_value = RetrievalResult(
+        knowledge_base_results=[SearchResult(id="doc-1", content="We open at 9am", score=0.9, metadata={})],
+        memory_results=[],
+        formatted_context="",
+    )
+    conversation = await engine.get_or_create_conversation(demo_tenant.id, "+15551234567")
+
+    _, outgoing, _ = await engine.process_message(
+        tenant=demo_tenant,
+        conversation=conversation,
+        user_message="When do you open?",
+    )
+
+    assert outgoing.metadata.knowledge_sources_used == ["doc-1"]
+
+
+@pytest.mark.asyncio
+async def test_no_memory_task_before_summary_is_due(engine, demo_tenant):
+    """Test turns below the summary threshold schedule no background work."""
+    engine.memory.process_conversation_memory = AsyncMock()
+    conversation = await engine.get_or_create_conversation(demo_tenant.id, "+15551234567")
+
+    await engine.process_message(
+        tenant=demo_tenant,
+        conversation=conversation,
+        user_message="Hello",
+    )
+
+    assert not engine._background_tasks
+    engine.memory.process_conversation_memory.assert_not_awaited()
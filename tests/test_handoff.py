@@ -0,0 +1,112 @@
+"""Tests for handoff evaluation."""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.models import Conversation, Tenant, TenantConfig
+from src.services.conversation.handoff import HandoffEvaluator, HandoffTrigger
+from src.services.sentiment.analyzer import SentimentResult
+
+
+@pytest.fixture
+def evaluator():
+    """Create handoff evaluator."""
+    return HandoffEvaluator()
+
+
+@pytest.fixture
+def tenant():
+    """Create tenant with default handoff keywords."""
+    return Tenant(id="test-tenant", name="Test", config=TenantConfig(company_name="Test"))
+
+
+def test_explicit_request_matches_keyword(evaluator, tenant):
+    """Test that a handoff keyword is matched regardless of case."""
+    decision = evaluator._check_explicit_request("Can I talk to a HUMAN?", tenant)
+    assert decision.should_handoff
+    assert decision.trigger == HandoffTrigger.EXPLICIT_REQUEST
+    assert decision.context == {"matched_keyword": "human"}
+
+
+def test_explicit_request_prefers_longest_keyword(evaluator, tenant):
+    """Test that multi-word keywords win over keywords they contain."""
+    tenant.config.handoff_keywords = []
+    decision = evaluator._check_explicit_request("I need a real person", tenant)
+    assert decision.context == {"matched_keyword": "real person"}
+
+
+def test_no_keyword_no_handoff(evaluator, tenant):
+    """Test that ordinary messages don't trigger handoff."""
+    decision = evaluator._check_explicit_request("What are your opening hours?", tenant)
+    assert not decision.should_handoff
+
+
+@pytest.mark.asyncio
+async def test_concurrent_evaluations_share_one_result(evaluator, tenant):
+    """Test repeated messages in one conversation are evaluated once."""
+    evaluator.sentiment.analyze = AsyncMock(
+        return_value=SentimentResult(sentiment="NEUTRAL", score=0.0, confidence=1.0)
+    )
+    conversation = Conversation(id="c1", tenant_id=tenant.id, user_id="u1")
+
+    decisions = await asyncio.gather(*[
+        evaluator.evaluate("hola hola", conversation, tenant) for _ in range(3)
+    ])
+    again = await evaluator.evaluate("hola hola", conversation, tenant)
+
+    assert all(d is decisions[0] for d in decisions)
+    assert again is decisions[0]
+    evaluator.sentiment.analyze.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_cached_decision_follows_keyword_and_status_changes(evaluator, tenant):
+    """Test a repeated message is re-evaluated once keywords or status change."""
+    from src.models import ConversationStatus
+
+    evaluator.sentiment.analyze = AsyncMock(
+        return_value=SentimentResult(sentiment="NEUTRAL", score=0.0, confidence=1.0)
+    )
+    conversation = Conversation(id="c1", tenant_id=tenant.id, user_id="u1")
+
+    tenant.config.handoff_keywords = ["manager"]
+    assert (await evaluator.evaluate("Get me a manager", conversation, tenant)).should_handoff
+
+    tenant.config.handoff_keywords = ["supervisor"]
+    assert not (await evaluator.evaluate("Get me a manager", conversation, tenant)).should_handoff
+
+    conversation.status = ConversationStatus.RESOLVED
+    await evaluator.evaluate("Get me a manager", conversation, tenant)
+    assert evaluator.sentiment.analyze.await_count == 2
+
+
+def test_keywords_sharing_a_prefix_match_longest(evaluator, tenant):
+    """Test keywords merged into one trie still match their full text."""
+    tenant.config.handoff_keywords = ["agent", "agente", "", "manager"]
+    decision = evaluator._check_explicit_request("Quiero un agente ahora", tenant)
+    assert decision.context == {"matched_keyword": "agente"}
+    assert not evaluator._check_explicit_request("Thanks!", tenant).should_handoff
+
+
+def test_keyword_pattern_follows_tenant_keyword_changes(evaluator, tenant):
+    """Test the cached tenant pattern is rebuilt when keywords change."""
+    tenant.config.handoff_keywords = ["manager"]
+    assert evaluator._check_explicit_request("Get me a manager", tenant).should_handoff
+
+    tenant.config.handoff_keywords = ["supervisor"]
+    assert not evaluator._check_explicit_request("Get me a manager", tenant).should_handoff
+    assert evaluator._check_explicit_request("Get me a supervisor", tenant).should_handoff
+
+
+def test_keyword_prefilter_rules_out_messages(evaluator, tenant):
+    """Test a prefilter miss skips the keyword regex."""
+    from unittest.mock import patch
+
+    tenant.config.handoff_keywords = ["operator"]
+    with patch(
+        "src.services.conversation.handoff._compile_prefilter",
+        return_value=lambda message: False,
+    ):
+        assert not evaluator._check_explicit_request("Operator please", tenant).should_handoff
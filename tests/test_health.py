@@ -22,6 +22,7 @@ async def test_liveness_check(client):
 
     data = response.json()
     assert data["status"] == "alive"
+    assert response.headers["cache-control"] == "max-age=1"
 
 
 @pytest.mark.asyncio
@@ -33,3 +34,34 @@ async def test_root_endpoint(client):
     data = response.json()
     assert data["service"] == "AI Customer Support API"
     assert data["status"] == "running"
+
+
+@pytest.mark.asyncio
+async def test_readiness_check_times_out_hung_dependency(app, client, monkeypatch):
+    """Test that a hung dependency is reported as down instead of blocking."""
+    import asyncio
+    from types import SimpleNamespace
+
+    from src.api.dependencies import get_storage
+    from src.api.routes import health
+    from src.services.rag.retriever import get_rag_retriever
+
+    async def healthy() -> bool:
+        return True
+
+    async def hung() -> bool:
+        await asyncio.sleep(10)
+        return True
+
+    monkeypatch.setattr(health, "READINESS_CHECK_TIMEOUT", 0.05)
+    app.dependency_overrides[get_storage] = lambda: SimpleNamespace(health_check=healthy)
+    app.dependency_overrides[get_rag_retriever] = lambda: SimpleNamespace(
+        vector_store=SimpleNamespace(health_check=hung)
+    )
+
+    response = await client.get("/health/ready")
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["status"] == "degraded"
+    assert data["checks"] == {"storage": True, "vector_store": False}
@@ -0,0 +1,157 @@
+"""Tests for the LLM provider."""
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.services.llm.provider import LLMProvider, LLMResponse
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("reply", "intent"),
+    [
+        ('{"intent": "question", "entities": {}}', "question"),
+        ('```json\n{"intent": "complaint", "entities": {}}\n```', "complaint"),
+        ('Sure! Here it is: {"intent": "request", "entities": {}}', "request"),
+        ("I could not tell.", "other"),
+        ("[1, 2]", "other"),
+    ],
+)
+async def test_extract_entities_parses_json_replies(reply, intent):
+    """Test bare, fenced and embedded JSON objects parse; anything else falls back."""
+    provider = LLMProvider(primary_model="test-model")
+    provider.complete = AsyncMock(return_value=LLMResponse(content=reply, model="test-model"))
+
+    extraction = await provider.extract_entities("Where is order 1234?")
+
+    assert extraction["intent"] == intent
+    assert provider.complete.call_args.kwargs["response_format"] == {"type": "json_object"}
+
+
+def _completion(content):
+    """Build a minimal LiteLLM completion response."""
+    from unittest.mock import MagicMock
+
+    response = MagicMock(id="resp", usage=None)
+    response.choices = [MagicMock(message=MagicMock(content=content), finish_reason="stop")]
+    return response
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_retry_before_falling_back():
+    """Test a rate limit is retried on the same model, an auth error is not."""
+    from unittest.mock import MagicMock, patch
+
+    class RateLimitError(Exception):
+        pass
+
+    class AuthenticationError(Exception):
+        pass
+
+    calls = []
+
+    async def acompletion(model, messages, **kwargs):
+        calls.append(model)
+        if model == "primary" and len(calls) == 1:
+            raise RateLimitError("slow down")
+        if model == "primary":
+            raise AuthenticationError("bad key")
+        return _completion("From fallback")
+
+    # Stand-ins for LiteLLM's exception classes, without importing LiteLLM
+    module = MagicMock(
+        acompletion=acompletion,
+        RateLimitError=RateLimitError,
+        APIConnectionError=ConnectionError,
+        InternalServerError=type("InternalServerError", (Exception,), {}),
+        ServiceUnavailableError=type("ServiceUnavailableError", (Exception,), {}),
+    )
+    provider = LLMProvider(primary_model="primary", fallback_models=["fallback"])
+
+    with patch("src.services.llm.provider._get_litellm", return_value=module), \
+            patch("src.core.retry.asyncio.sleep", new=AsyncMock()):
+        response = await provider.complete(messages=[{"role": "user", "content": "Hi"}])
+
+    assert response.content == "From fallback"
+    assert calls == ["primary", "primary", "fallback"]
+
+
+def _stream_chunk(content=None, finish_reason=None, usage=None):
+    """Build a minimal LiteLLM streaming chunk."""
+    from unittest.mock import MagicMock
+
+    choice = MagicMock(delta=MagicMock(content=content), finish_reason=finish_reason)
+    return MagicMock(choices=[choice] if content or finish_reason else [], usage=usage)
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_chunks_and_falls_back_before_first_token():
+    """Test a stream that fails before any text falls back, and the result is reported."""
+    from unittest.mock import MagicMock, patch
+
+    from src.core.exceptions import LLMError
+
+    async def chunks(model):
+        if model == "primary":
+            raise ConnectionError("reset")
+            yield
+        yield _stream_chunk("Hel")
+        yield _stream_chunk("lo", finish_reason="stop")
+        yield _stream_chunk(usage=MagicMock(prompt_tokens=7, completion_tokens=2))
+
+    async def acompletion(model, messages, **kwargs):
+        assert kwargs["stream"] is True
+        return chunks(model)
+
+    module = MagicMock(
+        acompletion=acompletion,
+        cost_per_token=MagicMock(return_value=(0.0, 0.0)),
+        RateLimitError=type("RateLimitError", (Exception,), {}),
+        APIConnectionError=type("APIConnectionError", (Exception,), {}),
+        InternalServerError=type("InternalServerError", (Exception,), {}),
+        ServiceUnavailableError=type("ServiceUnavailableError", (Exception,), {}),
+    )
+    provider = LLMProvider(primary_model="primary", fallback_models=["fallback"])
+    results = []
+
+    with patch("src.services.llm.provider._get_litellm", return_value=module):
+        streamed = [
+            chunk
+            async for chunk in provider.stream_with_context(
+                "Hi", context="", system_prompt="Be brief", on_complete=results.append
+            )
+        ]
+
+        assert streamed == ["Hel", "lo"]
+        assert results[0].content == "Hello"
+        assert results[0].model == "fallback"
+        assert results[0].tokens_input == 7
+
+        async def broken(model):
+            yield _stream_chunk("Partial")
+            raise ConnectionError("reset")
+
+        module.acompletion = AsyncMock(side_effect=lambda model, messages, **kw: broken(model))
+        with pytest.raises(LLMError):
+            async for _ in provider.stream(messages=[{"role": "user", "content": "Hi"}]):
+                pass
+        assert module.acompletion.await_count == 1
+
+
+def test_token_cost_is_looked_up_once_per_shape():
+    """Test completions with the same model and token counts share one cost lookup."""
+    from unittest.mock import MagicMock, patch
+
+    from src.services.llm.provider import _token_cost
+
+    module = MagicMock()
+    module.cost_per_token.return_value = (0.25, 0.5)
+
+    with patch("src.services.llm.provider._get_litellm", return_value=module):
+        costs = [_token_cost("cost-test-model", 100, 20) for _ in range(3)]
+
+    assert costs == [0.75, 0.75, 0.75]
+    module.cost_per_token.assert_called_once_with(
+        model="cost-test-model", prompt_tokens=100, completion_tokens=20
+    )
@@ -0,0 +1,168 @@
+"""Tests for conversation memory."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.services.conversation.memory import ConversationMemory
+from src.services.rag.vectorstore import SearchResult
+
+
+def test_memory_pack_is_independent_of_retrieval_order():
+    """Test the pack and its version only change when the memories do."""
+    first = SearchResult(id="a", content="Prefers email", score=0.9, metadata={})
+    second = SearchResult(id="b", content="Lives in Madrid", score=0.4, metadata={})
+
+    pack, version = ConversationMemory.build_memory_pack([second, first])
+    same_pack, same_version = ConversationMemory.build_memory_pack([first, second])
+    _, other_version = ConversationMemory.build_memory_pack([first])
+
+    assert pack == "- Prefers email\n- Lives in Madrid"
+    assert (same_pack, same_version) == (pack, version)
+    assert other_version != version
+
+
+@pytest.mark.asyncio
+async def test_summarizes_only_messages_since_last_summary(storage, demo_tenant):
+    """Test a second summary covers the messages after the first one."""
+    from src.models import Conversation, ConversationSummary, Message, MessageDirection
+
+    conversation = Conversation(id="conv-sum", tenant_id=demo_tenant.id, user_id="user-1")
+    for position in range(8):
+        await storage.save_message(Message(
+            id=f"msg-{position}",
+            conversation_id=conversation.id,
+            tenant_id=demo_tenant.id,
+            content=f"Message {position}",
+            direction=MessageDirection.INBOUND,
+            user_id="user-1",
+            position=position,
+        ))
+    conversation.message_count = 8
+    conversation.last_summarized_index = 4
+
+    memory = ConversationMemory(
+        storage=storage, llm_provider=MagicMock(), rag_retriever=MagicMock(), summary_threshold=4
+    )
+    memory.create_summary = AsyncMock(return_value=ConversationSummary(summary_text="Recap"))
+    memory.store_summary_as_memory = AsyncMock()
+
+    await memory.process_conversation_memory(conversation)
+
+    summarized = memory.create_summary.await_args.args[1]
+    assert [m.id for m in summarized] == ["msg-4", "msg-5", "msg-6", "msg-7"]
+
+
+@pytest.mark.asyncio
+async def test_summary_calls_run_concurrently(storage, demo_tenant):
+    """Test summarization and entity extraction overlap instead of running in turn."""
+    import asyncio
+
+    from src.models import Conversation, Message, MessageDirection
+
+    both_started = asyncio.Event()
+    started = []
+
+    def llm_call(result):
+        async def call(*args, **kwargs):
+            started.append(result)
+            if len(started) == 2:
+                both_started.set()
+            # Times out unless the other call starts while this one waits
+            await asyncio.wait_for(both_started.wait(), timeout=1)
+            return result
+        return call
+
+    llm = MagicMock()
+    llm.summarize = AsyncMock(side_effect=llm_call("Recap"))
+    llm.extract_entities = AsyncMock(side_effect=llm_call({}))
+    memory = ConversationMemory(storage=storage, llm_provider=llm, rag_retriever=MagicMock())
+
+    conversation = Conversation(id="conv-par", tenant_id=demo_tenant.id, user_id="user-1")
+    message = Message(
+        id="msg-1",
+        conversation_id=conversation.id,
+        tenant_id=demo_tenant.id,
+        content="Where is my order?",
+        direction=MessageDirection.INBOUND,
+        user_id="user-1",
+    )
+
+    summary = await memory.create_summary(conversation, [message])
+
+    assert summary.summary_text == "Recap"
+    assert llm.summarize.await_args.args[0] == "User: Where is my order?"
+
+
+@pytest.mark.asyncio
+async def test_build_context_survives_memory_search_failure(storage, demo_tenant):
+    """Test a failing memory search leaves the rest of the context intact."""
+    from src.models import Conversation
+
+    retriever = MagicMock()
+    retriever.vector_store.search = AsyncMock(side_effect=ConnectionError("qdrant down"))
+    memory = ConversationMemory(storage=storage, llm_provider=MagicMock(), rag_retriever=retriever)
+    conversation = Conversation(id="conv-ctx", tenant_id=demo_tenant.id, user_id="user-1")
+
+    context = await memory.build_context(conversation, "Where is my order?")
+
+    assert context["user_memories"] == []
+    assert context["recent_messages"] == []
+
+
+@pytest.mark.asyncio
+async def test_user_memory_search_is_best_effort(storage):
+    """Test a failing memory search returns no memories and is not retried."""
+    retriever = MagicMock()
+    retriever.vector_store.search = AsyncMock(side_effect=TimeoutError("qdrant timed out"))
+    memory = ConversationMemory(storage=storage, llm_provider=MagicMock(), rag_retriever=retriever)
+
+    memories = await memory.get_user_memory("tenant-1", "user-1", "Where is my order?")
+
+    assert memories == []
+    retriever.vector_store.search.assert_awaited_once()
+    assert retriever.vector_store.search.await_args.kwargs["retry_on_error"] is False
+
+
+@pytest.mark.asyncio
+async def test_summary_input_is_truncated_to_token_budget(monkeypatch, demo_tenant):
+    """Test long messages keep their start and the transcript keeps its end."""
+    from src.models import Conversation, Message, MessageDirection
+    from src.services.conversation import memory as memory_module
+
+    class WordEncoding:
+        """Stand-in tokenizer with one token per word."""
+
+        def encode(self, text, disallowed_special=()):
+            return text.split(" ")
+
+        def decode(self, tokens):
+            return " ".join(tokens)
+
+    monkeypatch.setattr(memory_module, "_token_encoding", WordEncoding)
+    monkeypatch.setattr(memory_module, "SUMMARY_MESSAGE_MAX_TOKENS", 4)
+    monkeypatch.setattr(memory_module, "SUMMARY_INPUT_MAX_TOKENS", 6)
+
+    messages = [
+        Message(
+            id=f"msg-{position}",
+            conversation_id="conv-long",
+            tenant_id=demo_tenant.id,
+            content=content,
+            direction=MessageDirection.INBOUND,
+            user_id="user-1",
+        )
+        for position, content in enumerate(
+            ["one two three four five six", "short", "last words here"]
+        )
+    ]
+    llm = MagicMock()
+    llm.summarize = AsyncMock(return_value="Recap")
+    llm.extract_entities = AsyncMock(return_value={})
+    memory = ConversationMemory(storage=MagicMock(), llm_provider=llm, rag_retriever=MagicMock())
+
+    await memory.create_summary(
+        Conversation(id="conv-long", tenant_id=demo_tenant.id, user_id="user-1"), messages
+    )
+
+    assert llm.summarize.await_args.args[0] == "two three\nUser: short\nUser: last words here"
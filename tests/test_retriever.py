@@ -0,0 +1,71 @@
+"""Tests for the RAG retriever."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.services.rag.retriever import RAGRetriever
+from src.services.rag.vectorstore import SearchResult
+
+
+@pytest.mark.asyncio
+async def test_kb_and_memory_share_one_query_embedding():
+    """Test one embedding serves both the knowledge base and memory searches."""
+    vector_store = MagicMock()
+    vector_store.embed_query = AsyncMock(return_value=[0.1, 0.2])
+    vector_store.search_by_vector = AsyncMock(side_effect=lambda vector, doc_type, **kw: [
+        SearchResult(id=doc_type, content=f"{doc_type} hit", score=0.9, metadata={})
+    ])
+    retriever = RAGRetriever(vector_store=vector_store)
+
+    result = await retriever.retrieve("Opening hours?", tenant_id="t1", user_id="u1")
+
+    vector_store.embed_query.assert_awaited_once_with("Opening hours?")
+    assert [call.args[0] for call in vector_store.search_by_vector.await_args_list] == [
+        [0.1, 0.2],
+        [0.1, 0.2],
+    ]
+    assert [r.content for r in result.knowledge_base_results] == ["knowledge hit"]
+    assert [r.content for r in result.memory_results] == ["memory hit"]
+
+
+@pytest.mark.asyncio
+async def test_kb_and_memory_searches_overlap():
+    """Test the memory search starts before the knowledge base search finishes."""
+    import asyncio
+
+    running = []
+
+    async def search_by_vector(vector, doc_type, **kwargs):
+        running.append(doc_type)
+        await asyncio.sleep(0)
+        overlapped = len(running) == 2
+        return [SearchResult(id=doc_type, content=str(overlapped), score=0.9, metadata={})]
+
+    vector_store = MagicMock()
+    vector_store.embed_query = AsyncMock(return_value=[0.1, 0.2])
+    vector_store.search_by_vector = search_by_vector
+    retriever = RAGRetriever(vector_store=vector_store)
+
+    result = await retriever.retrieve("Opening hours?", tenant_id="t1", user_id="u1")
+
+    assert result.knowledge_base_results[0].content == "True"
+    assert result.memory_results[0].id == "memory"
+
+
+@pytest.mark.asyncio
+async def test_kb_and_memory_searches_are_batched_together():
+    """Test both searches ask to share one Qdrant request, but a lone one doesn't."""
+    vector_store = MagicMock()
+    vector_store.embed_query = AsyncMock(return_value=[0.1, 0.2])
+    vector_store.search_by_vector = AsyncMock(return_value=[])
+    retriever = RAGRetriever(vector_store=vector_store)
+
+    await retriever.retrieve("Opening hours?", tenant_id="t1", user_id="u1")
+    await retriever.retrieve("Opening hours?", tenant_id="t1")
+
+    assert [call.kwargs["batched"] for call in vector_store.search_by_vector.await_args_list] == [
+        True,
+        True,
+        False,
+    ]
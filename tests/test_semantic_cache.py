@@ -0,0 +1,84 @@
+"""Tests for the semantic cache and its use by the LLM provider."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.services.llm.provider import LLMProvider
+from src.core.semantic_cache import SemanticCache
+
+EMBEDDINGS = {
+    "What are your hours?": [1.0, 0.0],
+    "what are your hours": [0.99, 0.01],
+    "Do you ship abroad?": [0.0, 1.0],
+}
+
+
+@pytest.fixture
+def litellm():
+    """Patch LiteLLM with a completion that echoes a fixed answer."""
+    response = MagicMock(id="resp-1", usage=None)
+    response.choices = [MagicMock(message=MagicMock(content="We open at 9am"), finish_reason="stop")]
+    module = MagicMock()
+    module.acompletion = AsyncMock(return_value=response)
+    module.completion_cost.return_value = 0.001
+    with patch("src.services.llm.provider._get_litellm", return_value=module):
+        yield module
+
+
+@pytest.fixture
+def provider():
+    """Create a provider whose semantic cache uses fixed embeddings."""
+    cache = SemanticCache(embed=AsyncMock(side_effect=EMBEDDINGS.get))
+    return LLMProvider(primary_model="test-model", fallback_models=["test-model"], semantic_cache=cache)
+
+
+async def ask(provider, question, temperature=0.0, system_prompt="Be helpful"):
+    return await provider.complete(
+        messages=[{"role": "user", "content": question}],
+        system_prompt=system_prompt,
+        temperature=temperature,
+    )
+
+
+@pytest.mark.asyncio
+async def test_near_duplicate_question_is_served_from_cache(provider, litellm):
+    """Test a rephrased question in the same context skips the LLM call."""
+    first = await ask(provider, "What are your hours?")
+    second = await ask(provider, "what are your hours")
+
+    assert second.content == first.content
+    assert second.cost_usd == 0.0
+    litellm.acompletion.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_different_question_or_context_misses(provider, litellm):
+    """Test unrelated questions and changed system prompts are not served from cache."""
+    await ask(provider, "What are your hours?")
+    await ask(provider, "Do you ship abroad?")
+    await ask(provider, "What are your hours?", system_prompt="Be terse")
+
+    assert litellm.acompletion.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_high_temperature_completions_are_not_cached(provider, litellm):
+    """Test sampled completions always call the LLM."""
+    await ask(provider, "What are your hours?", temperature=0.7)
+    await ask(provider, "What are your hours?", temperature=0.7)
+
+    assert litellm.acompletion.await_count == 2
+
+
+def test_full_scope_replaces_its_oldest_entry():
+    """Test a scope holds at most its configured entries, dropping the oldest."""
+    cache = SemanticCache(threshold=0.99, max_entries_per_scope=2)
+    scope = cache.scope_key("scope")
+    vectors = [cache.normalize(v) for v in ([1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0])]
+
+    for i, vector in enumerate(vectors):
+        cache.set(scope, vector, f"answer-{i}")
+
+    assert cache.get(scope, vectors[0]) is None
+    assert cache.get(scope, vectors[2]) == ("answer-2", pytest.approx(1.0))
@@ -41,3 +41,55 @@ async def test_empty_text(analyzer):
     result = await analyzer.analyze("")
     assert result.sentiment == "NEUTRAL"
     assert result.score == 0.0
+
+
+@pytest.mark.asyncio
+async def test_analyze_batch_preserves_order(analyzer):
+    """Test batch analysis returns one result per text, in order."""
+    results = await analyzer.analyze_batch(["I love it, great!", "", "This is terrible"])
+    assert [r.sentiment for r in results] == ["POSITIVE", "NEUTRAL", "NEGATIVE"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_comprehend_calls_are_batched():
+    """Test concurrent analyze calls share one Comprehend batch request."""
+    import asyncio
+    from unittest.mock import MagicMock
+
+    def batch_detect_sentiment(TextList, LanguageCode):
+        return {
+            "ResultList": [
+                {
+                    "Index": i,
+                    "Sentiment": "POSITIVE",
+                    "SentimentScore": {"Positive": 0.9, "Negative": 0.05, "Neutral": 0.05, "Mixed": 0.0},
+                }
+                for i in range(len(TextList))
+            ],
+            "ErrorList": [],
+        }
+
+    analyzer = SentimentAnalyzer()
+    analyzer._use_comprehend = True
+    analyzer._comprehend_client = MagicMock()
+    analyzer._comprehend_client.batch_detect_sentiment.side_effect = batch_detect_sentiment
+
+    results = await asyncio.gather(*[analyzer.analyze(f"message {i}") for i in range(5)])
+
+    assert all(r.sentiment == "POSITIVE" for r in results)
+    assert analyzer._comprehend_client.batch_detect_sentiment.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_short_messages_skip_comprehend():
+    """Test trivially short messages are neutral without calling Comprehend."""
+    from unittest.mock import MagicMock
+
+    analyzer = SentimentAnalyzer()
+    analyzer._use_comprehend = True
+    analyzer._comprehend_client = MagicMock()
+
+    result = await analyzer.analyze(" ok ")
+
+    assert result.sentiment == "NEUTRAL"
+    analyzer._comprehend_client.batch_detect_sentiment.assert_not_called()
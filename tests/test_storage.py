@@ -72,6 +72,30 @@ async def test_conversation_crud(storage, demo_tenant):
     assert by_user.id == "conv-1"
 
 
+@pytest.mark.asyncio
+async def test_saving_summaries_keeps_newer_conversation_fields(storage, demo_tenant):
+    """Test a late summary write doesn't roll back fields saved after it was taken."""
+    from src.models import ConversationSummary
+
+    conv = Conversation(id="conv-sum", tenant_id=demo_tenant.id, user_id="user-789")
+    await storage.save_conversation(conv)
+    snapshot = conv.model_copy(deep=True)
+
+    # The next turn is saved while the summary is still being written
+    conv.message_count = 20
+    conv.status = ConversationStatus.HANDOFF_PENDING
+    await storage.save_conversation(conv)
+
+    snapshot.add_summary(ConversationSummary(summary_text="Asked about hours", message_range=(0, 15)))
+    await storage.save_conversation_summaries(snapshot)
+
+    saved = await storage.get_conversation("conv-sum")
+    assert saved.message_count == 20
+    assert saved.status == ConversationStatus.HANDOFF_PENDING
+    assert [s.summary_text for s in saved.summaries] == ["Asked about hours"]
+    assert saved.last_summarized_index == 15
+
+
 @pytest.mark.asyncio
 async def test_message_crud(storage, demo_tenant):
     """Test message CRUD operations."""
@@ -109,6 +133,10 @@ async def test_message_crud(storage, demo_tenant):
     messages = await storage.get_messages("conv-msg")
     assert len(messages) == 2
 
+    # Get messages from a position onwards
+    later = await storage.get_messages("conv-msg", offset=1)
+    assert [m.id for m in later] == ["msg-2"]
+
     # Get recent messages
     recent = await storage.get_recent_messages("conv-msg", limit=1)
     assert len(recent) == 1
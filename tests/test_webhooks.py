@@ -0,0 +1,194 @@
+"""Tests for channel webhook endpoints."""
+
+from unittest.mock import patch
+
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_status_callback_skips_message_pipeline(client):
+    """Test status-only payloads return before any service is resolved."""
+    with patch("src.api.routes.webhooks.get_storage") as get_storage, \
+            patch("src.api.routes.webhooks.get_whatsapp_adapter") as get_adapter:
+        response = await client.post(
+            "/webhooks/whatsapp/test-tenant",
+            data={"MessageSid": "SM123", "MessageStatus": "delivered", "SmsStatus": "delivered"},
+        )
+
+    assert response.status_code == 200
+    get_adapter.assert_not_called()
+    get_storage.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_status_callback_acknowledges_with_empty_body(client):
+    """Test the status callback answers with an empty 200."""
+    response = await client.post(
+        "/webhooks/whatsapp/test-tenant/status",
+        data={"MessageSid": "SM123", "MessageStatus": "read"},
+    )
+
+    assert response.status_code == 200
+    assert response.content == b""
+    assert response.headers["content-length"] == "0"
+
+
+@pytest.mark.asyncio
+async def test_read_twilio_form_keeps_blank_and_unicode_values():
+    """Test urlencoded bodies decode like Starlette's form parser."""
+    from starlette.requests import Request
+
+    from src.api.dependencies import read_twilio_form
+
+    body = b"Body=&From=whatsapp%3A%2B15551234567&ProfileName=Jos%C3%A9"
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    request = Request(
+        {
+            "type": "http",
+            "method": "POST",
+            "headers": [(b"content-type", b"application/x-www-form-urlencoded")],
+        },
+        receive,
+    )
+
+    fields = await read_twilio_form(request)
+    assert fields == [
+        ("Body", ""),
+        ("From", "whatsapp:+15551234567"),
+        ("ProfileName", "José"),
+    ]
+    # Signature verification and the handler share the parsed fields
+    assert await read_twilio_form(request) is fields
+
+
+@pytest.mark.asyncio
+async def test_signature_enforced_outside_development(client):
+    """Test webhooks require a valid Twilio signature outside development."""
+    import base64
+    import hashlib
+    import hmac
+
+    from src.services.channels.whatsapp import TwilioWhatsAppAdapter
+
+    adapter = TwilioWhatsAppAdapter(account_sid="", auth_token="12345")
+    url = "http://test/webhooks/whatsapp/test-tenant/status"
+    data = {"MessageSid": "SM123", "MessageStatus": "read"}
+    signature = base64.b64encode(
+        hmac.new(b"12345", adapter.build_signature_payload(url, list(data.items())), hashlib.sha1).digest()
+    ).decode()
+
+    with patch("src.api.dependencies.settings") as settings, \
+            patch("src.api.dependencies.get_whatsapp_adapter", return_value=adapter):
+        settings.is_development = False
+        settings.public_base_url = ""
+        missing = await client.post(url, data=data)
+        forged = await client.post(url, data=data, headers={"X-Twilio-Signature": "bm9wZQ=="})
+        valid = await client.post(url, data=data, headers={"X-Twilio-Signature": signature})
+
+    assert missing.status_code == 401
+    assert forged.status_code == 401
+    assert valid.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_signature_checks_public_url_behind_proxy(client):
+    """Test the signed https URL is rebuilt from the proxy's forwarded headers."""
+    import base64
+    import hashlib
+    import hmac
+
+    from src.services.channels.whatsapp import TwilioWhatsAppAdapter
+
+    adapter = TwilioWhatsAppAdapter(account_sid="", auth_token="12345")
+    public_url = "https://bot.example.com/webhooks/whatsapp/test-tenant/status"
+    data = {"MessageSid": "SM123", "MessageStatus": "read"}
+    signature = base64.b64encode(
+        hmac.new(b"12345", adapter.build_signature_payload(public_url, list(data.items())), hashlib.sha1).digest()
+    ).decode()
+    headers = {"X-Twilio-Signature": signature}
+    forwarded = {**headers, "X-Forwarded-Proto": "https", "X-Forwarded-Host": "bot.example.com"}
+
+    with patch("src.api.dependencies.settings") as settings, \
+            patch("src.api.dependencies.get_whatsapp_adapter", return_value=adapter):
+        settings.is_development = False
+        settings.public_base_url = ""
+        internal = await client.post("/webhooks/whatsapp/test-tenant/status", data=data, headers=headers)
+        proxied = await client.post("/webhooks/whatsapp/test-tenant/status", data=data, headers=forwarded)
+
+        settings.public_base_url = "https://bot.example.com"
+        configured = await client.post("/webhooks/whatsapp/test-tenant/status", data=data, headers=headers)
+
+    assert internal.status_code == 401
+    assert proxied.status_code == 200
+    assert configured.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_ndjson_batch_processes_each_message(client):
+    """Test an NDJSON burst schedules every new message once."""
+    import orjson
+
+    events = [
+        {"MessageSid": "SMb1", "From": "whatsapp:+15550000001", "Body": "Hi"},
+        {"MessageSid": "SMb2", "From": "whatsapp:+15550000002", "Body": "Hello"},
+        {"MessageSid": "SMb3", "MessageStatus": "delivered"},
+        {"MessageSid": "SMb1", "From": "whatsapp:+15550000001", "Body": "Hi"},
+    ]
+    body = b"\n".join(orjson.dumps(event) for event in events)
+
+    with patch("src.api.routes.webhooks._process_whatsapp_message") as process:
+        response = await client.post(
+            "/webhooks/whatsapp/test-tenant",
+            content=body,
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+
+    assert response.status_code == 200
+    assert sorted(call.args[2] for call in process.call_args_list) == ["SMb1", "SMb2"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("body", [b'{"MessageSid": "SMx"}\n{not json', b"[1, 2]"])
+async def test_malformed_ndjson_is_rejected(client, body):
+    """Test NDJSON bodies with a bad or non-object line get a 400."""
+    with patch("src.api.routes.webhooks._process_whatsapp_message") as process:
+        response = await client.post(
+            "/webhooks/whatsapp/test-tenant",
+            content=body,
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+
+    assert response.status_code == 400
+    process.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_ndjson_requires_relay_signature_outside_development(client):
+    """Test NDJSON is refused without a relay secret and checked against it otherwise."""
+    import hashlib
+    import hmac
+
+    url = "http://test/webhooks/whatsapp/test-tenant"
+    body = b'{"MessageSid": "SMr1", "MessageStatus": "delivered"}'
+    headers = {"Content-Type": "application/x-ndjson"}
+    signature = hmac.new(b"relay-secret", url.encode() + body, hashlib.sha256).hexdigest()
+
+    with patch("src.api.dependencies.settings") as settings:
+        settings.is_development = False
+        settings.public_base_url = ""
+        settings.webhook_relay_secret = ""
+        disabled = await client.post(url, content=body, headers={**headers, "X-Relay-Signature": signature})
+
+        settings.webhook_relay_secret = "relay-secret"
+        forged = await client.post(url, content=body, headers={**headers, "X-Relay-Signature": "00"})
+        # A Twilio signature header does not stand in for the relay signature
+        twilio_only = await client.post(url, content=body, headers={**headers, "X-Twilio-Signature": signature})
+        valid = await client.post(url, content=body, headers={**headers, "X-Relay-Signature": signature})
+
+    assert disabled.status_code == 401
+    assert forged.status_code == 401
+    assert twilio_only.status_code == 401
+    assert valid.status_code == 200
@@ -0,0 +1,174 @@
+"""Tests for the Twilio WhatsApp adapter."""
+
+import pytest
+
+from src.services.channels.whatsapp import TwilioWhatsAppAdapter
+
+# Example request from Twilio's webhook security documentation
+TWILIO_URL = "https://mycompany.com/myapp.php?foo=1&bar=2"
+TWILIO_PARAMS = [
+    ("CallSid", "CA1234567890ABCDE"),
+    ("Caller", "+12349013030"),
+    ("Digits", "1234"),
+    ("From", "+12349013030"),
+    ("To", "+18005551212"),
+]
+TWILIO_SIGNATURE = "0/KCTR6DLpKmkAf8muzZqo1nDgQ="
+
+
+@pytest.fixture
+def adapter():
+    """Create adapter with Twilio's documentation auth token."""
+    return TwilioWhatsAppAdapter(account_sid="AC123", auth_token="12345")
+
+
+def test_valid_signature(adapter):
+    """Test that Twilio's reference signature validates."""
+    payload = adapter.build_signature_payload(TWILIO_URL, TWILIO_PARAMS)
+    assert adapter.validate_webhook(payload, TWILIO_SIGNATURE)
+
+
+def test_parameter_order_does_not_matter(adapter):
+    """Test that parameters are sorted before signing."""
+    payload = adapter.build_signature_payload(TWILIO_URL, TWILIO_PARAMS[::-1])
+    assert adapter.validate_webhook(payload, TWILIO_SIGNATURE)
+
+
+def test_tampered_payload_is_rejected(adapter):
+    """Test that a modified parameter invalidates the signature."""
+    params = [(k, "+19999999999" if k == "From" else v) for k, v in TWILIO_PARAMS]
+    payload = adapter.build_signature_payload(TWILIO_URL, params)
+    assert not adapter.validate_webhook(payload, TWILIO_SIGNATURE)
+
+
+@pytest.mark.asyncio
+async def test_send_message_does_not_block_event_loop(adapter):
+    """Test the blocking Twilio call runs in a worker thread."""
+    import threading
+    from unittest.mock import MagicMock
+
+    from src.models import OutgoingMessage
+
+    calling_threads = []
+
+    def create(**params):
+        calling_threads.append(threading.current_thread())
+        return MagicMock(sid="SM123", status="queued")
+
+    adapter._client = MagicMock()
+    adapter._client.messages.create.side_effect = create
+
+    result = await adapter.send_message(OutgoingMessage(content="Hi", recipient_id="+15551234567"))
+
+    assert result == {"message_sid": "SM123", "status": "queued", "to": "whatsapp:+15551234567"}
+    assert calling_threads[0] is not threading.main_thread()
+
+
+@pytest.mark.asyncio
+async def test_queued_sends_keep_per_recipient_order(adapter):
+    """Test concurrent sends to one recipient go out in order and errors reach the caller."""
+    import asyncio
+    from unittest.mock import MagicMock
+
+    from twilio.base.exceptions import TwilioRestException
+
+    from src.core.exceptions import ChannelError
+    from src.models import OutgoingMessage
+
+    sent = []
+
+    def create(**params):
+        if params["body"] == "fail":
+            raise TwilioRestException(400, "uri", msg="bad request", code=21211)
+        sent.append(params["body"])
+        return MagicMock(sid=f"SM{len(sent)}", status="queued")
+
+    adapter._client = MagicMock()
+    adapter._client.messages.create.side_effect = create
+
+    results = await asyncio.gather(
+        *(
+            adapter.send_message(OutgoingMessage(content=body, recipient_id="+15551234567"))
+            for body in ["one", "two", "fail", "three"]
+        ),
+        return_exceptions=True,
+    )
+    await adapter.close()
+
+    assert sent == ["one", "two", "three"]
+    assert isinstance(results[2], ChannelError)
+    assert [r["message_sid"] for r in results if isinstance(r, dict)] == ["SM1", "SM2", "SM3"]
+
+
+@pytest.mark.asyncio
+async def test_queued_sends_bound_in_flight_requests():
+    """Test a burst to many recipients never exceeds the per-worker concurrency."""
+    import asyncio
+    import threading
+    import time
+    from unittest.mock import MagicMock
+
+    from src.models import OutgoingMessage
+
+    adapter = TwilioWhatsAppAdapter(
+        account_sid="AC123", auth_token="12345", send_workers=1, send_concurrency=3
+    )
+    lock = threading.Lock()
+    in_flight = peak = 0
+
+    def create(**params):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.01)
+        with lock:
+            in_flight -= 1
+        return MagicMock(sid="SM1", status="queued")
+
+    adapter._client = MagicMock()
+    adapter._client.messages.create.side_effect = create
+
+    await asyncio.gather(*(
+        adapter.send_message(OutgoingMessage(content="Hi", recipient_id=f"+1555000{i:04d}"))
+        for i in range(12)
+    ))
+    await adapter.close()
+
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("content_type", "expected"),
+    [
+        ("image/jpeg", "image"),
+        ("audio/ogg", "audio"),
+        ("video/mp4", "video"),
+        ("application/pdf", "document"),
+        ("imagex/png", "document"),
+    ],
+)
+async def test_media_message_type(adapter, content_type, expected):
+    """Test media messages are typed by the major MIME type."""
+    incoming = await adapter.parse_webhook({
+        "MessageSid": "SM123",
+        "From": "whatsapp:+15551234567",
+        "Body": "",
+        "NumMedia": "1",
+        "MediaUrl0": "https://api.twilio.com/media/ME123",
+        "MediaContentType0": content_type,
+    })
+    assert incoming.message_type == expected
+
+
+@pytest.mark.asyncio
+async def test_parsed_message_keeps_sid_but_not_raw_payload(adapter):
+    """Test the MessageSid is extracted and the raw payload dropped by default."""
+    incoming = await adapter.parse_webhook({
+        "MessageSid": "SM123",
+        "From": "whatsapp:+15551234567",
+        "Body": "Hello",
+    })
+    assert incoming.external_id == "SM123"
+    assert incoming.raw_payload == {}